@@ -0,0 +1,4 @@
+"""Offline benchmark suite for verbose-version-info.
+
+Run ``python -m benchmarks.run --help`` from the repository root for the options.
+"""
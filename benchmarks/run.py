@@ -0,0 +1,516 @@
+"""Run the benchmarks in a synthetic environment and compare them to a stored baseline.
+
+Each scenario runs three times from cold caches: once to measure the latency,
+once counting the filesystem and process calls (``os.stat``, ``open``, ``Popen``, ...)
+made from Python and once tracing the peak memory with :mod:`tracemalloc`.
+The call counts only vary with the order directories are listed in, so they are
+compared with a small tolerance, latency and memory depend on the machine and are
+compared with a larger one.
+
+Examples
+--------
+Create or update the baseline::
+
+    python -m benchmarks.run --save-baseline
+
+Check for regressions (exits with 1 if there are any)::
+
+    python -m benchmarks.run
+"""
+import argparse
+import builtins
+import importlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+from benchmarks.synthetic_env import SyntheticEnvironment
+from benchmarks.synthetic_env import SyntheticEnvironmentConfig
+from benchmarks.synthetic_env import create_synthetic_environment
+
+import verbose_version_info.git_repository
+import verbose_version_info.utils
+import verbose_version_info.vcs
+from verbose_version_info.git_batch import close_git_cat_file_batches
+from verbose_version_info.utils import DISTRIBUTION_CACHE
+from verbose_version_info.utils import dist_files
+from verbose_version_info.utils import distribution
+from verbose_version_info.vcs import clear_vcs_root_cache
+from verbose_version_info.verbose_version_info import vv_info
+from verbose_version_info.verbose_version_info import vv_info_all
+from verbose_version_info.verbose_version_info import vv_info_many
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+DEFAULT_BASELINE = BASELINE_DIR / "default.json"
+
+COUNTED_CALLS = {
+    "stat": (os, "stat"),
+    "lstat": (os, "lstat"),
+    "scandir": (os, "scandir"),
+    "listdir": (os, "listdir"),
+    "open": (builtins, "open"),
+    "io_open": (io, "open"),
+    "subprocess": (subprocess, "Popen"),
+}
+"""Counted calls mapped to the module attribute which is wrapped to count them."""
+
+DEFERRED_IMPORTS = ("concurrent.futures.thread", "json", "subprocess", "urllib.parse")
+"""Modules verbose-version-info imports on first use, which are imported before the
+synthetic environment replaces ``sys.path`` and aren't part of the measurements."""
+
+Scenario = Callable[[SyntheticEnvironment, List[str]], int]
+
+
+def reset_caches() -> None:
+    """Reset all caches of verbose-version-info and importlib, so each run starts cold."""
+    DISTRIBUTION_CACHE.clear()
+    clear_vcs_root_cache()
+    verbose_version_info.vcs._DIRTY_RESULTS.clear()
+    verbose_version_info.git_repository._OBJECT_STORES.clear()
+    verbose_version_info.utils._PATH_ENTRY_EDITABLES.clear()
+    verbose_version_info.utils._EDITABLE_INDEX = ((), {})
+    close_git_cat_file_batches()
+    importlib.invalidate_caches()
+
+
+@contextmanager
+def activated_environment(environment: SyntheticEnvironment) -> Iterator[None]:
+    """Make the synthetic environment the only one visible and put the fake git on PATH.
+
+    Parameters
+    ----------
+    environment : SyntheticEnvironment
+        Environment to activate.
+
+    Yields
+    ------
+    None
+        Nothing, the environment is active until the context is left.
+    """
+    for module in DEFERRED_IMPORTS:
+        importlib.import_module(module)
+    original_sys_path = sys.path[:]
+    original_path = os.environ.get("PATH", "")
+    sys.path[:] = environment.path_entries
+    os.environ["PATH"] = os.pathsep.join([str(environment.bin_dir), original_path])
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            yield
+    finally:
+        sys.path[:] = original_sys_path
+        os.environ["PATH"] = original_path
+        reset_caches()
+
+
+@contextmanager
+def counted_calls() -> Iterator[Counter]:
+    """Count the calls listed in :data:`COUNTED_CALLS`.
+
+    Yields
+    ------
+    Counter
+        Number of calls per name.
+    """
+    counts: Counter = Counter()
+    originals = {
+        name: getattr(module, attribute) for name, (module, attribute) in COUNTED_CALLS.items()
+    }
+
+    def counting(name: str, function: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap a function to count its calls.
+
+        Parameters
+        ----------
+        name : str
+            Name the calls are counted under.
+        function : Callable[..., Any]
+            Function to wrap.
+
+        Returns
+        -------
+        Callable[..., Any]
+            Wrapped function.
+        """
+
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            """Count the call and run the wrapped function.
+
+            Parameters
+            ----------
+            args : Any
+                Positional arguments of the call.
+            kwargs : Any
+                Keyword arguments of the call.
+
+            Returns
+            -------
+            Any
+                Result of the wrapped function.
+            """
+            counts[name] += 1
+            return function(*args, **kwargs)
+
+        return wrapper
+
+    for name, (module, attribute) in COUNTED_CALLS.items():
+        setattr(module, attribute, counting(name, originals[name]))
+    try:
+        yield counts
+    finally:
+        for name, (module, attribute) in COUNTED_CALLS.items():
+            setattr(module, attribute, originals[name])
+
+
+def _distribution_scenario(environment: SyntheticEnvironment, sample: List[str]) -> int:
+    """Look up the distribution of each sampled name.
+
+    Parameters
+    ----------
+    environment : SyntheticEnvironment
+        Active environment.
+    sample : List[str]
+        Sampled distribution names.
+
+    Returns
+    -------
+    int
+        Number of measured calls.
+    """
+    for distribution_name in sample:
+        distribution(distribution_name)
+    return len(sample)
+
+
+def _dist_files_scenario(environment: SyntheticEnvironment, sample: List[str]) -> int:
+    """List the files of each sampled distribution.
+
+    Parameters
+    ----------
+    environment : SyntheticEnvironment
+        Active environment.
+    sample : List[str]
+        Sampled distribution names.
+
+    Returns
+    -------
+    int
+        Number of measured calls.
+    """
+    for distribution_name in sample:
+        dist_files(distribution_name)
+    return len(sample)
+
+
+def _vv_info_scenario(environment: SyntheticEnvironment, sample: List[str]) -> int:
+    """Resolve each sampled distribution with :func:`vv_info`.
+
+    Parameters
+    ----------
+    environment : SyntheticEnvironment
+        Active environment.
+    sample : List[str]
+        Sampled distribution names.
+
+    Returns
+    -------
+    int
+        Number of measured calls.
+    """
+    for distribution_name in sample:
+        vv_info(distribution_name)
+    return len(sample)
+
+
+def _vv_info_many_scenario(environment: SyntheticEnvironment, sample: List[str]) -> int:
+    """Resolve all distributions of the environment with :func:`vv_info_many`.
+
+    Parameters
+    ----------
+    environment : SyntheticEnvironment
+        Active environment.
+    sample : List[str]
+        Sampled distribution names, not used.
+
+    Returns
+    -------
+    int
+        Number of resolved distributions.
+    """
+    return len(vv_info_many(environment.distribution_names, max_workers=8))
+
+
+def _vv_info_all_scenario(environment: SyntheticEnvironment, sample: List[str]) -> int:
+    """Resolve the whole environment with :func:`vv_info_all`.
+
+    Parameters
+    ----------
+    environment : SyntheticEnvironment
+        Active environment.
+    sample : List[str]
+        Sampled distribution names, not used.
+
+    Returns
+    -------
+    int
+        Number of resolved distributions.
+    """
+    return len(vv_info_all())
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "distribution": _distribution_scenario,
+    "dist_files": _dist_files_scenario,
+    "vv_info": _vv_info_scenario,
+    "vv_info_many": _vv_info_many_scenario,
+    "vv_info_all": _vv_info_all_scenario,
+}
+
+
+def sample_distribution_names(environment: SyntheticEnvironment, sample_size: int) -> List[str]:
+    """Evenly spaced sample of the distributions, covering all kinds of installations.
+
+    Parameters
+    ----------
+    environment : SyntheticEnvironment
+        Environment to sample from.
+    sample_size : int
+        Number of sampled distributions.
+
+    Returns
+    -------
+    List[str]
+        Sampled distribution names.
+    """
+    names = environment.distribution_names
+    step = max(len(names) // max(sample_size, 1), 1)
+    return names[::step][:sample_size]
+
+
+def measure_scenario(
+    environment: SyntheticEnvironment, scenario: Scenario, sample: List[str]
+) -> Dict[str, Any]:
+    """Measure latency, call counts and peak memory of a scenario.
+
+    Parameters
+    ----------
+    environment : SyntheticEnvironment
+        Active environment.
+    scenario : Scenario
+        Scenario to measure.
+    sample : List[str]
+        Sampled distribution names.
+
+    Returns
+    -------
+    Dict[str, Any]
+        Measurements of the scenario.
+    """
+    reset_caches()
+    start = time.perf_counter()
+    calls = scenario(environment, sample)
+    total_time = time.perf_counter() - start
+
+    reset_caches()
+    with counted_calls() as counts:
+        scenario(environment, sample)
+
+    reset_caches()
+    tracemalloc.start()
+    try:
+        scenario(environment, sample)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "calls": calls,
+        "total_ms": round(total_time * 1000, 3),
+        "per_call_ms": round(total_time * 1000 / max(calls, 1), 4),
+        "peak_memory_kib": round(peak_memory / 1024, 1),
+        "counts": dict(sorted(counts.items())),
+    }
+
+
+def run_benchmarks(
+    config: SyntheticEnvironmentConfig,
+    sample_size: int = 200,
+    scenarios: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """Create a synthetic environment and measure the scenarios in it.
+
+    Parameters
+    ----------
+    config : SyntheticEnvironmentConfig
+        Configuration of the synthetic environment.
+    sample_size : int
+        Number of distributions used by the per-distribution scenarios, by default 200
+    scenarios : Optional[Sequence[str]]
+        Names of the scenarios to run, by default None which runs all :data:`SCENARIOS`.
+
+    Returns
+    -------
+    Dict[str, Any]
+        Configuration and measurements of each scenario.
+    """
+    if scenarios is None:
+        scenarios = list(SCENARIOS)
+    with tempfile.TemporaryDirectory(prefix="vv-info-benchmark-") as tmp_dir:
+        environment = create_synthetic_environment(Path(tmp_dir), config)
+        sample = sample_distribution_names(environment, sample_size)
+        with activated_environment(environment):
+            results = {
+                name: measure_scenario(environment, SCENARIOS[name], sample) for name in scenarios
+            }
+    return {"config": config._asdict(), "sample_size": sample_size, "scenarios": results}
+
+
+def compare_to_baseline(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    time_tolerance: float = 2.0,
+    memory_tolerance: float = 1.25,
+    count_tolerance: float = 1.1,
+) -> List[str]:
+    """Regressions of the results compared to a baseline.
+
+    Parameters
+    ----------
+    results : Dict[str, Any]
+        Result of :func:`run_benchmarks`.
+    baseline : Dict[str, Any]
+        Stored result of :func:`run_benchmarks`.
+    time_tolerance : float
+        Factor the latency may exceed the baseline by, by default 2.0
+    memory_tolerance : float
+        Factor the peak memory may exceed the baseline by, by default 1.25
+    count_tolerance : float
+        Factor the call counts may exceed the baseline by, by default 1.1
+
+    Returns
+    -------
+    List[str]
+        Description of each regression, empty if there are none.
+    """
+    if results["config"] != baseline["config"] or (
+        results["sample_size"] != baseline["sample_size"]
+    ):
+        return ["The configuration differs from the baseline, measurements aren't comparable."]
+    regressions = []
+    for name, measured in results["scenarios"].items():
+        expected = baseline["scenarios"].get(name)
+        if expected is None:
+            continue
+        for call, count in measured["counts"].items():
+            if count > expected["counts"].get(call, 0) * count_tolerance:
+                regressions.append(
+                    f"{name}: {count} {call} calls, baseline {expected['counts'].get(call, 0)}"
+                )
+        if measured["total_ms"] > expected["total_ms"] * time_tolerance:
+            regressions.append(
+                f"{name}: {measured['total_ms']} ms, baseline {expected['total_ms']} ms"
+            )
+        if measured["peak_memory_kib"] > expected["peak_memory_kib"] * memory_tolerance:
+            regressions.append(
+                f"{name}: {measured['peak_memory_kib']} KiB peak memory, "
+                f"baseline {expected['peak_memory_kib']} KiB"
+            )
+    return regressions
+
+
+def format_results(results: Dict[str, Any]) -> str:
+    """Human readable table of the measurements.
+
+    Parameters
+    ----------
+    results : Dict[str, Any]
+        Result of :func:`run_benchmarks`.
+
+    Returns
+    -------
+    str
+        One line per scenario.
+    """
+    lines = [
+        f"{'scenario':<14}{'calls':>7}{'total ms':>12}{'per call ms':>13}{'peak KiB':>11}  counts"
+    ]
+    for name, measured in results["scenarios"].items():
+        counts = ", ".join(f"{call}={count}" for call, count in measured["counts"].items())
+        lines.append(
+            f"{name:<14}{measured['calls']:>7}{measured['total_ms']:>12}"
+            f"{measured['per_call_ms']:>13}{measured['peak_memory_kib']:>11}  {counts}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command line entry point of the benchmarks.
+
+    Parameters
+    ----------
+    argv : Optional[Sequence[str]]
+        Command line arguments, by default None which uses ``sys.argv``.
+
+    Returns
+    -------
+    int
+        Exit code, 1 if regressions were found.
+    """
+    defaults = SyntheticEnvironmentConfig()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    for field in SyntheticEnvironmentConfig._fields:
+        parser.add_argument(
+            f"--{field.replace('_', '-')}", type=int, default=getattr(defaults, field)
+        )
+    parser.add_argument("--sample-size", type=int, default=200)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS))
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--time-tolerance", type=float, default=2.0)
+    parser.add_argument("--memory-tolerance", type=float, default=1.25)
+    parser.add_argument("--count-tolerance", type=float, default=1.1)
+    args = parser.parse_args(argv)
+
+    config = SyntheticEnvironmentConfig(
+        **{field: getattr(args, field) for field in SyntheticEnvironmentConfig._fields}
+    )
+    results = run_benchmarks(config, args.sample_size, args.scenario)
+    print(format_results(results))
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}, create it with --save-baseline")
+        return 0
+    regressions = compare_to_baseline(
+        results,
+        json.loads(args.baseline.read_text()),
+        args.time_tolerance,
+        args.memory_tolerance,
+        args.count_tolerance,
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+"""Generator of synthetic environments the benchmarks run in.
+
+An environment consists of a ``site-packages`` directory with the metadata of the
+distributions, the source directories of editable and local installations,
+``git`` repositories written object by object (so ``git`` isn't needed to create them)
+and a ``bin`` directory containing a fake ``git`` executable, which answers the
+commands run by verbose-version-info without touching the network or a real ``git``.
+"""
+import hashlib
+import json
+import os
+import stat
+import sys
+import zlib
+from pathlib import Path
+from textwrap import dedent
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+
+EMPTY_TREE_ID = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+FIRST_COMMIT_TIME = 1_600_000_000
+
+FAKE_GIT_SCRIPT = dedent(
+    '''\
+    """Fake git executable answering the commands run by verbose-version-info."""
+    import sys
+    from pathlib import Path
+
+
+    def head_commit_id():
+        git_dir = Path(".git")
+        head = (git_dir / "HEAD").read_text().strip()
+        if head.startswith("ref: "):
+            return (git_dir / head[len("ref: "):]).read_text().strip()
+        return head
+
+
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command in ("status", "diff-index"):
+        # the synthetic checkouts are always clean
+        sys.exit(0)
+    if command in ("log", "rev-parse"):
+        print(head_commit_id())
+        sys.exit(0)
+    if command == "cat-file":
+        # the batch protocol isn't faked, so lookups fall back to 'git log'
+        for line in sys.stdin:
+            sys.stdout.write(f"{line.strip()} missing\\n")
+            sys.stdout.flush()
+        sys.exit(0)
+    sys.exit(1)
+    '''
+)
+
+
+class SyntheticEnvironmentConfig(NamedTuple):
+    """Number of distributions of each kind in a synthetic environment.
+
+    All distributions which aren't one of the other kinds are installed like from PyPI.
+    """
+
+    distributions: int = 10_000
+    record_size: int = 20
+    egg_links: int = 20
+    pep660_editables: int = 100
+    vcs_urls: int = 500
+    archive_urls: int = 500
+    local_installs: int = 200
+    git_repos: int = 20
+    commits_per_repo: int = 50
+
+
+class SyntheticEnvironment(NamedTuple):
+    """Paths and distribution names of a created synthetic environment."""
+
+    site_packages: Path
+    path_entries: List[str]
+    bin_dir: Path
+    distribution_names: List[str]
+    head_commit_ids: Dict[str, str]
+
+
+def write_git_object(git_dir: Path, object_type: str, content: bytes) -> str:
+    """Write a loose object to a git repository.
+
+    Parameters
+    ----------
+    git_dir : Path
+        ``.git`` directory of the repository.
+    object_type : str
+        Type of the object e.g. ``"commit"``.
+    content : bytes
+        Content of the object.
+
+    Returns
+    -------
+    str
+        Id of the object.
+    """
+    raw_object = f"{object_type} {len(content)}\0".encode() + content
+    object_id = hashlib.sha1(raw_object).hexdigest()
+    object_path = git_dir / "objects" / object_id[:2] / object_id[2:]
+    object_path.parent.mkdir(parents=True, exist_ok=True)
+    object_path.write_bytes(zlib.compress(raw_object))
+    return object_id
+
+
+def create_git_repo(repo_path: Path, commits: int) -> str:
+    """Create a repository with a linear history of empty commits one hour apart.
+
+    Parameters
+    ----------
+    repo_path : Path
+        Worktree of the repository.
+    commits : int
+        Number of commits.
+
+    Returns
+    -------
+    str
+        Id of the ``HEAD`` commit.
+    """
+    git_dir = repo_path / ".git"
+    (git_dir / "refs" / "heads").mkdir(parents=True)
+    parent: Optional[str] = None
+    for index in range(commits):
+        timestamp = FIRST_COMMIT_TIME + index * 3600
+        lines = [f"tree {EMPTY_TREE_ID}"]
+        if parent is not None:
+            lines.append(f"parent {parent}")
+        lines.append(f"author vv-info <vv-info@example.com> {timestamp} +0000")
+        lines.append(f"committer vv-info <vv-info@example.com> {timestamp} +0000")
+        lines.append("")
+        lines.append(f"commit {index}")
+        parent = write_git_object(git_dir, "commit", ("\n".join(lines) + "\n").encode())
+    (git_dir / "HEAD").write_text("ref: refs/heads/main\n")
+    (git_dir / "refs" / "heads" / "main").write_text(f"{parent}\n")
+    (git_dir / "index").write_bytes(b"")
+    return parent or ""
+
+
+def write_fake_git(bin_dir: Path) -> Path:
+    """Write the fake ``git`` executable.
+
+    Parameters
+    ----------
+    bin_dir : Path
+        Directory which is prepended to ``PATH`` while running the benchmarks.
+
+    Returns
+    -------
+    Path
+        Path of the executable.
+    """
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    if sys.platform.startswith("win"):  # pragma: no cover
+        script = bin_dir / "fake_git.py"
+        script.write_text(FAKE_GIT_SCRIPT)
+        executable = bin_dir / "git.bat"
+        executable.write_text(f'@"{sys.executable}" "{script}" %*\n')
+        return executable
+    executable = bin_dir / "git"
+    executable.write_text(f"#!{sys.executable}\n{FAKE_GIT_SCRIPT}")
+    executable.chmod(executable.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return executable
+
+
+def write_dist_info(
+    site_packages: Path,
+    distribution_name: str,
+    version: str,
+    record_size: int,
+    direct_url: Optional[dict] = None,
+) -> Path:
+    """Write the ``*.dist-info`` directory of a distribution.
+
+    Parameters
+    ----------
+    site_packages : Path
+        Directory the distribution is installed in.
+    distribution_name : str
+        Name of the distribution.
+    version : str
+        Version of the distribution.
+    record_size : int
+        Number of files of the distribution listed in RECORD (not written to disk).
+    direct_url : Optional[dict]
+        Content of ``direct_url.json``, by default None
+
+    Returns
+    -------
+    Path
+        The ``*.dist-info`` directory.
+    """
+    module_name = distribution_name.replace("-", "_")
+    dist_info = site_packages / f"{module_name}-{version}.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text(
+        f"Metadata-Version: 2.1\nName: {distribution_name}\nVersion: {version}\n"
+        f"Summary: Synthetic distribution {distribution_name}\n\n"
+        f"Long description of {distribution_name}.\n"
+    )
+    (dist_info / "INSTALLER").write_text("pip\n")
+    record_lines = [
+        f"{module_name}/module_{index}.py,sha256=AAAA,{index}" for index in range(record_size)
+    ]
+    for file_name in ("METADATA", "INSTALLER"):
+        record_lines.append(f"{dist_info.name}/{file_name},,")
+    if direct_url is not None:
+        (dist_info / "direct_url.json").write_text(json.dumps(direct_url))
+        record_lines.append(f"{dist_info.name}/direct_url.json,,")
+    record_lines.append(f"{dist_info.name}/RECORD,,")
+    (dist_info / "RECORD").write_text("\n".join(record_lines) + "\n")
+    return dist_info
+
+
+def create_synthetic_environment(
+    root: Path, config: SyntheticEnvironmentConfig
+) -> SyntheticEnvironment:
+    """Create a synthetic environment.
+
+    The first distributions are the editable and local installations, followed by the
+    installations from vcs and archive urls, the remaining ones are installed like
+    from PyPI. Local installations are spread over subdirectories of the repositories,
+    every fourth one isn't inside of a repository.
+
+    Parameters
+    ----------
+    root : Path
+        Empty directory to create the environment in.
+    config : SyntheticEnvironmentConfig
+        Number of distributions of each kind.
+
+    Returns
+    -------
+    SyntheticEnvironment
+        Created environment.
+    """
+    site_packages = root / "site-packages"
+    site_packages.mkdir(parents=True)
+    sources = root / "sources"
+    repos = [root / "repos" / f"repo-{index}" for index in range(config.git_repos)]
+    head_commit_ids = {str(repo): create_git_repo(repo, config.commits_per_repo) for repo in repos}
+    path_entries = [str(site_packages)]
+    distribution_names = []
+    kind_ends: List[int] = []
+    for count in (
+        config.egg_links,
+        config.pep660_editables,
+        config.local_installs,
+        config.vcs_urls,
+        config.archive_urls,
+    ):
+        kind_ends.append((kind_ends[-1] if kind_ends else 0) + count)
+    egg_links_end, pep660_end, local_end, vcs_end, archive_end = kind_ends
+    record_size = config.record_size
+
+    for index in range(config.distributions):
+        distribution_name = f"synthetic-dist-{index}"
+        version = f"1.{index % 100}.{index}"
+        distribution_names.append(distribution_name)
+        if index < local_end:
+            if repos and index % 4:
+                source_dir = repos[index % len(repos)] / "packages" / distribution_name
+            else:
+                source_dir = sources / distribution_name
+            source_dir.mkdir(parents=True)
+        if index < egg_links_end:
+            egg_info = source_dir / f"{distribution_name.replace('-', '_')}.egg-info"
+            egg_info.mkdir()
+            (egg_info / "PKG-INFO").write_text(
+                f"Metadata-Version: 2.1\nName: {distribution_name}\nVersion: {version}\n"
+            )
+            (site_packages / f"{distribution_name}.egg-link").write_text(f"{source_dir}\n.\n")
+            path_entries.append(str(source_dir))
+        elif index < pep660_end:
+            direct_url = {"url": source_dir.as_uri(), "dir_info": {"editable": True}}
+            write_dist_info(site_packages, distribution_name, version, 2, direct_url)
+            pth_name = f"__editable__.{distribution_name.replace('-', '_')}-{version}.pth"
+            (site_packages / pth_name).write_text(f"{source_dir}\n")
+        elif index < local_end:
+            direct_url = {"url": source_dir.as_uri(), "dir_info": {}}
+            write_dist_info(site_packages, distribution_name, version, record_size, direct_url)
+        elif index < vcs_end:
+            direct_url = {
+                "url": f"https://example.com/{distribution_name}.git",
+                "vcs_info": {"vcs": "git", "commit_id": f"{index:040x}"},
+            }
+            write_dist_info(site_packages, distribution_name, version, record_size, direct_url)
+        elif index < archive_end:
+            direct_url = {
+                "url": f"https://example.com/{distribution_name}/archive/main.zip",
+                "archive_info": {},
+            }
+            write_dist_info(site_packages, distribution_name, version, record_size, direct_url)
+        else:
+            write_dist_info(site_packages, distribution_name, version, record_size)
+
+    bin_dir = root / "bin"
+    write_fake_git(bin_dir)
+    # installations happened after the last commit
+    install_time = FIRST_COMMIT_TIME + config.commits_per_repo * 3600
+    for dist_info in site_packages.iterdir():
+        os.utime(dist_info, (install_time, install_time))
+    return SyntheticEnvironment(
+        site_packages=site_packages,
+        path_entries=path_entries,
+        bin_dir=bin_dir,
+        distribution_names=distribution_names,
+        head_commit_ids=head_commit_ids,
+    )
@@ -1,7 +1,15 @@
 """Pytest fixturesfor the testsuite."""
+import json
 import os
+import shutil
+import subprocess
 from copy import copy
 from datetime import datetime
+from datetime import timedelta
+from pathlib import Path
+from typing import List
+from typing import Optional
+from typing import Tuple
 
 import pytest
 from _pytest.monkeypatch import MonkeyPatch
@@ -45,3 +53,96 @@ def dirty_vsc_path():
         yield vsc_root
     finally:
         temp_file.unlink()
+
+
+@pytest.fixture
+def fake_site_packages(tmp_path: Path, monkeypatch: MonkeyPatch):
+    """Site-packages folder on ``sys.path`` to create dist-info dirs in."""
+    site_packages = tmp_path / "site-packages"
+    site_packages.mkdir()
+    monkeypatch.syspath_prepend(str(site_packages))
+
+    def create_dist_info(
+        distribution_name: str, version: str, direct_url: Optional[dict] = None
+    ) -> Path:
+        dist_info = site_packages / f"{distribution_name.replace('-', '_')}-{version}.dist-info"
+        dist_info.mkdir()
+        (dist_info / "METADATA").write_text(
+            f"Metadata-Version: 2.1\nName: {distribution_name}\nVersion: {version}\n\n"
+        )
+        record_lines = [f"{dist_info.name}/METADATA,,", f"{dist_info.name}/RECORD,,"]
+        if direct_url is not None:
+            (dist_info / "direct_url.json").write_text(json.dumps(direct_url))
+            record_lines.append(f"{dist_info.name}/direct_url.json,,")
+        (dist_info / "RECORD").write_text("\n".join(record_lines) + "\n")
+        return dist_info
+
+    yield create_dist_info
+
+
+def run_git(repo_path: Path, *args: str, date: Optional[datetime] = None) -> str:
+    """Run git in ``repo_path`` with a fixed author and optionally a fixed date."""
+    env = {
+        **os.environ,
+        "GIT_AUTHOR_NAME": "vv-info",
+        "GIT_AUTHOR_EMAIL": "vv-info@example.com",
+        "GIT_COMMITTER_NAME": "vv-info",
+        "GIT_COMMITTER_EMAIL": "vv-info@example.com",
+    }
+    if date is not None:
+        env["GIT_AUTHOR_DATE"] = env["GIT_COMMITTER_DATE"] = date.isoformat()
+    output = subprocess.run(
+        ("git", *args), cwd=repo_path, env=env, stdout=subprocess.PIPE, check=True
+    )
+    return output.stdout.decode().strip()
+
+
+GIT_REPO_COMMIT_DATES = (datetime(2021, 2, 20), datetime(2021, 2, 28))
+
+
+@pytest.fixture
+def git_repo(tmp_path: Path) -> Tuple[Path, List[str]]:
+    """Git repository with a commit before and after MTIME_DATE_PAST.
+
+    Returns the repository path and the commit ids in creation order.
+    """
+    if shutil.which("git") is None:
+        pytest.skip("git isn't installed")
+    repo_path = tmp_path / "git_repo"
+    repo_path.mkdir()
+    run_git(repo_path, "init", "-q", "-b", "main")
+    commit_ids = []
+    for index, date in enumerate(GIT_REPO_COMMIT_DATES):
+        (repo_path / "file.txt").write_text(str(index))
+        run_git(repo_path, "add", "file.txt")
+        run_git(repo_path, "commit", "-q", "-m", f"commit {index}", date=date)
+        commit_ids.append(run_git(repo_path, "rev-parse", "HEAD"))
+    yield repo_path, commit_ids
+
+
+@pytest.fixture
+def merge_history_repo(tmp_path: Path):
+    """Repository with a merge and an octopus merge and commits on consecutive days."""
+    if shutil.which("git") is None:
+        pytest.skip("git isn't installed")
+    repo_path = tmp_path / "merge_repo"
+    repo_path.mkdir()
+    run_git(repo_path, "init", "-q", "-b", "main")
+    dates = iter(datetime(2021, 1, 1) + timedelta(days=day) for day in range(20))
+    large_content = "\n".join(f"line {index}" for index in range(500))
+
+    def commit(file_name: str, content: str):
+        (repo_path / file_name).write_text(content)
+        run_git(repo_path, "add", file_name)
+        run_git(repo_path, "commit", "-q", "-m", file_name, date=next(dates))
+
+    commit("large.txt", large_content)
+    for branch in ("feature-1", "feature-2", "feature-3"):
+        run_git(repo_path, "checkout", "-q", "-b", branch, "main")
+        commit(f"{branch}.txt", branch)
+        run_git(repo_path, "checkout", "-q", "main")
+        commit("large.txt", f"{large_content}\n{branch}")
+    run_git(repo_path, "merge", "-q", "--no-edit", "feature-1", date=next(dates))
+    run_git(repo_path, "merge", "-q", "--no-edit", "feature-2", "feature-3", date=next(dates))
+    commit("large.txt", f"{large_content}\nlast")
+    yield repo_path, [datetime(2021, 1, 1) + timedelta(days=day) for day in range(-1, 12)]
@@ -0,0 +1,163 @@
+"""Tests for the ``aio`` module"""
+import asyncio
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+import verbose_version_info.aio
+from verbose_version_info.aio import async_git_dir_commit_id
+from verbose_version_info.aio import async_memoized
+from verbose_version_info.aio import async_run_vcs_commit_id_command
+from verbose_version_info.aio import avv_info
+from verbose_version_info.aio import avv_info_many
+from verbose_version_info.aio import run_command
+from verbose_version_info.data_containers import VcsInfo
+from verbose_version_info.vcs import UncommittedChangesWarning
+from verbose_version_info.vcs import active_vcs_session
+from verbose_version_info.vcs import vcs_session
+from verbose_version_info.verbose_version_info import vv_info
+
+
+@pytest.mark.parametrize(
+    "command_str,need_to_exist_path_child,expected",
+    (
+        ("print('foo')", ".", ("dummy", "foo")),
+        ("syntax-error = 1", ".", None),
+        ("print(foo)", "none_existing_child", None),
+    ),
+)
+def test_async_run_vcs_commit_id_command(
+    tmp_path: Path, command_str: str, need_to_exist_path_child: str, expected: str
+):
+    """Same execution paths as for the synchronous version."""
+    result = asyncio.run(
+        async_run_vcs_commit_id_command(
+            vcs_name="dummy",
+            commit_id_command=(sys.executable, "-c", command_str),
+            local_install_basepath=tmp_path,
+            need_to_exist_path_child=need_to_exist_path_child,
+        )
+    )
+
+    assert result == expected
+
+
+def test_run_command_cancelled(tmp_path: Path):
+    """The subprocess is killed if the awaiting task is cancelled."""
+    command = (sys.executable, "-c", "import time;time.sleep(30)")
+    start = time.perf_counter()
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(asyncio.wait_for(run_command(command, tmp_path), 0.5))
+
+    assert time.perf_counter() - start < 10
+
+
+def test_async_memoized_cancelled_awaiter():
+    """Cancelling one awaiter doesn't cancel the computation the others are awaiting."""
+    calls = []
+
+    async def compute() -> str:
+        calls.append("compute")
+        await asyncio.sleep(0.1)
+        return "value"
+
+    async def cancel_first_awaiter() -> str:
+        with vcs_session() as session:
+            first = asyncio.ensure_future(async_memoized(session, "key", compute))
+            second = asyncio.ensure_future(async_memoized(session, "key", compute))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            return await second
+
+    assert asyncio.run(cancel_first_awaiter()) == "value"
+    assert calls == ["compute"]
+
+
+def test_async_git_dir_commit_id_executor(monkeypatch: MonkeyPatch, tmp_path: Path):
+    """The git directory is read off the event loop, in the context of the caller."""
+    reads = []
+
+    def recording_last_commit_id(local_install_basepath: Path, dist_mtime: datetime) -> None:
+        reads.append((threading.current_thread(), active_vcs_session()))
+
+    monkeypatch.setattr(
+        verbose_version_info.aio, "git_dir_last_commit_id", recording_last_commit_id
+    )
+
+    async def read_commit_id() -> object:
+        with vcs_session() as session:
+            assert await async_git_dir_commit_id(tmp_path, datetime.now()) is None
+            return session
+
+    session = asyncio.run(read_commit_id())
+
+    assert len(reads) == 1
+    assert reads[0][0] is not threading.main_thread()
+    assert reads[0][1] is session
+
+
+def test_avv_info(
+    monkeypatch: MonkeyPatch, tmp_path: Path, fake_site_packages: Callable[..., Path]
+):
+    """Same results as vv_info and the vcs readers are awaited."""
+    source_dir = tmp_path / "async_source"
+    source_dir.mkdir()
+    direct_url = {"url": source_dir.as_uri(), "dir_info": {}}
+    fake_site_packages("async-dist", "0.1.0", direct_url=direct_url)
+    fake_site_packages("async-dist-vcs", "0.2.0", direct_url=direct_url)
+
+    async def fake_reader(local_install_basepath: Path, dist_mtime: datetime) -> Optional[VcsInfo]:
+        await asyncio.sleep(0)
+        return VcsInfo(vcs_name="fake", commit_id=local_install_basepath.name)
+
+    assert asyncio.run(avv_info("async-dist")) == vv_info("async-dist")
+
+    monkeypatch.setattr(verbose_version_info.aio, "ASYNC_VCS_COMMIT_ID_READERS", [fake_reader])
+    result = asyncio.run(avv_info("async-dist-vcs"))
+
+    assert result.release_version == "0.2.0"
+    assert result.url == source_dir.as_uri()
+    assert result.vcs_name == "fake"
+    assert result.commit_id == "async_source"
+
+
+def test_avv_info_many(fake_site_packages: Callable[..., Path]):
+    """Results are in input order."""
+    fake_site_packages("async-many-a", "0.1.0")
+    fake_site_packages("async-many-b", "0.2.0")
+    distribution_names = ["async-many-b", "not-a-distribution", "async-many-a"]
+
+    result = asyncio.run(avv_info_many(distribution_names, max_concurrency=2))
+
+    assert [vv_info.release_version for vv_info in result] == ["0.2.0", "Unknown", "0.1.0"]
+
+
+def test_avv_info_many_shared_repository(
+    git_repo: Tuple[Path, List[str]], fake_site_packages: Callable[..., Path]
+):
+    """Distributions installed from the same repository share the vcs lookups."""
+    repo_path, commit_ids = git_repo
+    (repo_path / "uncommited_file").touch()
+    distribution_names = [f"async-shared-repo-dist-{index}" for index in range(3)]
+    for distribution_name in distribution_names:
+        direct_url = {"url": repo_path.as_uri(), "dir_info": {"editable": True}}
+        fake_site_packages(distribution_name, "0.1.0", direct_url=direct_url)
+
+    with pytest.warns(UncommittedChangesWarning) as recorded_warnings:
+        result = asyncio.run(avv_info_many(distribution_names))
+
+    assert [vv_info.commit_id for vv_info in result] == [commit_ids[-1]] * 3
+    assert [vv_info.dirty for vv_info in result] == [True] * 3
+    assert len(recorded_warnings) == 1
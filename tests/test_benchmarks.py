@@ -0,0 +1,57 @@
+"""Smoke tests for the ``benchmarks`` suite"""
+from pathlib import Path
+
+from benchmarks.run import SCENARIOS
+from benchmarks.run import activated_environment
+from benchmarks.run import compare_to_baseline
+from benchmarks.run import run_benchmarks
+from benchmarks.synthetic_env import SyntheticEnvironmentConfig
+from benchmarks.synthetic_env import create_synthetic_environment
+
+from verbose_version_info.verbose_version_info import vv_info
+
+TINY_CONFIG = SyntheticEnvironmentConfig(
+    distributions=30,
+    record_size=3,
+    egg_links=2,
+    pep660_editables=2,
+    vcs_urls=4,
+    archive_urls=4,
+    local_installs=4,
+    git_repos=2,
+    commits_per_repo=3,
+)
+
+
+def test_synthetic_environment(tmp_path: Path):
+    """Distributions in the synthetic environment resolve like real ones."""
+    environment = create_synthetic_environment(tmp_path, TINY_CONFIG)
+
+    assert len(environment.distribution_names) == TINY_CONFIG.distributions
+
+    with activated_environment(environment):
+        # local installation inside of 'repo-1'
+        local_install = vv_info("synthetic-dist-5")
+        vcs_install = vv_info("synthetic-dist-8")
+        pypi_install = vv_info("synthetic-dist-29")
+
+    assert local_install.commit_id == environment.head_commit_ids[str(tmp_path / "repos/repo-1")]
+    assert local_install.vcs_name == "git"
+    assert vcs_install.commit_id == f"{8:040x}"
+    assert vcs_install.url == "https://example.com/synthetic-dist-8.git"
+    assert pypi_install.release_version == "1.29.29"
+    assert pypi_install.commit_id == ""
+
+
+def test_run_benchmarks():
+    """All scenarios are measured and a run doesn't regress compared to itself."""
+    results = run_benchmarks(TINY_CONFIG, sample_size=5)
+
+    assert set(results["scenarios"]) == set(SCENARIOS)
+    assert results["scenarios"]["vv_info_all"]["calls"] == TINY_CONFIG.distributions
+    for measured in results["scenarios"].values():
+        assert set(measured) == {"calls", "total_ms", "per_call_ms", "peak_memory_kib", "counts"}
+        assert measured["counts"]["stat"] > 0
+
+    assert compare_to_baseline(results, results) == []
+    assert compare_to_baseline(results, {**results, "sample_size": 6}) != []
@@ -0,0 +1,301 @@
+"""Tests for the ``cache`` module"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Callable
+from typing import List
+from typing import Tuple
+
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from tests import MTIME_DATE_PAST
+from tests.conftest import run_git
+
+import verbose_version_info.cache
+import verbose_version_info.vcs
+from verbose_version_info.cache import CACHE_FILE_NAME
+from verbose_version_info.cache import VvInfoCache
+from verbose_version_info.cache import cached_vv_info
+from verbose_version_info.cache import default_cache_dir
+from verbose_version_info.cache import get_cache
+from verbose_version_info.data_containers import VerboseVersionInfo
+from verbose_version_info.settings import CACHE_SETTINGS
+from verbose_version_info.settings import VCS_SETTINGS
+from verbose_version_info.utils import DISTRIBUTION_CACHE
+from verbose_version_info.utils import time_budget
+from verbose_version_info.vcs import UncommittedChangesWarning
+from verbose_version_info.verbose_version_info import vv_info
+
+
+@pytest.fixture
+def cache_dir(tmp_path: Path, monkeypatch: MonkeyPatch):
+    """Enabled cache using a temporary cache dir."""
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(verbose_version_info.cache, "_CACHE", None)
+    monkeypatch.setitem(CACHE_SETTINGS, "enabled", True)
+    monkeypatch.setitem(CACHE_SETTINGS, "cache_dir", str(cache_dir))
+    yield cache_dir
+
+
+def counting_resolver(result: VerboseVersionInfo, calls: List[str]):
+    """Resolver returning ``result`` and counting its calls."""
+
+    def resolve(dist):
+        calls.append(dist)
+        return result
+
+    return resolve
+
+
+def test_cached_vv_info_disabled(fake_site_packages: Callable[..., Path]):
+    """Without enabling the cache every call resolves the result."""
+    fake_site_packages("cached-dist", "1.0")
+    calls: List[str] = []
+    resolve = counting_resolver(VerboseVersionInfo("1.0", MTIME_DATE_PAST), calls)
+
+    cached_vv_info("cached-dist", resolve)
+    cached_vv_info("cached-dist", resolve)
+
+    assert len(calls) == 2
+
+
+def test_cached_vv_info(fake_site_packages: Callable[..., Path], cache_dir: Path):
+    """Results are cached until the dist-info dir changes and persisted on save."""
+    dist_info = fake_site_packages("cached-dist-persisted", "1.0")
+    calls: List[str] = []
+    expected = VerboseVersionInfo("1.0", MTIME_DATE_PAST, url="https://foo.bar")
+    resolve = counting_resolver(expected, calls)
+
+    assert cached_vv_info("cached-dist-persisted", resolve) == expected
+    assert cached_vv_info("Cached_Dist_Persisted", resolve) == expected
+    assert len(calls) == 1
+
+    get_cache().save()
+    assert (cache_dir / CACHE_FILE_NAME).is_file()
+    reloaded_cache = VvInfoCache(cache_dir / CACHE_FILE_NAME, 10)
+    assert reloaded_cache.lookup(dist_info) == expected
+
+    (dist_info / "INSTALLER").write_text("pip")
+    os.utime(dist_info, ns=(0, 0))
+
+    assert cached_vv_info("cached-dist-persisted", resolve) == expected
+    assert len(calls) == 2
+
+
+def test_cached_vv_info_other_environment(
+    fake_site_packages: Callable[..., Path],
+    cache_dir: Path,
+    tmp_path: Path,
+    monkeypatch: MonkeyPatch,
+):
+    """Environments sharing the cache directory don't use each others entries."""
+    fake_site_packages("shared-dist", "1.0")
+    assert vv_info("shared-dist").release_version == "1.0"
+    get_cache().save()
+
+    other_site_packages = tmp_path / "other-site-packages"
+    other_dist_info = other_site_packages / "shared_dist-2.0.dist-info"
+    other_dist_info.mkdir(parents=True)
+    (other_dist_info / "METADATA").write_text(
+        "Metadata-Version: 2.1\nName: shared-dist\nVersion: 2.0\n\n"
+    )
+    monkeypatch.setattr(sys, "path", [str(other_site_packages), *sys.path[1:]])
+    monkeypatch.setattr(verbose_version_info.cache, "_CACHE", None)
+    DISTRIBUTION_CACHE.clear()
+
+    assert vv_info("shared-dist").release_version == "2.0"
+    assert len(get_cache()) == 2
+
+
+def test_cached_vv_info_vcs_checkout_changed(
+    fake_site_packages: Callable[..., Path],
+    cache_dir: Path,
+    git_repo: Tuple[Path, List[str]],
+    monkeypatch: MonkeyPatch,
+):
+    """Ref changes invalidate the entry and the dirty state can be checked on each lookup."""
+    repo_path, commit_ids = git_repo
+    monkeypatch.setitem(VCS_SETTINGS, "warn_dirty", True)
+    monkeypatch.setitem(CACHE_SETTINGS, "recheck_dirty", True)
+    fake_site_packages("cached-dist-vcs", "1.0")
+    calls: List[str] = []
+    expected = VerboseVersionInfo(
+        "1.0",
+        MTIME_DATE_PAST,
+        url=repo_path.as_uri(),
+        commit_id=commit_ids[-1],
+        vcs_name="git",
+        dirty=False,
+    )
+    resolve = counting_resolver(expected, calls)
+
+    assert cached_vv_info("cached-dist-vcs", resolve) == expected
+    assert cached_vv_info("cached-dist-vcs", resolve) == expected
+    assert len(calls) == 1
+
+    (repo_path / "file.txt").write_text("uncommitted")
+    # editing a tracked file doesn't change the index the in process memo is bound to
+    verbose_version_info.vcs._DIRTY_RESULTS.clear()
+    with pytest.warns(UncommittedChangesWarning):
+        assert cached_vv_info("cached-dist-vcs", resolve).dirty is True
+    assert len(calls) == 1
+
+    verbose_version_info.vcs._DIRTY_RESULTS.clear()
+    with time_budget(0):
+        skipped_dirty = cached_vv_info("cached-dist-vcs", resolve)
+    assert skipped_dirty == expected._replace(dirty=None, skipped_stages=("dirty",))
+    assert len(calls) == 1
+
+    # amending the last commit only changes the ref of the branch
+    run_git(repo_path, "commit", "-q", "--amend", "-m", "amended")
+    cached_vv_info("cached-dist-vcs", resolve)
+    assert len(calls) == 2
+
+    run_git(repo_path, "pack-refs", "--all")
+    cached_vv_info("cached-dist-vcs", resolve)
+    assert len(calls) == 3
+
+
+def test_cached_vv_info_hit_without_subprocess(
+    fake_site_packages: Callable[..., Path],
+    cache_dir: Path,
+    git_repo: Tuple[Path, List[str]],
+    monkeypatch: MonkeyPatch,
+):
+    """By default a cache hit doesn't check the dirty state again, so no vcs is run."""
+    repo_path, commit_ids = git_repo
+    fake_site_packages("cached-dist-hit", "1.0")
+    calls: List[str] = []
+    expected = VerboseVersionInfo(
+        "1.0",
+        MTIME_DATE_PAST,
+        url=repo_path.as_uri(),
+        commit_id=commit_ids[-1],
+        vcs_name="git",
+        dirty=True,
+    )
+    resolve = counting_resolver(expected, calls)
+    cached_vv_info("cached-dist-hit", resolve)
+
+    def raise_error(*args, **kwargs):
+        raise AssertionError("A cache hit shouldn't run a subprocess")
+
+    monkeypatch.setattr(subprocess, "Popen", raise_error)
+
+    assert cached_vv_info("cached-dist-hit", resolve) == expected._replace(dirty=None)
+    assert len(calls) == 1
+
+
+def test_cached_vv_info_worktree(
+    fake_site_packages: Callable[..., Path],
+    cache_dir: Path,
+    git_repo: Tuple[Path, List[str]],
+    tmp_path: Path,
+):
+    """Entries of linked worktrees, which have a ``.git`` file, are invalidated by commits."""
+    repo_path, commit_ids = git_repo
+    worktree = tmp_path / "worktree"
+    run_git(repo_path, "worktree", "add", "-q", "-b", "feature", str(worktree))
+    fake_site_packages("cached-dist-worktree", "1.0")
+    calls: List[str] = []
+    resolve = counting_resolver(
+        VerboseVersionInfo(
+            "1.0", MTIME_DATE_PAST, url=worktree.as_uri(), commit_id="foo", vcs_name="git"
+        ),
+        calls,
+    )
+
+    cached_vv_info("cached-dist-worktree", resolve)
+    cached_vv_info("cached-dist-worktree", resolve)
+    assert len(calls) == 1
+
+    (worktree / "new.txt").write_text("new")
+    run_git(worktree, "add", "new.txt")
+    run_git(worktree, "commit", "-q", "-m", "new")
+
+    cached_vv_info("cached-dist-worktree", resolve)
+    assert len(calls) == 2
+
+
+def test_cached_vv_info_other_vcs_not_cached(
+    fake_site_packages: Callable[..., Path], cache_dir: Path, tmp_path: Path
+):
+    """Results of local checkouts without key files aren't cached."""
+    fake_site_packages("cached-dist-hg", "1.0")
+    (tmp_path / "checkout" / ".hg").mkdir(parents=True)
+    calls: List[str] = []
+    result = VerboseVersionInfo(
+        "1.0",
+        MTIME_DATE_PAST,
+        url=(tmp_path / "checkout").as_uri(),
+        commit_id="foo",
+        vcs_name="hg",
+    )
+
+    cached_vv_info("cached-dist-hg", counting_resolver(result, calls))
+    cached_vv_info("cached-dist-hg", counting_resolver(result, calls))
+
+    assert len(calls) == 2
+    assert len(get_cache()) == 0
+
+
+def test_cached_vv_info_lru_eviction(
+    monkeypatch: MonkeyPatch, fake_site_packages: Callable[..., Path], cache_dir: Path
+):
+    """The least recently used entry is evicted first."""
+    monkeypatch.setitem(CACHE_SETTINGS, "max_entries", 2)
+    dist_infos = {
+        distribution_name: fake_site_packages(distribution_name, "1.0")
+        for distribution_name in ("dist-a", "dist-b", "dist-c")
+    }
+    resolve = counting_resolver(VerboseVersionInfo("1.0", MTIME_DATE_PAST), [])
+
+    cached_vv_info("dist-a", resolve)
+    cached_vv_info("dist-b", resolve)
+    cached_vv_info("dist-a", resolve)
+    cached_vv_info("dist-c", resolve)
+
+    cache = get_cache()
+    assert len(cache) == 2
+    assert cache.lookup(dist_infos["dist-b"]) is None
+    assert cache.lookup(dist_infos["dist-a"]) is not None
+    assert cache.lookup(dist_infos["dist-c"]) is not None
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_cached_vv_info_not_found_not_cached(cache_dir: Path):
+    """Distributions which aren't installed don't get a cache entry."""
+    assert vv_info("not-a-distribution").release_version == "Unknown"
+    assert len(get_cache()) == 0
+
+
+def test_cached_vv_info_partial_not_cached(
+    fake_site_packages: Callable[..., Path], cache_dir: Path
+):
+    """Results with skipped stages aren't cached, complete ones are."""
+    fake_site_packages("partial-dist", "1.0")
+
+    assert vv_info("partial-dist", deadline=0).skipped_stages == ("url", "vcs", "dirty")
+    assert len(get_cache()) == 0
+    assert vv_info("partial-dist").skipped_stages == ()
+    assert vv_info("partial-dist", deadline=0).skipped_stages == ()
+    assert len(get_cache()) == 1
+
+
+def test_broken_cache_file(tmp_path: Path):
+    """Broken cache files are ignored."""
+    cache_file = tmp_path / CACHE_FILE_NAME
+    cache_file.write_text("{not json")
+
+    assert len(VvInfoCache(cache_file, 10)) == 0
+
+
+def test_default_cache_dir(monkeypatch: MonkeyPatch, tmp_path: Path):
+    """XDG_CACHE_HOME is respected."""
+    monkeypatch.setattr(verbose_version_info.cache.sys, "platform", "linux")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+    assert default_cache_dir() == tmp_path / "verbose-version-info"
@@ -1,29 +1,129 @@
 """Tests for the CLI"""
+import io
 import re
+import subprocess
 import sys
+from pathlib import Path
+from typing import Callable
+from typing import List
+from typing import Optional
 
 import pytest
+from _pytest.capture import CaptureFixture
 from _pytest.monkeypatch import MonkeyPatch
-from typer.testing import CliRunner
 
-from verbose_version_info.cli import cli
+from verbose_version_info.cli import CliOptions
+from verbose_version_info.cli import main
+from verbose_version_info.cli import parse_fast_path
+from verbose_version_info.cli import report
+from verbose_version_info.export import load_vv_info
 
 
-def test_missing_cli_extra_requires(monkeypatch: MonkeyPatch):
-    """Exception raised if cli extra_requires is missing"""
-    monkeypatch.delitem(sys.modules, "verbose_version_info.cli")
+def test_missing_cli_extra_requires(monkeypatch: MonkeyPatch, capsys: CaptureFixture):
+    """Exception raised if cli extra_requires is missing and typer is needed."""
     monkeypatch.setitem(sys.modules, "typer", None)
 
+    assert main(["--format", "jsonl", "pytest"]) == 0
+    assert '"distribution_name": "pytest"' in capsys.readouterr().out
+
     with pytest.raises(ImportError, match=r"pip install verbose-version-info\[cli\]"):
-        import verbose_version_info.cli  # noqa: F401
+        main(["--help"])
+
+
+def test_fast_path_imports():
+    """Machine readable formats neither import typer nor rich."""
+    code = (
+        "import sys\n"
+        "from verbose_version_info.cli import main\n"
+        "main(['--format', 'jsonl', '--no-vcs', 'pytest'])\n"
+        "assert 'typer' not in sys.modules and 'rich' not in sys.modules, 'slow import'\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+
+    assert result.returncode == 0, result.stderr.decode()
+    assert b'"distribution_name": "pytest"' in result.stdout
+
+
+@pytest.mark.parametrize(
+    "args, expected",
+    (
+        ([], CliOptions([])),
+        (["foo", "--", "-bar"], CliOptions(["foo", "-bar"])),
+        (
+            ["-j", "4", "--format=JSONL", "--no-vcs", "foo"],
+            CliOptions(["foo"], jobs=4, output_format="jsonl", vcs=False),
+        ),
+        (["--jobs=2", "-f", "csv"], CliOptions([], jobs=2, output_format="csv")),
+        (["--help"], None),
+        (["--jobs", "0"], None),
+        (["--jobs"], None),
+        (["--format", "yaml"], None),
+    ),
+)
+def test_parse_fast_path(args: List[str], expected: Optional[CliOptions]):
+    """Valid arguments are parsed, all others are left to typer."""
+    assert parse_fast_path(args) == expected
+
+
+@pytest.mark.parametrize("output_format", ("jsonl", "csv", "json"))
+def test_report(fake_site_packages: Callable[..., Path], output_format: str):
+    """Reports can be loaded with the matching loader."""
+    fake_site_packages("cli-dist", "0.1.0")
+    file = io.StringIO(newline="")
+
+    count = report(CliOptions(["cli-dist", "pytest"], output_format=output_format), file)
+
+    file.seek(0)
+    loaded = dict(load_vv_info(file, output_format))
+
+    assert count == 2
+    assert loaded["cli-dist"].release_version == "0.1.0"
+    assert loaded["pytest"].release_version == pytest.__version__
+
+
+def test_report_no_vcs(
+    fake_site_packages: Callable[..., Path], tmp_path: Path, monkeypatch: MonkeyPatch
+):
+    """Without vcs local installations only get their url."""
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    fake_site_packages("local-dist", "0.1.0", direct_url={"url": source_dir.as_uri()})
+
+    def fail(*args, **kwargs):
+        raise AssertionError("No vcs should be run.")
+
+    monkeypatch.setattr(subprocess, "run", fail)
+    file = io.StringIO()
+
+    report(CliOptions(["local-dist"], output_format="jsonl", vcs=False), file)
+
+    file.seek(0)
+    ((_, result),) = load_vv_info(file)
+
+    assert result.url == source_dir.as_uri()
+    assert result.commit_id == ""
 
 
 def test_command_line_interface():
-    """Test the CLI."""
-    runner = CliRunner()
-    result = runner.invoke(cli)
+    """Test the typer CLI."""
+    typer_testing = pytest.importorskip("typer.testing")
+    from verbose_version_info.cli import cli
+
+    runner = typer_testing.CliRunner()
+    result = runner.invoke(cli, ["pytest"])
     assert result.exit_code == 0
-    assert "Not yet Implemented!" in result.output
+    assert re.search(r"distribution\s+version\s+commit\s+vcs\s+dirty\s+url", result.output)
+    assert re.search(rf"pytest\s+{re.escape(pytest.__version__)}", result.output)
+
+    jsonl_result = runner.invoke(cli, ["--format", "jsonl", "pytest"])
+    assert jsonl_result.exit_code == 0
+    assert '"distribution_name": "pytest"' in jsonl_result.output
+
+    invalid_result = runner.invoke(cli, ["--format", "yaml"])
+    assert invalid_result.exit_code == 2
     help_result = runner.invoke(cli, ["--help"])
     assert help_result.exit_code == 0
     assert re.search(r"--help\s+Show this message and exit\.", help_result.output) is not None
+    assert "--no-vcs" in help_result.output
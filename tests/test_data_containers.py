@@ -0,0 +1,76 @@
+"""Tests for the ``data_containers`` module"""
+import sys
+from datetime import datetime
+
+import pytest
+
+from verbose_version_info.data_containers import VerboseVersionInfo
+from verbose_version_info.data_containers import VersionTable
+
+RESULTS = {
+    "pypi-dist": VerboseVersionInfo("1.0.0", datetime(2021, 1, 2, 3, 4, 5, 123456)),
+    "git-dist": VerboseVersionInfo(
+        "0.1.0",
+        datetime(2021, 2, 3),
+        url="https://github.com/org/git-dist.git",
+        commit_id="a" * 40,
+        vcs_name="git",
+        dirty=True,
+    ),
+    "local-dist": VerboseVersionInfo(
+        "0.2.0",
+        datetime(2021, 2, 4),
+        url="file:///home/user/local-dist",
+        commit_id="a" * 40,
+        vcs_name="git",
+        dirty=False,
+        skipped_stages=("dirty",),
+    ),
+    "hg-dist": VerboseVersionInfo(
+        "2.0.0", datetime(2021, 3, 4), url="https://github.com/org/hg-dist", vcs_name="hg"
+    ),
+}
+
+
+def test_version_table():
+    """Rows are converted back to the same VerboseVersionInfo."""
+    table = VersionTable(RESULTS)
+
+    assert len(table) == 4
+    assert table.names == list(RESULTS)
+    assert list(table) == list(RESULTS.values())
+    assert table.to_dict() == RESULTS
+    assert table[-1] == RESULTS["hg-dist"]
+    assert table["git-dist"] == RESULTS["git-dist"]
+    assert repr(table) == "VersionTable(<4 rows>)"
+    # equal strings are stored once
+    assert table._commit_ids[1] is table._commit_ids[2] is sys.intern("a" * 40)
+    assert list(table._vcs_codes) == [0, 1, 1, 2]
+
+    with pytest.raises(KeyError):
+        table["not-a-distribution"]
+    with pytest.raises(IndexError):
+        table[4]
+
+
+def test_version_table_filter():
+    """Filtered views share the columns and can be filtered again."""
+    table = VersionTable(RESULTS.items())
+
+    git_table = table.filter_vcs("git")
+
+    assert git_table.names == ["git-dist", "local-dist"]
+    assert git_table[0] == RESULTS["git-dist"]
+    assert git_table._urls is table._urls
+    assert table.filter_vcs("").names == ["pypi-dist"]
+    assert len(table.filter_vcs("svn")) == 0
+    assert table.filter_url_prefix("https://github.com/").names == ["git-dist", "hg-dist"]
+    assert git_table.filter_url_prefix("https://").to_dict() == {"git-dist": RESULTS["git-dist"]}
+
+    with pytest.raises(TypeError):
+        git_table.append("new-dist", RESULTS["pypi-dist"])
+
+    table.append("new-dist", RESULTS["git-dist"])
+
+    assert len(table) == 5
+    assert len(git_table) == 2
@@ -0,0 +1,112 @@
+"""Tests for the ``export`` module"""
+import io
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+from typing import Iterator
+
+import pytest
+
+from verbose_version_info.data_containers import VerboseVersionInfo
+from verbose_version_info.export import EXPORT_FORMATS
+from verbose_version_info.export import NamedResult
+from verbose_version_info.export import export_vv_info
+from verbose_version_info.export import load_vv_info
+from verbose_version_info.export import write_jsonl
+
+RESULTS = [
+    ("pypi-dist", VerboseVersionInfo("1.0.0", datetime(2021, 1, 2, 3, 4, 5, 123456))),
+    (
+        "git-dist",
+        VerboseVersionInfo(
+            "0.1.0",
+            datetime(2021, 2, 3),
+            url="https://github.com/org/git-dist.git",
+            commit_id="a" * 40,
+            vcs_name="git",
+            dirty=True,
+        ),
+    ),
+    (
+        "local-dist",
+        VerboseVersionInfo(
+            "0.2.0",
+            datetime(2021, 2, 4),
+            url="file:///home/user/local-dist, with comma",
+            dirty=False,
+            skipped_stages=("vcs", "dirty"),
+        ),
+    ),
+]
+
+
+@pytest.mark.parametrize("export_format", EXPORT_FORMATS)
+def test_export_round_trip(export_format: str):
+    """Loaded results are the same as the written ones."""
+    file = io.StringIO(newline="")
+
+    assert EXPORT_FORMATS[export_format](iter(RESULTS), file) == len(RESULTS)
+
+    file.seek(0)
+    loaded = load_vv_info(file, export_format)
+
+    assert isinstance(loaded, Iterator)
+    assert list(loaded) == RESULTS
+
+    empty_file = io.StringIO(newline="")
+    EXPORT_FORMATS[export_format]([], empty_file)
+    empty_file.seek(0)
+
+    assert list(load_vv_info(empty_file, export_format)) == []
+
+
+def test_export_json_document():
+    """The json format is a valid document, reformatted documents can be loaded."""
+    file = io.StringIO()
+    EXPORT_FORMATS["json"](RESULTS, file)
+    document = json.loads(file.getvalue())
+
+    assert document["format_version"] == 1
+    assert document["distributions"][1]["dist_time"] == "2021-02-03T00:00:00"
+
+    reformatted = io.StringIO(json.dumps(document, indent=4))
+
+    assert list(load_vv_info(reformatted, "json")) == RESULTS
+
+    with pytest.raises(ValueError, match="format_version"):
+        list(load_vv_info(io.StringIO(json.dumps({"format_version": 0})), "json"))
+
+
+def test_write_jsonl_streams():
+    """Each result is written and flushed before the next one is requested."""
+    file = io.StringIO()
+
+    def results() -> Iterator[NamedResult]:
+        for index, result in enumerate(RESULTS):
+            assert file.getvalue().count("\n") == index
+            yield result
+
+    write_jsonl(results(), file)
+
+
+def test_unsupported_format():
+    """Unknown formats raise a ValueError listing the supported ones."""
+    with pytest.raises(ValueError, match="jsonl, csv, json"):
+        export_vv_info(io.StringIO(), "yaml")
+    with pytest.raises(ValueError, match="jsonl, csv, json"):
+        load_vv_info(io.StringIO(), "yaml")
+
+
+def test_export_vv_info(fake_site_packages: Callable[..., Path]):
+    """Resolved distributions are written in the requested order."""
+    fake_site_packages("export-dist", "0.1.0")
+    file = io.StringIO()
+
+    assert export_vv_info(file, "jsonl", ["Export_Dist", "not-a-distribution"]) == 2
+
+    file.seek(0)
+    (first_name, first), (second_name, second) = load_vv_info(file)
+
+    assert (first_name, first.release_version) == ("Export_Dist", "0.1.0")
+    assert (second_name, second.release_version) == ("not-a-distribution", "Unknown")
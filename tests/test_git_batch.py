@@ -0,0 +1,99 @@
+"""Tests for the ``git_batch`` module"""
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List
+from typing import Tuple
+
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from tests.conftest import run_git
+
+import verbose_version_info.git_batch
+from verbose_version_info.git_batch import batch_last_commit_before
+from verbose_version_info.git_batch import close_git_cat_file_batches
+from verbose_version_info.git_batch import git_cat_file_batch
+from verbose_version_info.settings import VCS_SETTINGS
+from verbose_version_info.utils import DeadlineExceeded
+from verbose_version_info.utils import time_budget
+
+
+def test_batch_last_commit_before(merge_history_repo: Tuple[Path, List[datetime]]):
+    """Same results as 'git log --before' using a single process."""
+    repo_path, timestamps = merge_history_repo
+    batch = git_cat_file_batch(repo_path)
+
+    for timestamp in timestamps:
+        expected = run_git(
+            repo_path, "log", f"--before={timestamp.isoformat()}", "-n", "1", "--pretty=%H"
+        )
+        assert batch_last_commit_before(repo_path, timestamp.timestamp()) == (expected or None)
+
+    assert git_cat_file_batch(repo_path) is batch
+    assert batch.running is True
+    assert batch.read_object("0" * 40) is None
+    assert batch.commit_info(run_git(repo_path, "rev-parse", "HEAD:large.txt")) is None
+
+    close_git_cat_file_batches()
+
+    assert batch.running is False
+    # restarted on the next request
+    assert batch_last_commit_before(repo_path, time.time()) == run_git(
+        repo_path, "rev-parse", "HEAD"
+    )
+    close_git_cat_file_batches()
+
+
+def test_idle_batch_processes_closed(
+    monkeypatch: MonkeyPatch, merge_history_repo: Tuple[Path, List[datetime]]
+):
+    """Processes are closed after not being used for the idle timeout."""
+    repo_path, _ = merge_history_repo
+    monkeypatch.setitem(VCS_SETTINGS, "git_batch_idle_timeout", 0.05)
+    batch = git_cat_file_batch(repo_path)
+
+    assert batch.read_object("HEAD") is not None
+    assert batch.running is True
+
+    deadline = time.monotonic() + 10
+    while batch.running and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert batch.running is False
+
+
+def test_dead_batch_process_closed(monkeypatch: MonkeyPatch, tmp_path: Path):
+    """A process which died while answering is closed, so the next request restarts it."""
+    monkeypatch.setattr(
+        verbose_version_info.git_batch,
+        "GIT_CAT_FILE_BATCH_COMMAND",
+        ("python", "-c", "import sys; sys.stdin.readline()"),
+    )
+    batch = git_cat_file_batch(tmp_path)
+
+    assert batch.read_object("HEAD") is None
+    assert batch.running is False
+
+
+def test_git_not_installed(monkeypatch: MonkeyPatch, tmp_path: Path):
+    """None if git can't be run."""
+    monkeypatch.setenv("PATH", "")
+
+    assert batch_last_commit_before(tmp_path, time.time()) is None
+    assert git_cat_file_batch(tmp_path).running is False
+
+
+def test_batch_killed_on_deadline(monkeypatch: MonkeyPatch, tmp_path: Path):
+    """A hanging process is killed when the time budget runs out."""
+    monkeypatch.setattr(
+        verbose_version_info.git_batch,
+        "GIT_CAT_FILE_BATCH_COMMAND",
+        ("python", "-c", "import time; time.sleep(30)"),
+    )
+    start = time.monotonic()
+
+    with time_budget(0.2), pytest.raises(DeadlineExceeded):
+        batch_last_commit_before(tmp_path, time.time())
+
+    assert time.monotonic() - start < 5
+    assert git_cat_file_batch(tmp_path).running is False
@@ -0,0 +1,269 @@
+"""Tests for the ``git_repository`` module"""
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import pytest
+from tests.conftest import run_git
+
+from verbose_version_info.git_repository import DEADLINE_CHECK_INTERVAL
+from verbose_version_info.git_repository import OBJECT_TYPE_BLOB
+from verbose_version_info.git_repository import GitObjectStore
+from verbose_version_info.git_repository import commit_time
+from verbose_version_info.git_repository import common_git_dir
+from verbose_version_info.git_repository import find_git_dir
+from verbose_version_info.git_repository import last_commit_before
+from verbose_version_info.git_repository import object_store
+from verbose_version_info.git_repository import packed_refs
+from verbose_version_info.git_repository import parse_commit_time
+from verbose_version_info.git_repository import ref_files
+from verbose_version_info.git_repository import resolve_ref
+from verbose_version_info.git_repository import walk_last_commit_before
+from verbose_version_info.utils import DeadlineExceeded
+from verbose_version_info.utils import time_budget
+
+COMMIT_ID_A = "a" * 40
+COMMIT_ID_B = "b" * 40
+
+
+@pytest.fixture
+def git_dir(tmp_path: Path):
+    """Handcrafted git directory with loose and packed refs."""
+    git_dir = tmp_path / "repo" / ".git"
+    (git_dir / "refs" / "heads").mkdir(parents=True)
+    (git_dir / "HEAD").write_text("ref: refs/heads/main\n")
+    (git_dir / "refs" / "heads" / "main").write_text(f"{COMMIT_ID_A}\n")
+    (git_dir / "packed-refs").write_text(
+        "# pack-refs with: peeled fully-peeled sorted\n"
+        f"{COMMIT_ID_B} refs/heads/packed\n"
+        f"{COMMIT_ID_A} refs/tags/v1.0\n"
+        f"^{COMMIT_ID_B}\n"
+    )
+    yield git_dir
+
+
+def test_find_git_dir(git_dir: Path, tmp_path: Path):
+    """.git dirs and .git files with 'gitdir:' are found."""
+    assert find_git_dir(git_dir.parent) == git_dir
+
+    worktree = tmp_path / "worktree"
+    worktree.mkdir()
+    (worktree / ".git").write_text("gitdir: ../repo/.git\n")
+
+    assert find_git_dir(worktree) == worktree / "../repo/.git"
+    assert find_git_dir(tmp_path) is None
+
+
+def test_resolve_ref(git_dir: Path):
+    """Symbolic, loose and packed refs are resolved."""
+    assert resolve_ref(git_dir) == COMMIT_ID_A
+    assert packed_refs(git_dir) == {
+        "refs/heads/packed": COMMIT_ID_B,
+        "refs/tags/v1.0": COMMIT_ID_A,
+    }
+
+    (git_dir / "HEAD").write_text("ref: refs/heads/packed\n")
+    assert resolve_ref(git_dir) == COMMIT_ID_B
+
+    (git_dir / "HEAD").write_text(f"{COMMIT_ID_B}\n")
+    assert resolve_ref(git_dir) == COMMIT_ID_B
+
+    (git_dir / "HEAD").write_text("ref: refs/heads/unborn\n")
+    assert resolve_ref(git_dir) is None
+
+    (git_dir / "HEAD").write_text("ref: HEAD\n")
+    assert resolve_ref(git_dir) is None
+
+
+def test_resolve_ref_linked_worktree(git_dir: Path):
+    """HEAD of linked worktree and refs from the common dir."""
+    worktree_git_dir = git_dir / "worktrees" / "feature"
+    worktree_git_dir.mkdir(parents=True)
+    (worktree_git_dir / "commondir").write_text("../..\n")
+    (worktree_git_dir / "HEAD").write_text("ref: refs/heads/packed\n")
+
+    assert common_git_dir(worktree_git_dir) == worktree_git_dir / "../.."
+    assert resolve_ref(worktree_git_dir) == COMMIT_ID_B
+
+
+def test_ref_files(git_dir: Path):
+    """All files read while resolving a ref, including ones which don't exist."""
+    assert ref_files(git_dir) == [
+        git_dir / "HEAD",
+        git_dir / "refs/heads/main",
+        git_dir / "packed-refs",
+    ]
+
+    worktree_git_dir = git_dir / "worktrees" / "feature"
+    worktree_git_dir.mkdir(parents=True)
+    (worktree_git_dir / "commondir").write_text("../..\n")
+    (worktree_git_dir / "HEAD").write_text("ref: refs/heads/packed\n")
+    common_dir = worktree_git_dir / "../.."
+
+    assert ref_files(worktree_git_dir) == [
+        worktree_git_dir / "HEAD",
+        common_dir / "HEAD",
+        worktree_git_dir / "refs/heads/packed",
+        common_dir / "refs/heads/packed",
+        common_dir / "packed-refs",
+    ]
+
+
+def test_commit_time(git_dir: Path):
+    """Committer time is read from loose objects."""
+    commit_content = (
+        b"tree " + b"c" * 40 + b"\n"
+        b"author vv-info <vv-info@example.com> 1000000000 +0100\n"
+        b"committer vv-info <vv-info@example.com> 1600000000 +0100\n"
+        b"\n"
+        b"committer 1 +0000\n"
+    )
+    object_dir = git_dir / "objects" / COMMIT_ID_A[:2]
+    object_dir.mkdir(parents=True)
+    (object_dir / COMMIT_ID_A[2:]).write_bytes(
+        zlib.compress(b"commit %d\0" % len(commit_content) + commit_content)
+    )
+
+    assert commit_time(git_dir, COMMIT_ID_A) == 1600000000
+    assert commit_time(git_dir, COMMIT_ID_B) is None
+    assert parse_commit_time(b"tree foo\n\ncommitter 1 +0000\n") is None
+
+
+def test_commit_without_committer(git_dir: Path):
+    """The walk stops at commits without a parsable committer line."""
+    commit_content = b"tree " + b"c" * 40 + b"\nparent " + COMMIT_ID_A.encode() + b"\n\n"
+    object_dir = git_dir / "objects" / COMMIT_ID_B[:2]
+    object_dir.mkdir(parents=True)
+    (object_dir / COMMIT_ID_B[2:]).write_bytes(
+        zlib.compress(b"commit %d\0" % len(commit_content) + commit_content)
+    )
+
+    assert object_store(git_dir).commit_info(COMMIT_ID_B) is None
+    assert last_commit_before(git_dir, COMMIT_ID_B, 2e9) is None
+
+
+def test_resolve_ref_real_repo(git_repo: Tuple[Path, List[str]]):
+    """Results match those of git itself."""
+    repo_path, commit_ids = git_repo
+    git_dir = find_git_dir(repo_path)
+
+    assert resolve_ref(git_dir) == commit_ids[-1]
+    assert commit_time(git_dir, commit_ids[-1]) is not None
+
+
+def assert_same_as_git_log(repo_path: Path, timestamps: List[datetime]):
+    """last_commit_before finds the same commits as 'git log --before'."""
+    git_dir = find_git_dir(repo_path)
+    head_commit_id = resolve_ref(git_dir)
+    for timestamp in timestamps:
+        expected = run_git(
+            repo_path, "log", f"--before={timestamp.isoformat()}", "-n", "1", "--pretty=%H"
+        )
+        result = last_commit_before(git_dir, head_commit_id, timestamp.timestamp())
+
+        assert result == (expected or None), timestamp
+
+
+@pytest.mark.parametrize(
+    "repack_commands",
+    (
+        (),
+        (("repack", "-adq", "-f", "--depth=50", "--window=50"),),
+        (("repack", "-adq"), ("commit-graph", "write", "--reachable")),
+        (("repack", "-adq"), ("commit-graph", "write", "--reachable", "--split")),
+    ),
+    ids=("loose", "packed", "commit-graph", "split-commit-graph"),
+)
+def test_last_commit_before(
+    merge_history_repo: Tuple[Path, List[datetime]],
+    repack_commands: Tuple[Tuple[str, ...], ...],
+):
+    """Loose objects, (deltified) packs and (split) commit-graphs give the same results."""
+    repo_path, timestamps = merge_history_repo
+    run_git(repo_path, "config", "gc.writeCommitGraph", "false")
+    for repack_command in repack_commands:
+        run_git(repo_path, *repack_command)
+
+    assert_same_as_git_log(repo_path, timestamps)
+
+
+def test_object_store_read_deltified_blob(merge_history_repo: Tuple[Path, List[datetime]]):
+    """Deltified objects are resolved."""
+    repo_path, _ = merge_history_repo
+    run_git(repo_path, "repack", "-adq", "-f", "--depth=50", "--window=50")
+    blob_id = run_git(repo_path, "rev-parse", "HEAD:large.txt")
+    store = object_store(find_git_dir(repo_path))
+
+    assert store.pack_indexes != []
+    assert store.read_object(blob_id) == (
+        OBJECT_TYPE_BLOB,
+        (repo_path / "large.txt").read_bytes(),
+    )
+    assert store.read_object("0" * 40) is None
+
+
+def test_object_store_read_object_broken_pack(merge_history_repo: Tuple[Path, List[datetime]]):
+    """Objects are read from the next pack if a pack containing them is broken."""
+    repo_path, _ = merge_history_repo
+    run_git(repo_path, "repack", "-adq")
+    blob_id = run_git(repo_path, "rev-parse", "HEAD:large.txt")
+    common_dir = common_git_dir(find_git_dir(repo_path))
+    pack_dir = common_dir / "objects" / "pack"
+    (index_path,) = pack_dir.glob("*.idx")
+    # the broken copy of the pack sorts before the original one
+    broken_index_path = pack_dir / f"pack-{'0' * 40}.idx"
+    broken_index_path.write_bytes(index_path.read_bytes())
+    broken_index_path.with_suffix(".pack").write_bytes(b"")
+    store = GitObjectStore(common_dir)
+
+    assert [pack_index.index_path for pack_index in store.pack_indexes] == [
+        broken_index_path,
+        index_path,
+    ]
+    assert store.read_object(blob_id) == (
+        OBJECT_TYPE_BLOB,
+        (repo_path / "large.txt").read_bytes(),
+    )
+
+    store.pack_indexes.pop()
+
+    assert store.read_object(blob_id) is None
+
+
+def test_last_commit_before_shallow_clone(
+    merge_history_repo: Tuple[Path, List[datetime]], tmp_path: Path
+):
+    """Missing history results in None so git can be used as fallback."""
+    repo_path, timestamps = merge_history_repo
+    clone_path = tmp_path / "shallow"
+    run_git(tmp_path, "clone", "-q", "--depth=1", repo_path.as_uri(), str(clone_path))
+    git_dir = find_git_dir(clone_path)
+
+    assert last_commit_before(git_dir, resolve_ref(git_dir), timestamps[0].timestamp()) is None
+
+
+def test_walk_last_commit_before_deadline():
+    """Walking a long history stops once the time budget ran out."""
+    commit_ids = [f"{index:040x}" for index in range(DEADLINE_CHECK_INTERVAL * 4)]
+    history = {
+        commit_id: (1000 + index, commit_ids[index - 1 : index])
+        for index, commit_id in enumerate(commit_ids)
+    }
+    read_commits = []
+
+    def commit_info(commit_id: str) -> Optional[Tuple[int, List[str]]]:
+        read_commits.append(commit_id)
+        return history.get(commit_id)
+
+    assert walk_last_commit_before(commit_ids[-1], 0, commit_info) is None
+    assert set(read_commits) == set(commit_ids)
+
+    read_commits.clear()
+    with time_budget(0), pytest.raises(DeadlineExceeded):
+        walk_last_commit_before(commit_ids[-1], 0, commit_info)
+
+    # commits are read when they are queued and when they are walked
+    assert len(set(read_commits)) <= DEADLINE_CHECK_INTERVAL + 1
@@ -0,0 +1,92 @@
+"""Tests for the lazy top-level package"""
+import subprocess
+import sys
+from typing import Dict
+from typing import Tuple
+
+import pytest
+
+import verbose_version_info
+from verbose_version_info.verbose_version_info import vv_info
+
+IMPORT_TIME_BUDGET = 10_000
+"""Upper limit in µs of the cumulative import time of the package (about 3ms)."""
+
+
+def import_profile(module: str) -> Tuple[Dict[str, int], str]:
+    """Import ``module`` in a fresh interpreter with ``-X importtime``.
+
+    Parameters
+    ----------
+    module : str
+        Name of the module to import.
+
+    Returns
+    -------
+    Tuple[Dict[str, int], str]
+        Cumulative import time in µs by imported module and the
+        space separated names of the modules in ``sys.modules``.
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"import sys, {module}; print(' '.join(sys.modules))",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    assert result.returncode == 0, result.stderr
+    cumulative_times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                cumulative_times[name.strip()] = int(cumulative)
+    return cumulative_times, result.stdout
+
+
+def test_package_import_is_cheap():
+    """Importing the package neither imports submodules nor heavy dependencies."""
+    cumulative_times, modules = import_profile("verbose_version_info")
+    imported = set(modules.split())
+
+    assert cumulative_times["verbose_version_info"] < IMPORT_TIME_BUDGET
+    assert {module for module in imported if module.startswith("verbose_version_info.")} == {
+        "verbose_version_info.settings"
+    }
+    for module in ("subprocess", "json", "importlib.metadata", "concurrent.futures"):
+        assert module not in imported
+
+
+def test_lookup_module_imports():
+    """Subprocesses, json, threads pools and the vcs modules are only imported when used."""
+    _, modules = import_profile("verbose_version_info.verbose_version_info")
+    imported = set(modules.split())
+
+    for module in (
+        "subprocess",
+        "json",
+        "concurrent.futures",
+        "verbose_version_info.cache",
+        "verbose_version_info.vcs",
+        "verbose_version_info.git_repository",
+        "verbose_version_info.git_batch",
+    ):
+        assert module not in imported
+
+
+def test_lazy_attributes():
+    """Public attributes resolve to the objects of their submodules."""
+    assert verbose_version_info.vv_info is vv_info
+    assert "vv_info_table" in dir(verbose_version_info)
+    assert set(verbose_version_info.__all__) <= set(dir(verbose_version_info))
+
+    for name in verbose_version_info.__all__:
+        assert getattr(verbose_version_info, name) is not None
+
+    with pytest.raises(AttributeError, match="not_an_attribute"):
+        verbose_version_info.not_an_attribute
@@ -1,7 +1,10 @@
+import os
 from datetime import datetime
-from importlib.metadata import PackagePath
+from importlib.metadata import Distribution
+from importlib.metadata import PathDistribution
 from pathlib import Path
 from typing import Callable
+from typing import Optional
 
 import pytest
 from _pytest.monkeypatch import MonkeyPatch
@@ -10,6 +13,7 @@ from tests import MTIME_DATE_NOW
 from tests import MTIME_DATE_PAST
 from tests import PKG_ROOT
 
+import verbose_version_info.resource_finders
 import verbose_version_info.utils
 from verbose_version_info.data_containers import VerboseVersionInfo
 from verbose_version_info.resource_finders import dist_info_mtime
@@ -18,6 +22,7 @@ from verbose_version_info.resource_finders import file_uri_to_path
 from verbose_version_info.resource_finders import find_editable_install_basepath
 from verbose_version_info.resource_finders import find_url_info
 from verbose_version_info.resource_finders import local_install_basepath
+from verbose_version_info.verbose_version_info import vv_info_many
 
 
 def test_find_url_info_git_install():
@@ -126,11 +131,18 @@ def test_find_url_info_url_install(
     """Retrieve url information for url installed package.
     Reading the text to parse is mocked, so different results can be checked.
     """
-    monkeypatch.setattr(PackagePath, "read_text", lambda x: json_str)
+    read_text = PathDistribution.read_text
+
+    def mock_read_text(self: PathDistribution, filename: str) -> Optional[str]:
+        if filename == "direct_url.json":
+            return json_str
+        return read_text(self, filename)
+
+    monkeypatch.setattr(PathDistribution, "read_text", mock_read_text)
     monkeypatch.setattr(
         verbose_version_info.utils,
         "distribution",
-        verbose_version_info.utils.distribution.__wrapped__,
+        verbose_version_info.utils.find_distribution,
     )
 
     result = find_url_info("git-install-test-distribution", MTIME_DATE_PAST)
@@ -282,3 +294,79 @@ def test_dist_info_mtime(
     result = dist_info_mtime(distribution_name)
 
     assert result == expected
+
+
+def test_url_info_and_mtime_without_files(
+    monkeypatch: MonkeyPatch, fake_site_packages: Callable[..., Path]
+):
+    """direct_url.json and the dist-info mtime are found without listing all files."""
+    dist_info = fake_site_packages(
+        "no-files-listed-dist", "0.1.0", direct_url={"url": "https://foo.bar"}
+    )
+    expected_mtime = datetime.fromtimestamp((dist_info / "METADATA").stat().st_mtime)
+
+    def raise_error(self):
+        raise AssertionError("Distribution.files shouldn't be used")
+
+    monkeypatch.setattr(Distribution, "files", property(raise_error))
+
+    assert dist_info_mtime("no-files-listed-dist") == expected_mtime
+    assert find_url_info("no-files-listed-dist") == VerboseVersionInfo(
+        release_version="0.1.0", dist_time=expected_mtime, url="https://foo.bar"
+    )
+
+
+def test_dist_info_mtime_ignores_later_files(fake_site_packages: Callable[..., Path]):
+    """Files added to the dist-info after the installation don't change its mtime."""
+    dist_info = fake_site_packages("later-files-dist", "0.1.0")
+    metadata_mtime = MTIME_DATE_PAST.timestamp()
+    os.utime(dist_info / "METADATA", (metadata_mtime, metadata_mtime))
+    (dist_info / "REQUESTED").touch()
+    os.utime(dist_info, (MTIME_DATE_NOW.timestamp(), MTIME_DATE_NOW.timestamp()))
+
+    assert dist_info_mtime("later-files-dist") == MTIME_DATE_PAST
+    assert vv_info_many(["later-files-dist"])[0].dist_time == MTIME_DATE_PAST
+
+
+def test_find_editable_install_basepath_from_index(
+    tmp_path: Path, fake_site_packages: Callable[..., Path]
+):
+    """Egg-link and __editable__ .pth files are found through the editable index."""
+    dist_info = fake_site_packages("indexed-egg-link-dist", "0.1.0")
+    fake_site_packages("indexed-pth-dist", "0.1.0")
+    source_dir = tmp_path / "indexed-source"
+    (source_dir / "src").mkdir(parents=True)
+    site_packages = dist_info.parent
+    (site_packages / "indexed-egg-link-dist.egg-link").write_text(f"{source_dir / 'src'}\n../\n")
+    (site_packages / "__editable__.indexed_pth_dist-0.1.0.pth").write_text(f"{source_dir}\n")
+
+    assert find_editable_install_basepath("indexed_egg_link_dist") == source_dir.resolve()
+    assert find_editable_install_basepath("indexed-pth-dist") == source_dir.resolve()
+    assert egg_link_lines("not-a-distribution") is None
+
+
+def test_pep660_editable_from_direct_url(
+    monkeypatch: MonkeyPatch, tmp_path: Path, fake_site_packages: Callable[..., Path]
+):
+    """PEP 660 editable installations are resolved from direct_url.json alone."""
+    source_dir = tmp_path / "pep660-source"
+    source_dir.mkdir()
+    direct_url = {"url": source_dir.as_uri(), "dir_info": {"editable": True}}
+    fake_site_packages("pep660-dist", "0.1.0", direct_url=direct_url)
+    missing_direct_url = {"url": (tmp_path / "missing").as_uri(), "dir_info": {"editable": True}}
+    fake_site_packages("pep660-missing-source-dist", "0.1.0", direct_url=missing_direct_url)
+
+    def raise_error():
+        raise AssertionError("The editable index shouldn't be built")
+
+    monkeypatch.setattr(verbose_version_info.utils, "editable_index", raise_error)
+    monkeypatch.setattr(
+        verbose_version_info.resource_finders, "_datetime_now", lambda: MTIME_DATE_NOW
+    )
+
+    assert dist_info_mtime("pep660-dist") == MTIME_DATE_NOW
+    assert find_url_info("pep660-dist") == VerboseVersionInfo(
+        release_version="0.1.0", dist_time=MTIME_DATE_NOW, url=source_dir.as_uri()
+    )
+    assert local_install_basepath("pep660-dist") == source_dir
+    assert local_install_basepath("pep660-missing-source-dist") is None
@@ -0,0 +1,72 @@
+"""Tests for the ``tracing`` module"""
+from pathlib import Path
+from typing import List
+from typing import Tuple
+
+import pytest
+
+from verbose_version_info.data_containers import TraceEvent
+from verbose_version_info.tracing import StageHistogram
+from verbose_version_info.tracing import trace_hook
+from verbose_version_info.tracing import traced_stage
+from verbose_version_info.tracing import tracing_enabled
+from verbose_version_info.utils import DISTRIBUTION_CACHE
+from verbose_version_info.utils import dist_files
+from verbose_version_info.vcs import run_vcs_commit_id_command
+
+
+def test_trace_hook(git_repo: Tuple[Path, List[str]]):
+    """Stages and subprocesses are reported while a hook is registered."""
+    repo_path, commit_ids = git_repo
+    events: List[TraceEvent] = []
+    DISTRIBUTION_CACHE.clear()
+
+    with trace_hook(events.append):
+        assert tracing_enabled() is True
+        dist_files("pytest")
+        run_vcs_commit_id_command(
+            vcs_name="git",
+            commit_id_command=("git", "rev-parse", "HEAD"),
+            local_install_basepath=repo_path,
+        )
+
+    assert tracing_enabled() is False
+    assert [event.stage for event in events] == ["distribution", "dist_files", "subprocess"]
+    assert events[2].name == "git rev-parse"
+    assert events[2].details == {"argv": ("git", "rev-parse", "HEAD"), "returncode": 0}
+    assert all(event.duration >= 0 for event in events)
+
+    dist_files("pytest")
+
+    assert len(events) == 3
+
+
+def test_traced_stage_error():
+    """The type of an error raised inside of a stage is added to the details."""
+    events: List[TraceEvent] = []
+
+    with trace_hook(events.append), pytest.raises(ValueError):
+        with traced_stage("stage", "name", key="value"):
+            raise ValueError
+
+    assert events[0][:2] == ("stage", "name")
+    assert events[0].details == {"key": "value", "error": "ValueError"}
+
+
+def test_stage_histogram():
+    """Durations are aggregated per stage and reader or command name."""
+    histogram = StageHistogram()
+    for duration in (5e-6, 5e-4, 6e-4, 2.0):
+        histogram(TraceEvent("distribution", "distribution", duration, {}))
+    histogram(TraceEvent("subprocess", "git log", 0.05, {"returncode": 0}))
+
+    assert set(histogram.durations) == {"distribution", "subprocess[git log]"}
+    assert histogram.bucket_counts("distribution") == [1, 0, 2, 0, 0, 0, 1, 0]
+
+    lines = histogram.format(width=4).splitlines()
+
+    assert lines[0].startswith("distribution: 4 calls, total 2.00 s, mean 500.3 ms, max 2.00 s")
+    assert lines[1] == "   < 10.0 µs | ##   1"
+    assert lines[3] == "    < 1.0 ms | #### 2"
+    assert lines[-2] == "subprocess[git log]: 1 calls, total 50.0 ms, mean 50.0 ms, max 50.0 ms"
+    assert len(lines) == 1 + 7 + 1 + 1
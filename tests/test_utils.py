@@ -1,16 +1,36 @@
 """Tests for verbose_version_info.utils"""
-
+import importlib
+import os
+import shutil
+import time
 from importlib.metadata import Distribution
 from importlib.metadata import distribution as _distribution
 from pathlib import Path
+from typing import Callable
+from typing import Optional
 
 import pytest
 from _pytest.monkeypatch import MonkeyPatch
 
 import verbose_version_info.utils
+from verbose_version_info.settings import DISTRIBUTION_CACHE_SETTINGS
+from verbose_version_info.utils import DISTRIBUTION_CACHE
+from verbose_version_info.utils import DeadlineExceeded
 from verbose_version_info.utils import NotFoundDistribution
+from verbose_version_info.utils import ResolutionContext
+from verbose_version_info.utils import collect_skipped_stages
+from verbose_version_info.utils import deadline_timeout
+from verbose_version_info.utils import deferred_warnings
 from verbose_version_info.utils import dist_files
 from verbose_version_info.utils import distribution
+from verbose_version_info.utils import editable_index
+from verbose_version_info.utils import emit_warning
+from verbose_version_info.utils import iter_dist_files
+from verbose_version_info.utils import normalize_distribution_name
+from verbose_version_info.utils import read_metadata_headers
+from verbose_version_info.utils import scan_distributions
+from verbose_version_info.utils import skip_stage
+from verbose_version_info.utils import time_budget
 
 
 @pytest.mark.parametrize(
@@ -61,9 +81,230 @@ def test_dist_files(monkeypatch: MonkeyPatch):
     monkeypatch.setattr(
         verbose_version_info.utils,
         "distribution",
-        verbose_version_info.utils.distribution.__wrapped__,
+        verbose_version_info.utils.find_distribution,
     )
 
     broken_package_files = dist_files("verbose-version-info")
 
     assert broken_package_files == []
+
+
+@pytest.mark.parametrize(
+    "distribution_name", ("Foo_Bar", "foo-bar", "foo.bar", "FOO__bar", "foo-_.bar")
+)
+def test_normalize_distribution_name(distribution_name: str):
+    """Names are normalized as described in PEP 503."""
+    assert normalize_distribution_name(distribution_name) == "foo-bar"
+
+
+def test_distribution_cache(fake_site_packages: Callable[..., Path], monkeypatch: MonkeyPatch):
+    """Lookups are cached on the normalized name, revalidated and bounded."""
+    monkeypatch.setitem(DISTRIBUTION_CACHE_SETTINGS, "max_entries", 2)
+    DISTRIBUTION_CACHE.clear()
+    dist_info = fake_site_packages("cached-dist", "1.0.0")
+
+    assert distribution("Cached_Dist").version == "1.0.0"
+    assert distribution("cached.dist") is distribution("cached-dist")
+    assert DISTRIBUTION_CACHE.info()[:4] == (2, 1, 0, 0)
+
+    shutil.rmtree(dist_info)
+    fake_site_packages("cached-dist", "2.0.0")
+    importlib.invalidate_caches()
+
+    assert distribution("cached-dist").version == "2.0.0"
+    assert DISTRIBUTION_CACHE.info().stale == 1
+
+    assert isinstance(distribution("later-dist"), NotFoundDistribution)
+    fake_site_packages("later-dist", "0.1.0")
+    importlib.invalidate_caches()
+
+    assert isinstance(distribution("later-dist"), NotFoundDistribution)
+    assert DISTRIBUTION_CACHE.info().not_found_hits == 1
+
+    DISTRIBUTION_CACHE.invalidate("Later_Dist")
+
+    assert distribution("later-dist").version == "0.1.0"
+
+    fake_site_packages("third-dist", "0.1.0")
+    importlib.invalidate_caches()
+    distribution("third-dist")
+    info = DISTRIBUTION_CACHE.info()
+
+    assert (info.entries, info.not_found_entries, info.max_entries) == (2, 0, 2)
+    # 'cached-dist' was the least recently used
+    assert distribution("cached-dist").version == "2.0.0"
+    assert DISTRIBUTION_CACHE.info().misses == info.misses + 1
+
+    monkeypatch.setitem(DISTRIBUTION_CACHE_SETTINGS, "not_found_ttl", 0)
+    distribution("not-a-distribution")
+
+    assert DISTRIBUTION_CACHE.info().not_found_entries == 0
+
+    DISTRIBUTION_CACHE.clear()
+
+    assert DISTRIBUTION_CACHE.info()[:-1] == (0, 0, 0, 0, 2, 0)
+
+
+def test_scan_distributions(fake_site_packages: Callable[..., Path]):
+    """All dist-info dirs on sys.path are found."""
+    dist_info = fake_site_packages("scanned-dist", "1.2.3")
+    (dist_info.parent / "not_a_dist.dist-info").write_text("")
+
+    result = scan_distributions()
+
+    assert "scanned-dist" in result
+    assert "not-a-dist" not in result
+    scanned = result["scanned-dist"]
+    assert scanned.distribution.version == "1.2.3"
+
+
+def test_scan_distributions_first_found_wins(tmp_path: Path):
+    """Same as for the import system the first path entry containing a distribution wins."""
+    for path_item, version in (("first", "1.0"), ("second", "2.0")):
+        dist_info = tmp_path / path_item / f"shadowed-{version}.dist-info"
+        dist_info.mkdir(parents=True)
+        (dist_info / "METADATA").write_text(f"Name: shadowed\nVersion: {version}\n\n")
+
+    result = scan_distributions(
+        [str(tmp_path / "first"), str(tmp_path / "does_not_exist"), str(tmp_path / "second")]
+    )
+
+    assert result["shadowed"].distribution.version == "1.0"
+
+
+def test_deferred_warnings():
+    """Warnings are collected inside of deferred_warnings and emitted outside of it."""
+    with deferred_warnings() as collected_warnings:
+        emit_warning(UserWarning("deferred"))
+
+    assert len(collected_warnings) == 1
+    assert str(collected_warnings[0]) == "deferred"
+
+    with pytest.warns(UserWarning, match="emitted"):
+        emit_warning(UserWarning("emitted"))
+
+
+def test_time_budget():
+    """Nested budgets can't extend the outer one and skipped stages are collected."""
+    assert deadline_timeout() is None
+
+    with time_budget(10):
+        assert 9 < deadline_timeout() <= 10  # type: ignore[operator]
+        with time_budget(60):
+            assert deadline_timeout() <= 10  # type: ignore[operator]
+        with time_budget(0.01):
+            time.sleep(0.02)
+            with pytest.raises(DeadlineExceeded):
+                deadline_timeout()
+        assert deadline_timeout() is not None
+
+    with collect_skipped_stages() as skipped_stages:
+        skip_stage("vcs")
+        skip_stage("vcs")
+    skip_stage("dirty")
+
+    assert skipped_stages == ["vcs"]
+
+
+def test_iter_dist_files(fake_site_packages: Callable[..., Path]):
+    """Same files as Distribution.files, but RECORD is read lazily."""
+    dist_info = fake_site_packages("lazy-record-dist", "0.1.0")
+    with (dist_info / "RECORD").open("a") as f:
+        f.write("lazy_record_dist/__init__.py,sha256=abc,42\n")
+    dist = verbose_version_info.utils.distribution("lazy-record-dist")
+
+    files = list(iter_dist_files("lazy-record-dist"))
+
+    assert files == dist.files
+    assert [file.size for file in files] == [file.size for file in dist.files]
+    assert files[-1].hash.value == "abc"
+    assert files[0].locate() == dist_info / "METADATA"
+    assert list(iter_dist_files("not-a-distribution")) == []
+
+    lazy_files = iter_dist_files("lazy-record-dist")
+    assert next(lazy_files) == files[0]
+    lazy_files.close()
+
+
+@pytest.mark.parametrize(
+    "metadata_text,expected",
+    (
+        (
+            "Metadata-Version: 2.1\nName: foo\nVersion: 1.0\n\n\udcff",
+            {"name": "foo", "version": "1.0"},
+        ),
+        (
+            "Metadata-Version: 2.1\r\nversion: 1.0\r\nSummary: foo\r\n  bar\r\nNAME: foo\r\n",
+            {"name": "foo", "version": "1.0"},
+        ),
+        ("Metadata-Version: 2.1\nName: foo\n\nVersion: 1.0\n", None),
+        ("Metadata-Version: 2.1\nName: foo\nVersion: 1.0\n  .post1\n", None),
+        ("Metadata-Version: 2.1\nName: =?utf-8?q?foo?=\nVersion: 1.0\n", None),
+        ("Metadata-Version: 2.1\nnot a header\nName: foo\nVersion: 1.0\n", None),
+    ),
+    ids=("long-description", "case-and-folding", "missing", "folded", "encoded", "broken"),
+)
+def test_read_metadata_headers(tmp_path: Path, metadata_text: str, expected: Optional[dict]):
+    """Headers are read until the long description, unusual headers need the full parser."""
+    # invalid utf8 in the long description shows that it isn't read
+    (tmp_path / "METADATA").write_bytes(metadata_text.encode("utf8", "surrogateescape"))
+
+    assert read_metadata_headers(tmp_path) == expected
+
+
+def test_resolution_context_metadata_fallback(fake_site_packages: Callable[..., Path]):
+    """Name and version are the same with and without the fast path."""
+    dist_info = fake_site_packages("fast-metadata-dist", "0.1.0")
+    context = ResolutionContext("fast-metadata-dist")
+
+    assert (context.name, context.version) == ("fast-metadata-dist", "0.1.0")
+    assert "metadata" not in context.__dict__
+
+    (dist_info / "METADATA").write_text(
+        "Metadata-Version: 2.1\nName: fast-metadata-dist\nVersion: 0.1.0\n  .post1\n\n"
+    )
+    context = ResolutionContext("fast-metadata-dist")
+
+    assert context.metadata_headers is None
+    assert context.version == context.dist.version
+    assert ResolutionContext("not-a-distribution").version == "Unknown"
+
+
+def test_editable_index(monkeypatch: MonkeyPatch, tmp_path: Path):
+    """Path entries are listed once and again if sys.path or their mtime changes."""
+    site_packages = tmp_path / "editable-site-packages"
+    site_packages.mkdir()
+    (site_packages / "Egg_Link.Dist.egg-link").write_text("/src/egg-link-dist\n../\n")
+    (site_packages / "__editable__.pth_dist-1.0.pth").write_text("/src/pth-dist\n")
+    (site_packages / "__editable__.finder_dist-1.0.pth").write_text("import finder; finder()\n")
+    monkeypatch.syspath_prepend(str(site_packages))
+    listed_dirs = []
+    scandir = os.scandir
+
+    def counting_scandir(path):
+        listed_dirs.append(path)
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", counting_scandir)
+
+    index = editable_index()
+
+    assert index["egg-link-dist"] == ["/src/egg-link-dist", "../"]
+    assert index["pth-dist"] == ["/src/pth-dist"]
+    assert "finder-dist" not in index
+    assert editable_index() is index
+    assert listed_dirs.count(str(site_packages)) == 1
+
+    (site_packages / "new_dist.egg-link").write_text("/src/new-dist\n.\n")
+    os.utime(site_packages, (0, 0))
+
+    assert editable_index()["new-dist"] == ["/src/new-dist", "."]
+    assert listed_dirs.count(str(site_packages)) == 2
+
+    other_site_packages = tmp_path / "other-site-packages"
+    other_site_packages.mkdir()
+    (other_site_packages / "new-dist.egg-link").write_text("/src/shadowing\n.\n")
+    monkeypatch.syspath_prepend(str(other_site_packages))
+
+    assert editable_index()["new-dist"] == ["/src/shadowing", "."]
+    assert listed_dirs.count(str(site_packages)) == 2
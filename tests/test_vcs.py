@@ -1,8 +1,16 @@
 """Tests for the ``vcs`` module"""
 
+import os
+import subprocess
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from pathlib import Path
+from typing import List
 from typing import Optional
+from typing import Tuple
 from typing import Union
 
 import pytest
@@ -14,10 +22,25 @@ from tests import MTIME_DATE_PAST
 import verbose_version_info.vcs
 from verbose_version_info.data_containers import VcsInfo
 from verbose_version_info.settings import VCS_SETTINGS
+from verbose_version_info.utils import deferred_warnings
+from verbose_version_info.vcs import GIT_CHECK_DIRTY_COMMAND
 from verbose_version_info.vcs import UncommittedChangesWarning
+from verbose_version_info.vcs import active_vcs_session
 from verbose_version_info.vcs import add_vcs_commit_id_reader
+from verbose_version_info.vcs import check_dirty
+from verbose_version_info.vcs import clear_vcs_root_cache
+from verbose_version_info.vcs import dirty_check_env
+from verbose_version_info.vcs import dirty_state
+from verbose_version_info.vcs import emit_dirty_warning
+from verbose_version_info.vcs import find_vcs_root
+from verbose_version_info.vcs import git_check_dirty_command
+from verbose_version_info.vcs import git_dir_commit_id
 from verbose_version_info.vcs import local_git_commit_id
+from verbose_version_info.vcs import matching_vcs_readers
 from verbose_version_info.vcs import run_vcs_commit_id_command
+from verbose_version_info.vcs import vcs_marker
+from verbose_version_info.vcs import vcs_markers
+from verbose_version_info.vcs import vcs_session
 
 
 @pytest.mark.parametrize(
@@ -91,6 +114,24 @@ def test_local_git_commit_id_uncommited_changes_warning_deactivated(
         local_git_commit_id(dirty_vsc_path, MTIME_DATE_PAST)
 
 
+def test_local_git_commit_id_uses_listed_markers(
+    monkeypatch: MonkeyPatch, git_repo: Tuple[Path, List[str]]
+):
+    """The .git marker listed to dispatch the reader isn't stat'ed again."""
+    repo_path, commit_ids = git_repo
+    assert ".git" in vcs_markers(repo_path)
+
+    path_exists = Path.exists
+
+    def exists_without_git(self):
+        assert self.name != ".git", "The .git marker shouldn't be stat'ed again"
+        return path_exists(self)
+
+    monkeypatch.setattr(Path, "exists", exists_without_git)
+
+    assert local_git_commit_id(repo_path, MTIME_DATE_NOW) == VcsInfo("git", commit_ids[-1])
+
+
 def test_add_vcs_commit_id_reader(monkeypatch: MonkeyPatch):
     """Decorated function get added as supposed."""
     monkeypatch.setattr(verbose_version_info.vcs, "VCS_COMMIT_ID_READERS", [])
@@ -112,3 +153,250 @@ def test_add_vcs_commit_id_reader(monkeypatch: MonkeyPatch):
 
     assert len(verbose_version_info.vcs.VCS_COMMIT_ID_READERS) == 2
     assert dummy2 in verbose_version_info.vcs.VCS_COMMIT_ID_READERS
+
+
+def test_matching_vcs_readers(monkeypatch: MonkeyPatch, tmp_path: Path):
+    """Only readers without marker or which marker is in the directory are matched."""
+    monkeypatch.setattr(verbose_version_info.vcs, "VCS_READER_MARKERS", {})
+    (tmp_path / ".hg").mkdir()
+    (tmp_path / "_custom_vcs").touch()
+    scanned_paths = []
+    scandir = os.scandir
+
+    def recording_scandir(path):
+        scanned_paths.append(path)
+        return scandir(path)
+
+    monkeypatch.setattr(verbose_version_info.vcs.os, "scandir", recording_scandir)
+
+    def generic_reader(local_install_basepath: Path, dist_mtime: datetime) -> None:
+        return None
+
+    @vcs_marker(".hg")
+    def hg_reader(local_install_basepath: Path, dist_mtime: datetime) -> None:
+        return None
+
+    @vcs_marker(".git")
+    def git_reader(local_install_basepath: Path, dist_mtime: datetime) -> None:
+        return None
+
+    @vcs_marker("_custom_vcs")
+    def custom_reader(local_install_basepath: Path, dist_mtime: datetime) -> None:
+        return None
+
+    readers = [git_reader, generic_reader, hg_reader, custom_reader]
+    expected = [generic_reader, hg_reader, custom_reader]
+
+    for _ in range(3):
+        assert matching_vcs_readers(readers, tmp_path) == expected
+    assert matching_vcs_readers(readers, tmp_path / "missing") == [generic_reader]
+    assert vcs_markers(tmp_path) == {".hg", "_custom_vcs"}
+    assert scanned_paths == [tmp_path, tmp_path / "missing"]
+
+
+def test_vcs_markers_revalidated(monkeypatch: MonkeyPatch, tmp_path: Path):
+    """Markers are scanned again once the directory changed and the cache is bounded."""
+    monkeypatch.setitem(VCS_SETTINGS, "marker_cache_max_entries", 2)
+    clear_vcs_root_cache()
+    # timestamps can be coarser than the time between the scans
+    os.utime(tmp_path, ns=(0, 0))
+
+    assert vcs_markers(tmp_path) == frozenset()
+
+    (tmp_path / ".git").mkdir()
+
+    assert vcs_markers(tmp_path) == {".git"}
+
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir()
+        vcs_markers(tmp_path / name)
+
+    assert list(verbose_version_info.vcs._VCS_MARKERS) == [tmp_path / "a", tmp_path / "b"]
+
+
+def test_find_vcs_root(monkeypatch: MonkeyPatch, git_repo: Tuple[Path, List[str]]):
+    """Parents are searched up to ceilings and every visited directory is memoized."""
+    repo_path, _ = git_repo
+    repo_path = repo_path.resolve()
+    for package in ("a", "b"):
+        (repo_path / "packages" / package / "src").mkdir(parents=True)
+    scanned_paths = []
+    scandir = os.scandir
+
+    def recording_scandir(path):
+        scanned_paths.append(path)
+        return scandir(path)
+
+    monkeypatch.setattr(verbose_version_info.vcs.os, "scandir", recording_scandir)
+
+    assert find_vcs_root(repo_path / "packages" / "a" / "src") == repo_path
+    assert scanned_paths == [
+        repo_path / "packages" / "a" / "src",
+        repo_path / "packages" / "a",
+        repo_path / "packages",
+        repo_path,
+    ]
+    scanned_paths.clear()
+
+    assert find_vcs_root(repo_path / "packages" / "a") == repo_path
+    assert find_vcs_root(repo_path / "packages" / "b") == repo_path
+    assert scanned_paths == [repo_path / "packages" / "b"]
+
+    monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(repo_path))
+    assert find_vcs_root(repo_path / "packages" / "a") is None
+    assert find_vcs_root(repo_path) == repo_path
+
+    monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(repo_path.parent))
+    monkeypatch.setattr(
+        verbose_version_info.vcs,
+        "_device",
+        lambda directory: 1 if directory == repo_path else 0,
+    )
+    assert find_vcs_root(repo_path / "packages") is None
+
+    monkeypatch.setenv("GIT_DISCOVERY_ACROSS_FILESYSTEM", "1")
+    assert find_vcs_root(repo_path / "packages") == repo_path
+
+
+def test_git_dir_commit_id(git_repo: Tuple[Path, List[str]]):
+    """Same result as local_git_commit_id."""
+    repo_path, commit_ids = git_repo
+
+    for dist_mtime in (MTIME_DATE_NOW, MTIME_DATE_PAST):
+        assert git_dir_commit_id(repo_path, dist_mtime) == local_git_commit_id(
+            repo_path, dist_mtime
+        )
+    assert git_dir_commit_id(repo_path, MTIME_DATE_NOW) == ("git", commit_ids[-1])
+    assert git_dir_commit_id(repo_path.parent, MTIME_DATE_NOW) is None
+
+
+def test_git_dir_commit_id_uncommited_changes(git_repo: Tuple[Path, List[str]]):
+    """Warning if uncommitted changes are present."""
+    repo_path, _ = git_repo
+    (repo_path / "uncommited_file").touch()
+
+    with pytest.warns(UncommittedChangesWarning, match="contains uncommitted changes"):
+        git_dir_commit_id(repo_path, MTIME_DATE_NOW)
+
+
+def test_git_not_installed(monkeypatch: MonkeyPatch, git_repo: Tuple[Path, List[str]]):
+    """Commit id is read from the .git dir even if the git executable is missing."""
+    repo_path, commit_ids = git_repo
+    monkeypatch.setenv("PATH", "")
+
+    assert git_dir_commit_id(repo_path, MTIME_DATE_NOW) == VcsInfo("git", commit_ids[-1])
+    assert local_git_commit_id(repo_path, MTIME_DATE_PAST) is None
+
+
+def test_vcs_session_memoized():
+    """Values are computed once per key, even if requested concurrently."""
+    calls = []
+
+    def compute(key: str) -> str:
+        calls.append(key)
+        time.sleep(0.05)
+        return key.upper()
+
+    with vcs_session() as session:
+        with vcs_session() as nested_session:
+            assert nested_session is session
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(
+                executor.map(
+                    lambda key: session.memoized(key, partial(compute, key)), ["a", "b"] * 4
+                )
+            )
+
+    assert results == ["A", "B"] * 4
+    assert sorted(calls) == ["a", "b"]
+    assert active_vcs_session() is None
+
+
+def test_check_dirty_once_per_session(git_repo: Tuple[Path, List[str]]):
+    """In a session the dirty check runs once per repository and its warning is shared."""
+    repo_path, _ = git_repo
+    (repo_path / "uncommited_file").touch()
+
+    with pytest.warns(UncommittedChangesWarning) as recorded_warnings:
+        with vcs_session():
+            assert dirty_state(repo_path) is None
+            for _ in range(3):
+                assert check_dirty(repo_path, GIT_CHECK_DIRTY_COMMAND) is True
+            assert dirty_state(repo_path) is True
+            assert len(recorded_warnings) == 0
+
+            with deferred_warnings() as first:
+                emit_dirty_warning(repo_path)
+            with deferred_warnings() as second:
+                emit_dirty_warning(repo_path)
+            emit_dirty_warning(repo_path)
+
+    assert first[0] is second[0]
+    assert len(recorded_warnings) == 1
+
+
+@pytest.mark.parametrize(
+    "strategy,changed_file,expected",
+    (
+        ("full", "uncommited_file", True),
+        ("full", None, False),
+        ("tracked-only", "uncommited_file", False),
+        ("tracked-only", "file.txt", True),
+        ("off", "file.txt", None),
+    ),
+)
+def test_check_dirty_strategies(
+    monkeypatch: MonkeyPatch,
+    git_repo: Tuple[Path, List[str]],
+    strategy: str,
+    changed_file: Optional[str],
+    expected: Optional[bool],
+):
+    """Untracked files are only reported by the 'full' strategy."""
+    repo_path, _ = git_repo
+    if changed_file is not None:
+        (repo_path / changed_file).write_text("changed")
+    monkeypatch.setitem(VCS_SETTINGS, "dirty_check", strategy)
+
+    with warnings.catch_warnings(record=True) as recorded_warnings:
+        warnings.simplefilter("always")
+        assert check_dirty(repo_path, git_check_dirty_command()) is expected
+
+    assert len(recorded_warnings) == int(expected is True)
+
+
+def test_check_dirty_unknown_strategy(monkeypatch: MonkeyPatch):
+    """Unknown strategies raise an error."""
+    monkeypatch.setitem(VCS_SETTINGS, "dirty_check", "partial")
+
+    with pytest.raises(ValueError, match="Unknown dirty check strategy 'partial'"):
+        git_check_dirty_command()
+
+
+def test_check_dirty_memoized_on_index(monkeypatch: MonkeyPatch, git_repo: Tuple[Path, List[str]]):
+    """The check only runs again if the index changed and doesn't take optional locks."""
+    repo_path, _ = git_repo
+    (repo_path / "file.txt").write_text("changed")
+    run_commands = []
+    run = subprocess.run
+
+    def recording_run(command, *args, **kwargs):
+        run_commands.append((command, kwargs["env"]["GIT_OPTIONAL_LOCKS"]))
+        return run(command, *args, **kwargs)
+
+    monkeypatch.setattr(subprocess, "run", recording_run)
+
+    for _ in range(3):
+        with pytest.warns(UncommittedChangesWarning):
+            assert check_dirty(repo_path, GIT_CHECK_DIRTY_COMMAND) is True
+
+    assert run_commands == [(GIT_CHECK_DIRTY_COMMAND, "0")]
+
+    index_stat = (repo_path / ".git" / "index").stat()
+    os.utime(repo_path / ".git" / "index", (index_stat.st_atime, index_stat.st_mtime + 10))
+
+    with pytest.warns(UncommittedChangesWarning):
+        check_dirty(repo_path, GIT_CHECK_DIRTY_COMMAND)
+
+    assert len(run_commands) == 2
+    assert dirty_check_env()["GIT_OPTIONAL_LOCKS"] == "0"
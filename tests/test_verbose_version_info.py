@@ -1,17 +1,44 @@
 """Tests for ``verbose_version_info`` package."""
+import builtins
+import io
+import shutil
+import subprocess
+import time
+import warnings
+from collections import Counter
 from datetime import datetime
+from pathlib import Path
 from typing import Callable
+from typing import List
+from typing import Optional
+from typing import Tuple
 
 import pytest
+from _pytest.monkeypatch import MonkeyPatch
 from tests import DUMMY_PKG_ROOT
 from tests import MTIME_DATE_NOW
 from tests import MTIME_DATE_PAST
 
+import verbose_version_info.vcs
+import verbose_version_info.verbose_version_info
 from verbose_version_info import SETTINGS
 from verbose_version_info import __version__
+from verbose_version_info.data_containers import VcsInfo
 from verbose_version_info.data_containers import VerboseVersionInfo
+from verbose_version_info.utils import deadline_timeout
+from verbose_version_info.utils import emit_warning
+from verbose_version_info.utils import time_budget
+from verbose_version_info.vcs import UncommittedChangesWarning
+from verbose_version_info.vcs import active_vcs_session
+from verbose_version_info.vcs import uncommitted_changes_warning
+from verbose_version_info.verbose_version_info import LazyVerboseVersionInfo
+from verbose_version_info.verbose_version_info import iter_vv_info
+from verbose_version_info.verbose_version_info import lazy_vv_info
 from verbose_version_info.verbose_version_info import release_version
 from verbose_version_info.verbose_version_info import vv_info
+from verbose_version_info.verbose_version_info import vv_info_all
+from verbose_version_info.verbose_version_info import vv_info_many
+from verbose_version_info.verbose_version_info import vv_info_table
 
 
 @pytest.mark.parametrize(
@@ -69,6 +96,7 @@ def test_changing_not_found_version_str(monkeypatch):
                 url=(DUMMY_PKG_ROOT / "editable_install_with_dotgit").as_uri(),
                 commit_id="f3c8d36715f7cd14dc73e6b3ae76cb2669c97b5f",
                 vcs_name="git",
+                dirty=False,
             ),
         ),
         (
@@ -80,6 +108,7 @@ def test_changing_not_found_version_str(monkeypatch):
                 url=(DUMMY_PKG_ROOT / "local_install_with_dotgit").as_uri(),
                 commit_id="df5c1e9302972fa5732a320d4cdef478cf783b8f",
                 vcs_name="git",
+                dirty=False,
             ),
         ),
         (
@@ -91,6 +120,7 @@ def test_changing_not_found_version_str(monkeypatch):
                 url=(DUMMY_PKG_ROOT / "local_install_with_dotgit").as_uri(),
                 commit_id="ff76038f76fcc106885cb9f19748e989d7d862b9",
                 vcs_name="git",
+                dirty=False,
             ),
         ),
         (
@@ -122,6 +152,7 @@ def test_changing_not_found_version_str(monkeypatch):
     ),
 )
 def test_vv_info(
+    monkeypatch: MonkeyPatch,
     mock_os_stat_mtime: Callable[[datetime], None],
     distribution_name: str,
     dist_mtime: datetime,
@@ -135,8 +166,412 @@ def test_vv_info(
     - Installed from archive (tarball_test_distribution)
     - PyPi installed (pytest)
 
+    The dummy packages are inside of the checkout of this repository,
+    so the repository root discovery is stopped at their parent.
     """
+    monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(DUMMY_PKG_ROOT.resolve()))
     mock_os_stat_mtime(dist_mtime)
     result = vv_info(distribution_name)
 
     assert result == expected
+
+
+def test_vv_info_many(fake_site_packages: Callable[..., Path]):
+    """Results are in input order and not scanned distributions are looked up by name."""
+    url = "https://github.com/s-weigand/tarball-test-distribution/archive/main.zip"
+    dist_info = fake_site_packages("bulk-dist", "0.1.0", direct_url={"url": url})
+    fake_site_packages("other-dist", "0.2.0")
+    dist_time = datetime.fromtimestamp((dist_info / "METADATA").stat().st_mtime)
+
+    result = vv_info_many(["Bulk_Dist", "not-a-distribution", "other.dist"])
+
+    assert result[0] == VerboseVersionInfo(release_version="0.1.0", dist_time=dist_time, url=url)
+    assert result[1].release_version == "Unknown"
+    assert result[2].release_version == "0.2.0"
+
+
+def test_vv_info_all(fake_site_packages: Callable[..., Path]):
+    """All distributions of the environment are keyed by their name."""
+    fake_site_packages("bulk-dist", "0.1.0")
+
+    result = vv_info_all()
+
+    assert result["bulk-dist"].release_version == "0.1.0"
+    assert result["pytest"].release_version == pytest.__version__
+
+
+def test_vv_info_table(fake_site_packages: Callable[..., Path]):
+    """Same results as vv_info_many and vv_info_all in a VersionTable."""
+    fake_site_packages("bulk-dist", "0.1.0")
+
+    table = vv_info_table(["Bulk_Dist", "not-a-distribution"])
+
+    assert table.names == ["Bulk_Dist", "not-a-distribution"]
+    assert table[0] == vv_info_many(["Bulk_Dist"])[0]
+    assert table[1].release_version == "Unknown"
+    assert vv_info_table()["bulk-dist"].release_version == "0.1.0"
+
+
+@pytest.mark.parametrize("streaming", (False, True))
+def test_vv_info_many_concurrent(
+    monkeypatch: MonkeyPatch,
+    tmp_path: Path,
+    fake_site_packages: Callable[..., Path],
+    streaming: bool,
+):
+    """Concurrently resolved results and warnings keep the input order, also when streamed."""
+    distribution_names = [f"concurrent-dist-{index}" for index in range(6)]
+    for index, distribution_name in enumerate(distribution_names):
+        source_dir = tmp_path / distribution_name
+        source_dir.mkdir()
+        direct_url = {"url": source_dir.as_uri(), "dir_info": {}}
+        fake_site_packages(distribution_name, f"0.{index}", direct_url=direct_url)
+
+    def slow_reader(local_install_basepath: Path, dist_mtime: datetime) -> Optional[VcsInfo]:
+        index = int(local_install_basepath.name.rsplit("-", 1)[1])
+        time.sleep((len(distribution_names) - index) * 0.01)
+        emit_warning(UserWarning(local_install_basepath.name))
+        return VcsInfo(vcs_name="fake", commit_id=local_install_basepath.name)
+
+    monkeypatch.setattr(verbose_version_info.vcs, "VCS_COMMIT_ID_READERS", [slow_reader])
+
+    with warnings.catch_warnings(record=True) as recorded_warnings:
+        warnings.simplefilter("always")
+        if streaming:
+            streamed = list(iter_vv_info(distribution_names, max_workers=2))
+            assert [name for name, _ in streamed] == distribution_names
+            result = [vv_info for _, vv_info in streamed]
+        else:
+            result = vv_info_many(distribution_names, max_workers=4)
+
+    assert [vv_info.commit_id for vv_info in result] == distribution_names
+    assert [str(warning.message) for warning in recorded_warnings] == distribution_names
+
+
+@pytest.mark.parametrize("max_workers", (1, 2))
+def test_iter_vv_info_context_not_leaked(
+    monkeypatch: MonkeyPatch,
+    tmp_path: Path,
+    fake_site_packages: Callable[..., Path],
+    max_workers: int,
+):
+    """The session and time budget of a suspended stream aren't active for the consumer."""
+    distribution_names = [f"stream-context-dist-{index}-{max_workers}" for index in range(4)]
+    for distribution_name in distribution_names:
+        source_dir = tmp_path / distribution_name
+        source_dir.mkdir()
+        direct_url = {"url": source_dir.as_uri(), "dir_info": {}}
+        fake_site_packages(distribution_name, "0.1.0", direct_url=direct_url)
+    resolver_sessions = []
+
+    def session_reader(local_install_basepath: Path, dist_mtime: datetime) -> Optional[VcsInfo]:
+        assert deadline_timeout() is not None
+        resolver_sessions.append(active_vcs_session())
+        return None
+
+    monkeypatch.setattr(verbose_version_info.vcs, "VCS_COMMIT_ID_READERS", [session_reader])
+
+    streamed = iter_vv_info(distribution_names, max_workers=max_workers, deadline=60)
+    next(streamed)
+
+    assert active_vcs_session() is None
+    assert deadline_timeout() is None
+
+    streamed.close()
+
+    assert resolver_sessions[0] is not None
+    assert all(session is resolver_sessions[0] for session in resolver_sessions)
+
+
+@pytest.mark.parametrize("max_workers", (1, 4))
+def test_vv_info_many_shared_repository(
+    monkeypatch: MonkeyPatch,
+    git_repo: Tuple[Path, List[str]],
+    fake_site_packages: Callable[..., Path],
+    max_workers: int,
+):
+    """Distributions installed from the same repository share the vcs lookups."""
+    repo_path, commit_ids = git_repo
+    (repo_path / "uncommited_file").touch()
+    distribution_names = [f"shared-repo-dist-{index}-{max_workers}" for index in range(4)]
+    for distribution_name in distribution_names:
+        direct_url = {"url": repo_path.as_uri(), "dir_info": {"editable": True}}
+        fake_site_packages(distribution_name, "0.1.0", direct_url=direct_url)
+    dirty_checks = []
+    check_dirty = verbose_version_info.vcs._check_dirty
+
+    def counting_check_dirty(*args):
+        dirty_checks.append(args)
+        return check_dirty(*args)
+
+    monkeypatch.setattr(verbose_version_info.vcs, "_check_dirty", counting_check_dirty)
+
+    with warnings.catch_warnings(record=True) as recorded_warnings:
+        warnings.simplefilter("always")
+        result = vv_info_many(distribution_names, max_workers=max_workers)
+
+    assert [vv_info.commit_id for vv_info in result] == [commit_ids[-1]] * 4
+    assert [vv_info.dirty for vv_info in result] == [True] * 4
+    assert len(dirty_checks) == 1
+    assert len(recorded_warnings) == 1
+    assert recorded_warnings[0].category is UncommittedChangesWarning
+
+
+@pytest.mark.parametrize("streaming", (False, True))
+def test_vv_info_many_dirty_warning_order(
+    monkeypatch: MonkeyPatch,
+    git_repo: Tuple[Path, List[str]],
+    fake_site_packages: Callable[..., Path],
+    streaming: bool,
+):
+    """A shared dirty warning is emitted for the first distribution of its repository."""
+    repo_path, _ = git_repo
+    slow_repo_path = repo_path.parent / "slow_git_repo"
+    shutil.copytree(repo_path, slow_repo_path)
+    repo_paths = [slow_repo_path, repo_path]
+    for path in repo_paths:
+        (path / "uncommited_file").touch()
+    distribution_names = [f"dirty-order-dist-{index}-{streaming}" for index in range(4)]
+    for index, distribution_name in enumerate(distribution_names):
+        source_dir = repo_paths[index % 2] / distribution_name
+        source_dir.mkdir()
+        direct_url = {"url": source_dir.as_uri(), "dir_info": {"editable": True}}
+        fake_site_packages(distribution_name, "0.1.0", direct_url=direct_url)
+    vcs_root = verbose_version_info.vcs.vcs_root
+    check_dirty = verbose_version_info.vcs._check_dirty
+
+    def late_vcs_root(path: Path) -> Path:
+        if path.name == distribution_names[0]:
+            time.sleep(0.1)
+        return vcs_root(path)
+
+    def slow_check_dirty(path: Path, *args):
+        if path == slow_repo_path:
+            time.sleep(0.2)
+        return check_dirty(path, *args)
+
+    monkeypatch.setattr(verbose_version_info.vcs, "vcs_root", late_vcs_root)
+    monkeypatch.setattr(verbose_version_info.vcs, "_check_dirty", slow_check_dirty)
+
+    with warnings.catch_warnings(record=True) as recorded_warnings:
+        warnings.simplefilter("always")
+        if streaming:
+            list(iter_vv_info(distribution_names, max_workers=4))
+        else:
+            vv_info_many(distribution_names, max_workers=4)
+
+    assert [warning.category for warning in recorded_warnings] == [UncommittedChangesWarning] * 2
+    assert [str(warning.message) for warning in recorded_warnings] == [
+        str(uncommitted_changes_warning(path)) for path in repo_paths
+    ]
+
+
+@pytest.mark.parametrize(
+    "direct_url",
+    (
+        None,
+        {"url": "https://foo.bar/dist.zip"},
+        {"url": "local", "dir_info": {}},
+        {"url": "git_repo", "dir_info": {}},
+    ),
+    ids=("pypi", "archive", "local", "local-git"),
+)
+def test_vv_info_reads_files_once(
+    request: pytest.FixtureRequest,
+    monkeypatch: MonkeyPatch,
+    tmp_path: Path,
+    fake_site_packages: Callable[..., Path],
+    direct_url: Optional[dict],
+):
+    """Each file of a distribution is read at most once per vv_info call."""
+    if direct_url is not None and direct_url["url"] == "local":
+        direct_url = {"url": tmp_path.as_uri(), "dir_info": {}}
+    elif direct_url is not None and direct_url["url"] == "git_repo":
+        repo_path, _ = request.getfixturevalue("git_repo")
+        direct_url = {"url": repo_path.as_uri(), "dir_info": {}}
+    distribution_name = f"read-once-dist-{len(str(direct_url))}"
+    fake_site_packages(distribution_name, "0.1.0", direct_url=direct_url)
+    opened_files: List[str] = []
+    io_open = io.open
+
+    def counting_open(file, *args, **kwargs):
+        opened_file = io_open(file, *args, **kwargs)
+        # failed probes for optional files aren't reads
+        opened_files.append(str(file))
+        return opened_file
+
+    monkeypatch.setattr(io, "open", counting_open)
+    monkeypatch.setattr(builtins, "open", counting_open)
+    result = vv_info(distribution_name)
+    monkeypatch.undo()
+
+    assert result.release_version == "0.1.0"
+    assert any(opened_file.endswith("METADATA") for opened_file in opened_files)
+    assert [opened_file for opened_file, count in Counter(opened_files).items() if count > 1] == []
+
+
+def test_lazy_vv_info(
+    monkeypatch: MonkeyPatch,
+    git_repo: Tuple[Path, List[str]],
+    fake_site_packages: Callable[..., Path],
+):
+    """Cheap fields don't run subprocesses, the resolved result is the same as vv_info."""
+    repo_path, commit_ids = git_repo
+    direct_url = {"url": repo_path.as_uri(), "dir_info": {}}
+    dist_info = fake_site_packages("lazy-dist", "0.1.0", direct_url=direct_url)
+    dist_time = datetime.fromtimestamp((dist_info / "METADATA").stat().st_mtime)
+
+    def raise_error(*args, **kwargs):
+        raise AssertionError("No subprocess should be run")
+
+    monkeypatch.setattr(subprocess, "Popen", raise_error)
+    result = lazy_vv_info("lazy-dist")
+
+    assert isinstance(result, LazyVerboseVersionInfo)
+    assert result.release_version == "0.1.0"
+    assert result.dist_time == dist_time
+    assert result.url == repo_path.as_uri()
+    assert result.resolved is False
+    assert "unresolved" in repr(result)
+
+    monkeypatch.undo()
+
+    assert result.commit_id == commit_ids[-1]
+    assert result.resolved is True
+    assert result == vv_info("lazy-dist")
+    assert result.resolve() == VerboseVersionInfo(
+        release_version="0.1.0",
+        dist_time=dist_time,
+        url=repo_path.as_uri(),
+        commit_id=commit_ids[-1],
+        vcs_name="git",
+        dirty=False,
+    )
+    assert tuple(result) == tuple(result.resolve())
+    assert result._asdict()["vcs_name"] == "git"
+    assert repr(result) == f"Lazy{result.resolve()!r}"
+
+
+def test_vv_info_deadline(
+    monkeypatch: MonkeyPatch,
+    git_repo: Tuple[Path, List[str]],
+    fake_site_packages: Callable[..., Path],
+):
+    """Stages which don't fit in the time budget are skipped and marked."""
+    repo_path, commit_ids = git_repo
+    direct_url = {"url": repo_path.as_uri(), "dir_info": {}}
+    dist_info = fake_site_packages("deadline-dist", "0.1.0", direct_url=direct_url)
+    dist_time = datetime.fromtimestamp((dist_info / "METADATA").stat().st_mtime)
+    hanging_command = ("python", "-c", "import time; time.sleep(30)")
+
+    assert vv_info("deadline-dist", deadline=0) == VerboseVersionInfo(
+        release_version="0.1.0",
+        dist_time=dist_time,
+        skipped_stages=("url", "vcs", "dirty"),
+    )
+
+    monkeypatch.setattr(verbose_version_info.vcs, "GIT_CHECK_DIRTY_COMMAND", hanging_command)
+    start = time.monotonic()
+    result = vv_info("deadline-dist", deadline=0.5)
+
+    assert time.monotonic() - start < 5
+    assert result == VerboseVersionInfo(
+        release_version="0.1.0",
+        dist_time=dist_time,
+        url=repo_path.as_uri(),
+        commit_id=commit_ids[-1],
+        vcs_name="git",
+        skipped_stages=("dirty",),
+    )
+
+    def hanging_reader(local_install_basepath: Path, dist_mtime: datetime) -> Optional[VcsInfo]:
+        return verbose_version_info.vcs.run_vcs_commit_id_command(
+            vcs_name="git",
+            commit_id_command=hanging_command,
+            local_install_basepath=local_install_basepath,
+        )
+
+    monkeypatch.setattr(verbose_version_info.vcs, "VCS_COMMIT_ID_READERS", [hanging_reader])
+    start = time.monotonic()
+    result = vv_info_many(["deadline-dist", "pytest"], max_workers=2, deadline=0.5)
+
+    assert time.monotonic() - start < 5
+    assert result[0] == VerboseVersionInfo(
+        release_version="0.1.0",
+        dist_time=dist_time,
+        url=repo_path.as_uri(),
+        skipped_stages=("vcs", "dirty"),
+    )
+    assert result[1].release_version == pytest.__version__
+    assert result[1].skipped_stages == ()
+
+
+@pytest.mark.parametrize(
+    "distribution_name,resolve",
+    (
+        ("enclosing-budget-dist", vv_info),
+        (
+            "enclosing-budget-many-dist",
+            lambda distribution_name: vv_info_many([distribution_name], max_workers=2)[0],
+        ),
+        (
+            "enclosing-budget-lazy-dist",
+            lambda distribution_name: lazy_vv_info(distribution_name).resolve(),
+        ),
+    ),
+    ids=("vv_info", "vv_info_many", "lazy_vv_info"),
+)
+def test_enclosing_time_budget(
+    monkeypatch: MonkeyPatch,
+    git_repo: Tuple[Path, List[str]],
+    fake_site_packages: Callable[..., Path],
+    distribution_name: str,
+    resolve: Callable[[str], VerboseVersionInfo],
+):
+    """A time budget around the lookups gives partial results instead of raising."""
+    repo_path, _ = git_repo
+    direct_url = {"url": repo_path.as_uri(), "dir_info": {}}
+    dist_info = fake_site_packages(distribution_name, "0.1.0", direct_url=direct_url)
+    dist_time = datetime.fromtimestamp((dist_info / "METADATA").stat().st_mtime)
+
+    def hanging_reader(local_install_basepath: Path, dist_mtime: datetime) -> Optional[VcsInfo]:
+        return verbose_version_info.vcs.run_vcs_commit_id_command(
+            vcs_name="git",
+            commit_id_command=("python", "-c", "import time; time.sleep(30)"),
+            local_install_basepath=local_install_basepath,
+        )
+
+    monkeypatch.setattr(verbose_version_info.vcs, "VCS_COMMIT_ID_READERS", [hanging_reader])
+
+    start = time.monotonic()
+    with time_budget(0.3):
+        result = resolve(distribution_name)
+
+    assert time.monotonic() - start < 5
+    assert result == VerboseVersionInfo(
+        release_version="0.1.0",
+        dist_time=dist_time,
+        url=repo_path.as_uri(),
+        skipped_stages=("vcs", "dirty"),
+    )
+
+    with time_budget(0):
+        assert resolve(distribution_name).skipped_stages == ("url", "vcs", "dirty")
+
+
+def test_vv_info_src_layout(
+    git_repo: Tuple[Path, List[str]], fake_site_packages: Callable[..., Path]
+):
+    """The repository is found for installations from a subdirectory of the checkout."""
+    repo_path, commit_ids = git_repo
+    package_path = repo_path / "packages" / "sub-package"
+    package_path.mkdir(parents=True)
+    direct_url = {"url": package_path.as_uri(), "dir_info": {}}
+    fake_site_packages("src-layout-dist", "0.1.0", direct_url=direct_url)
+
+    result = vv_info("src-layout-dist")
+
+    assert result.url == package_path.as_uri()
+    assert result.commit_id == commit_ids[-1]
+    assert result.vcs_name == "git"
+    assert result.dirty is False
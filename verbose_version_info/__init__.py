@@ -1,6 +1,98 @@
-"""Top-level package for verbose-version-info."""
+"""Top-level package for verbose-version-info.
+
+The public API is re-exported lazily, so ``import verbose_version_info`` stays cheap
+and a submodule is only imported once one of its attributes is accessed.
+"""
 from verbose_version_info.settings import SETTINGS
 
+# typing isn't imported at runtime, since it takes longer to import than the package
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
+    from typing import List
+
+    from verbose_version_info.aio import avv_info
+    from verbose_version_info.aio import avv_info_many
+    from verbose_version_info.data_containers import VerboseVersionInfo
+    from verbose_version_info.data_containers import VersionTable
+    from verbose_version_info.export import export_vv_info
+    from verbose_version_info.export import load_vv_info
+    from verbose_version_info.tracing import StageHistogram
+    from verbose_version_info.tracing import trace_hook
+    from verbose_version_info.utils import time_budget
+    from verbose_version_info.verbose_version_info import LazyVerboseVersionInfo
+    from verbose_version_info.verbose_version_info import iter_vv_info
+    from verbose_version_info.verbose_version_info import lazy_vv_info
+    from verbose_version_info.verbose_version_info import release_version
+    from verbose_version_info.verbose_version_info import vv_info
+    from verbose_version_info.verbose_version_info import vv_info_all
+    from verbose_version_info.verbose_version_info import vv_info_many
+    from verbose_version_info.verbose_version_info import vv_info_table
+
 __author__ = """Sebastian Weigand"""
 __email__ = "s.weigand.phy@gmail.com"
 __version__ = "0.0.1"
+
+_LAZY_ATTRIBUTES = {
+    "avv_info": "verbose_version_info.aio",
+    "avv_info_many": "verbose_version_info.aio",
+    "VerboseVersionInfo": "verbose_version_info.data_containers",
+    "VersionTable": "verbose_version_info.data_containers",
+    "export_vv_info": "verbose_version_info.export",
+    "load_vv_info": "verbose_version_info.export",
+    "StageHistogram": "verbose_version_info.tracing",
+    "trace_hook": "verbose_version_info.tracing",
+    "time_budget": "verbose_version_info.utils",
+    "LazyVerboseVersionInfo": "verbose_version_info.verbose_version_info",
+    "iter_vv_info": "verbose_version_info.verbose_version_info",
+    "lazy_vv_info": "verbose_version_info.verbose_version_info",
+    "release_version": "verbose_version_info.verbose_version_info",
+    "vv_info": "verbose_version_info.verbose_version_info",
+    "vv_info_all": "verbose_version_info.verbose_version_info",
+    "vv_info_many": "verbose_version_info.verbose_version_info",
+    "vv_info_table": "verbose_version_info.verbose_version_info",
+}
+"""Public attributes of the package by the submodule they are defined in."""
+
+__all__ = ["SETTINGS", *_LAZY_ATTRIBUTES]
+
+
+def __getattr__(name: str) -> "Any":
+    """Import the submodule defining a public attribute on first access.
+
+    The attribute is cached in the package namespace, so later lookups
+    don't go through this function again.
+
+    Parameters
+    ----------
+    name : str
+        Name of the attribute.
+
+    Returns
+    -------
+    Any
+        The public attribute.
+
+    Raises
+    ------
+    AttributeError
+        If ``name`` isn't a public attribute of the package.
+    """
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(_LAZY_ATTRIBUTES[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> "List[str]":
+    """List the attributes of the package including the not yet imported ones.
+
+    Returns
+    -------
+    List[str]
+        Names of the attributes.
+    """
+    return sorted({*globals(), *_LAZY_ATTRIBUTES})
@@ -0,0 +1,435 @@
+"""Module containing the asyncio counterparts of the main functions.
+
+Only running the vcs commands is done asynchronously, the metadata of a distribution
+is read from small local files which doesn't block the event loop noticeably.
+"""
+import asyncio
+from contextvars import copy_context
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+from typing import Hashable
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import TypeVar
+from typing import Union
+
+from verbose_version_info.cache import get_cache
+from verbose_version_info.cache import local_checkout_root
+from verbose_version_info.cache import store_resolved_vv_info
+from verbose_version_info.data_containers import VcsInfo
+from verbose_version_info.data_containers import VerboseVersionInfo
+from verbose_version_info.settings import CACHE_SETTINGS
+from verbose_version_info.settings import VCS_SETTINGS
+from verbose_version_info.tracing import command_name
+from verbose_version_info.tracing import traced_stage
+from verbose_version_info.utils import ResolutionContext
+from verbose_version_info.utils import _datetime_now
+from verbose_version_info.vcs import VcsSession
+from verbose_version_info.vcs import active_vcs_session
+from verbose_version_info.vcs import dirty_check_env
+from verbose_version_info.vcs import dirty_state
+from verbose_version_info.vcs import git_check_dirty_command
+from verbose_version_info.vcs import git_commit_id_command
+from verbose_version_info.vcs import git_dir_last_commit_id
+from verbose_version_info.vcs import git_index_mtime
+from verbose_version_info.vcs import matching_vcs_readers
+from verbose_version_info.vcs import memoize_dirty_result
+from verbose_version_info.vcs import memoized_dirty_result
+from verbose_version_info.vcs import parse_dirty_check
+from verbose_version_info.vcs import vcs_lookup_key
+from verbose_version_info.vcs import vcs_marker
+from verbose_version_info.vcs import vcs_root
+from verbose_version_info.vcs import vcs_session
+from verbose_version_info.vcs import warn_uncommitted_changes
+from verbose_version_info.verbose_version_info import _vv_info_without_vcs
+
+AsyncVcsCommitIdReader = Callable[[Path, datetime], Awaitable[Optional[VcsInfo]]]
+
+ASYNC_VCS_COMMIT_ID_READERS: List[AsyncVcsCommitIdReader] = []
+
+T = TypeVar("T")
+
+
+def add_async_vcs_commit_id_reader(func: AsyncVcsCommitIdReader) -> AsyncVcsCommitIdReader:
+    """Add async vcs commit_id reader function to the list of registered function.
+
+    Parameters
+    ----------
+    func : AsyncVcsCommitIdReader
+        Function to be added
+
+    Returns
+    -------
+    AsyncVcsCommitIdReader
+        Originally added function.
+
+    See Also
+    --------
+    verbose_version_info.vcs.add_vcs_commit_id_reader
+    """
+    ASYNC_VCS_COMMIT_ID_READERS.append(func)
+
+    return func
+
+
+async def run_command(
+    command: Union[List[str], Tuple[str, ...]], cwd: Path, env: Optional[Dict[str, str]] = None
+) -> Tuple[int, str]:
+    """Run a command as asyncio subprocess.
+
+    If the awaiting task gets cancelled the subprocess is killed.
+
+    Parameters
+    ----------
+    command : Union[List[str], Tuple[str, ...]]
+        Command to run.
+    cwd : Path
+        Working directory to run the command in.
+    env : Optional[Dict[str, str]]
+        Environment of the command, by default None which inherits the current one.
+
+    Returns
+    -------
+    Tuple[int, str]
+        Returncode and decoded stdout with stripped trailing whitespace.
+
+    Raises
+    ------
+    asyncio.CancelledError
+        If the awaiting task was cancelled.
+    """
+    with traced_stage("subprocess", command_name(command), argv=command) as trace_details:
+        process = await asyncio.create_subprocess_exec(
+            *command, cwd=cwd, env=env, stdout=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, _ = await process.communicate()
+        except asyncio.CancelledError:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+        trace_details["returncode"] = process.returncode
+    return process.returncode, stdout.decode().rstrip()  # type: ignore[return-value]
+
+
+async def async_memoized(
+    session: VcsSession, key: Hashable, compute: Callable[[], Awaitable[T]]
+) -> T:
+    """Asyncio counterpart of :meth:`verbose_version_info.vcs.VcsSession.memoized`.
+
+    The first request of ``key`` starts a task running ``compute``,
+    all requests of ``key`` await that same task.
+    The task is shielded, so cancelling one of the awaiting tasks doesn't cancel
+    the shared task and with it the other awaiting tasks.
+
+    Parameters
+    ----------
+    session : VcsSession
+        Session to memoize the task in.
+    key : Hashable
+        Key of the memoized value.
+    compute : Callable[[], Awaitable[T]]
+        Coroutine function computing the value.
+
+    Returns
+    -------
+    T
+        Memoized value.
+    """
+    task = session.memoized(("async", key), lambda: asyncio.ensure_future(compute()))
+    return await asyncio.shield(task)
+
+
+async def async_run_vcs_commit_id_command(
+    *,
+    vcs_name: str,
+    commit_id_command: Union[List[str], Tuple[str, ...]],
+    local_install_basepath: Path,
+    need_to_exist_path_child: str = ".",
+    check_dirty_command: Optional[Union[List[str], Tuple[str, ...]]] = None,
+) -> Optional[VcsInfo]:
+    """Asyncio counterpart of :func:`verbose_version_info.vcs.run_vcs_commit_id_command`.
+
+    Parameters
+    ----------
+    vcs_name : str
+        Name if the vcs, which will be used as part of the result.
+    commit_id_command : Union[List[str], Tuple[str, ...]]
+        Shell command to return the commit_id.
+    local_install_basepath : Path
+        Basepath of the local installation.
+    need_to_exist_path_child : str
+        Childitem that needs to exists inside of local_install_basepath.
+        E.g. for ``git``: ``".git"``. by default "."
+    check_dirty_command : Optional[Union[List[str], Tuple[str, ...]]]
+        Command to be run for checking if a directory contains uncommitted changes.
+        E.g. for ``git``: ``("git", "status", "-s")``by default None
+
+    Returns
+    -------
+    Optional[VcsInfo]
+        (vcs_name, commit_id)
+    """
+    if (local_install_basepath / need_to_exist_path_child).exists():
+        if check_dirty_command is not None:
+            await async_check_dirty(local_install_basepath, check_dirty_command)
+
+        try:
+            returncode, commit_id = await run_command(commit_id_command, local_install_basepath)
+        except FileNotFoundError:
+            # vcs executable isn't installed
+            return None
+        if returncode == 0 and commit_id != "":
+            return VcsInfo(vcs_name=vcs_name, commit_id=commit_id)
+    return None
+
+
+async def _async_check_dirty(
+    local_install_basepath: Path, check_dirty_command: Union[List[str], Tuple[str, ...]]
+) -> Optional[bool]:
+    """Run the dirty check and warn if the checkout contains uncommitted changes.
+
+    Parameters
+    ----------
+    local_install_basepath : Path
+        Basepath of the local installation.
+    check_dirty_command : Union[List[str], Tuple[str, ...]]
+        Command to be run for checking if a directory contains uncommitted changes.
+
+    Returns
+    -------
+    Optional[bool]
+        Whether there are uncommitted changes, None if the vcs couldn't be run.
+    """
+    index_mtime = git_index_mtime(local_install_basepath, check_dirty_command)
+    is_dirt = memoized_dirty_result(local_install_basepath, check_dirty_command, index_mtime)
+    if is_dirt is None:
+        try:
+            returncode, output = await run_command(
+                check_dirty_command, local_install_basepath, env=dirty_check_env()
+            )
+        except FileNotFoundError:
+            # vcs executable isn't installed
+            return None
+        is_dirt = parse_dirty_check(returncode, output)
+        memoize_dirty_result(local_install_basepath, check_dirty_command, index_mtime, is_dirt)
+    if is_dirt:
+        warn_uncommitted_changes(local_install_basepath)
+    return is_dirt
+
+
+async def async_check_dirty(
+    local_install_basepath: Path,
+    check_dirty_command: Optional[Union[List[str], Tuple[str, ...]]],
+) -> Optional[bool]:
+    """Asyncio counterpart of :func:`verbose_version_info.vcs.check_dirty`.
+
+    Parameters
+    ----------
+    local_install_basepath : Path
+        Basepath of the local installation.
+    check_dirty_command : Optional[Union[List[str], Tuple[str, ...]]]
+        Command to be run for checking if a directory contains uncommitted changes,
+        None if the check is disabled.
+
+    Returns
+    -------
+    Optional[bool]
+        Whether there are uncommitted changes,
+        None if the check or warnings are disabled or the vcs couldn't be run.
+    """
+    if VCS_SETTINGS["warn_dirty"] is not True or check_dirty_command is None:
+        return None
+    session = active_vcs_session()
+    if session is None:
+        return await _async_check_dirty(local_install_basepath, check_dirty_command)
+    key = ("dirty", vcs_root(local_install_basepath))
+    is_dirty = await async_memoized(
+        session, key, partial(_async_check_dirty, local_install_basepath, check_dirty_command)
+    )
+    # makes the result available to verbose_version_info.vcs.dirty_state
+    session.set(key, is_dirty)
+    return is_dirty
+
+
+@add_async_vcs_commit_id_reader
+@vcs_marker(".git")
+async def async_git_dir_commit_id(
+    local_install_basepath: Path, dist_mtime: datetime
+) -> Optional[VcsInfo]:
+    """Asyncio counterpart of :func:`verbose_version_info.vcs.git_dir_commit_id`.
+
+    Reading the git directory is blocking file IO, so it runs in the default executor
+    with a copy of the current context (containing the vcs session and time budget).
+
+    Parameters
+    ----------
+    local_install_basepath : Path
+        Basepath of the local installation.
+    dist_mtime: datetime
+        Time the packaged distribution was modified.
+
+    Returns
+    -------
+    Optional[VcsInfo]
+        (vcs_name, commit_id)
+    """
+    commit_id: Optional[str] = await asyncio.get_running_loop().run_in_executor(
+        None, copy_context().run, git_dir_last_commit_id, local_install_basepath, dist_mtime
+    )
+    if commit_id is None:
+        return None
+    await async_check_dirty(local_install_basepath, git_check_dirty_command())
+    return VcsInfo(vcs_name="git", commit_id=commit_id)
+
+
+@add_async_vcs_commit_id_reader
+@vcs_marker(".git")
+async def async_local_git_commit_id(
+    local_install_basepath: Path, dist_mtime: datetime
+) -> Optional[VcsInfo]:
+    """Asyncio counterpart of :func:`verbose_version_info.vcs.local_git_commit_id`.
+
+    Parameters
+    ----------
+    local_install_basepath : Path
+        Basepath of the local installation.
+    dist_mtime: datetime
+        Time the packaged distribution was modified.
+        This is only important for none editable installations from source.
+
+    Returns
+    -------
+    Optional[VcsInfo]
+        (vcs_name, commit_id)
+    """
+    return await async_run_vcs_commit_id_command(
+        vcs_name="git",
+        commit_id_command=git_commit_id_command(dist_mtime),
+        local_install_basepath=local_install_basepath,
+        need_to_exist_path_child=".git",
+        check_dirty_command=git_check_dirty_command(),
+    )
+
+
+async def _async_read_vcs_commit_id(repo_root: Path, dist_mtime: datetime) -> Optional[VcsInfo]:
+    """Run the registered async vcs commit_id readers until one of them finds a commit.
+
+    Only readers which marker (e.g. ``.git``) is in ``repo_root`` are run.
+
+    Parameters
+    ----------
+    repo_root : Path
+        Root of the repository of a local installation.
+    dist_mtime : datetime
+        Time the packaged distribution was modified.
+
+    Returns
+    -------
+    Optional[VcsInfo]
+        (vcs_name, commit_id) or None if no reader found a commit.
+    """
+    for vsc_reader in matching_vcs_readers(ASYNC_VCS_COMMIT_ID_READERS, repo_root):
+        with traced_stage("vcs_reader", getattr(vsc_reader, "__name__", "")) as trace_details:
+            vcs_info = await vsc_reader(repo_root, dist_mtime)
+            trace_details["found"] = vcs_info is not None
+        if vcs_info is not None:
+            return vcs_info
+    return None
+
+
+async def avv_info(distribution_name: str) -> VerboseVersionInfo:
+    """Asyncio counterpart of :func:`verbose_version_info.verbose_version_info.vv_info`.
+
+    Parameters
+    ----------
+    distribution_name : str
+        The name of the distribution package as a string.
+
+    Returns
+    -------
+    VerboseVersionInfo
+        Verbose version information of the installed package,
+        as detailed as possible.
+    """
+    context = ResolutionContext(distribution_name)
+    use_cache = CACHE_SETTINGS["enabled"] is True
+    if use_cache and context.metadata_dir is not None:
+        cached_result = get_cache().lookup(context.metadata_dir)
+        if cached_result is not None:
+            repo_root = local_checkout_root(cached_result)
+            if repo_root is None or CACHE_SETTINGS["recheck_dirty"] is not True:
+                return cached_result
+            # dirty isn't cached, only results of git checkouts are cached
+            return cached_result._replace(
+                dirty=await async_check_dirty(repo_root, git_check_dirty_command())
+            )
+    resolve_start = _datetime_now()
+    result, local_path = _vv_info_without_vcs(context)
+    if local_path is not None:
+        with vcs_session() as session:
+            repo_root = vcs_root(local_path)
+            vcs_info = await async_memoized(
+                session,
+                vcs_lookup_key(repo_root, result.dist_time),
+                partial(_async_read_vcs_commit_id, repo_root, result.dist_time),
+            )
+            if vcs_info is not None:
+                result = result._replace(
+                    vcs_name=vcs_info.vcs_name,
+                    commit_id=vcs_info.commit_id,
+                    dirty=dirty_state(repo_root),
+                )
+    if use_cache:
+        store_resolved_vv_info(context, result, resolve_start)
+    return result
+
+
+async def avv_info_many(
+    distribution_names: Iterable[str], *, max_concurrency: int = 8
+) -> List[VerboseVersionInfo]:
+    """Asyncio counterpart of :func:`verbose_version_info.verbose_version_info.vv_info_many`.
+
+    Parameters
+    ----------
+    distribution_names : Iterable[str]
+        Names of the distribution packages.
+    max_concurrency : int
+        Maximum number of distributions resolved at the same time, by default 8
+
+    Returns
+    -------
+    List[VerboseVersionInfo]
+        Verbose version information in the same order as ``distribution_names``.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def limited_avv_info(distribution_name: str) -> VerboseVersionInfo:
+        """Run :func:`avv_info` once the semaphore allows it.
+
+        Parameters
+        ----------
+        distribution_name : str
+            The name of the distribution package as a string.
+
+        Returns
+        -------
+        VerboseVersionInfo
+            Verbose version information of the installed package.
+        """
+        async with semaphore:
+            return await avv_info(distribution_name)
+
+    with vcs_session():
+        return list(
+            await asyncio.gather(
+                *(limited_avv_info(distribution_name) for distribution_name in distribution_names)
+            )
+        )
@@ -0,0 +1,433 @@
+"""Module containing the persistent cache for verbose version information.
+
+The cache is disabled by default and can be activated with
+``CACHE_SETTINGS["enabled"] = True``.
+Entries are keyed on the metadata directory (e.g. ``*.dist-info``) of a distribution
+as found on the current ``sys.path``, so environments sharing the cache directory
+don't see each others entries. An entry is only valid as long as the identity
+(inode, mtime and size) of that directory didn't change and for results read from
+a local git checkout, as long as the files ``HEAD`` resolves through
+(e.g. ``refs/heads/main`` and ``packed-refs``) didn't change.
+
+``dirty`` isn't cached, since editing a tracked file changes none of the files
+the cache could check. Cached results have ``dirty=None``, unless
+``CACHE_SETTINGS["recheck_dirty"] = True``, which runs the dirty check (and emits
+its warning) on each cache hit of a result from a local checkout, at the cost of
+running the vcs again.
+
+Known limitations:
+    * Only results of local checkouts of ``git`` are cached, since other vcs
+      have no key files to check.
+    * Rewriting history without moving a ref (e.g. ``git replace``) or changing the
+      objects of a repository by other means doesn't invalidate the entries.
+"""
+import atexit
+import os
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import cast
+
+from verbose_version_info.data_containers import VerboseVersionInfo
+from verbose_version_info.git_repository import find_git_dir
+from verbose_version_info.git_repository import ref_files
+from verbose_version_info.resource_finders import file_uri_to_path
+from verbose_version_info.settings import CACHE_SETTINGS
+from verbose_version_info.utils import ResolutionContext
+from verbose_version_info.utils import _datetime_now
+from verbose_version_info.utils import collect_skipped_stages
+from verbose_version_info.vcs import check_dirty
+from verbose_version_info.vcs import emit_dirty_warning
+from verbose_version_info.vcs import git_check_dirty_command
+from verbose_version_info.vcs import vcs_root
+
+CACHE_FILE_NAME = "vv_info_cache.json"
+CACHE_FORMAT_VERSION = 2
+
+
+def git_checkout_key_files(repo_root: Path) -> Optional[List[Path]]:
+    """Files of a git checkout which identities are part of the cache key.
+
+    Parameters
+    ----------
+    repo_root : Path
+        Root of the checkout as returned by :func:`verbose_version_info.vcs.vcs_root`.
+
+    Returns
+    -------
+    Optional[List[Path]]
+        The files ``HEAD`` is resolved through, None if the git directory
+        couldn't be found.
+    """
+    git_dir = find_git_dir(repo_root)
+    if git_dir is None:
+        return None
+    return ref_files(git_dir)
+
+
+VCS_CHECKOUT_KEY_FILES: Dict[str, Callable[[Path], Optional[List[Path]]]] = {
+    "git": git_checkout_key_files
+}
+"""Functions returning the files of a vcs checkout which identities are part of the cache key.
+
+Results of local checkouts of other vcs aren't cached."""
+
+
+def default_cache_dir() -> Path:
+    """User cache directory used if ``CACHE_SETTINGS["cache_dir"]`` isn't set.
+
+    Returns
+    -------
+    Path
+        ``%LOCALAPPDATA%/verbose-version-info`` on windows and
+        ``$XDG_CACHE_HOME/verbose-version-info`` (default ``~/.cache``) otherwise.
+    """
+    if sys.platform.startswith("win"):  # pragma: no cover
+        base_dir = os.environ.get("LOCALAPPDATA") or str(Path.home() / "AppData" / "Local")
+    else:
+        base_dir = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base_dir) / "verbose-version-info"
+
+
+def _path_identity(path: str) -> Optional[List[int]]:
+    """Identity of a path used to check if a cache entry is still valid.
+
+    Parameters
+    ----------
+    path : str
+        Path to get the identity for.
+
+    Returns
+    -------
+    Optional[List[int]]
+        Inode, modification time in ns and size of the path, None if it doesn't exist.
+    """
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return None
+    return [stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_size]
+
+
+def local_checkout_root(result: VerboseVersionInfo) -> Optional[Path]:
+    """Root of the local vcs checkout a result was read from.
+
+    Parameters
+    ----------
+    result : VerboseVersionInfo
+        Resolved or cached verbose version information.
+
+    Returns
+    -------
+    Optional[Path]
+        Root of the checkout, None if the result wasn't read from a local checkout.
+    """
+    if result.vcs_name == "" or not result.url.startswith("file://"):
+        return None
+    local_path = file_uri_to_path(result.url)
+    if local_path is None:
+        return None
+    return vcs_root(local_path)
+
+
+def _vcs_checkout_identity(result: VerboseVersionInfo) -> Optional[Dict[str, Optional[List[int]]]]:
+    """Identities of the vcs checkout files a result depends on.
+
+    Parameters
+    ----------
+    result : VerboseVersionInfo
+        Result to be cached.
+
+    Returns
+    -------
+    Optional[Dict[str, Optional[List[int]]]]
+        Mapping of paths to their identity, empty if the result wasn't resolved
+        from a local vcs checkout and None if it can't be cached.
+    """
+    repo_root = local_checkout_root(result)
+    if repo_root is None:
+        return {}
+    if result.vcs_name not in VCS_CHECKOUT_KEY_FILES:
+        return None
+    key_files = VCS_CHECKOUT_KEY_FILES[result.vcs_name](repo_root)
+    if key_files is None:
+        return None
+    return {str(key_file): _path_identity(str(key_file)) for key_file in key_files}
+
+
+class VvInfoCache:
+    """Persistent least recently used cache for :class:`VerboseVersionInfo`.
+
+    Entries are kept in memory and only written to disk by :meth:`save`,
+    which is run at interpreter exit if there are unsaved changes.
+
+    Parameters
+    ----------
+    cache_file : Path
+        File the cache is persisted to.
+    max_entries : int
+        Maximum number of entries, the least recently used are evicted first.
+    """
+
+    def __init__(self, cache_file: Path, max_entries: int):
+        self.cache_file = cache_file
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._unsaved_changes = False
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        """Load the persisted entries, broken or outdated cache files are ignored."""
+        import json
+
+        try:
+            with open(self.cache_file, encoding="utf8") as f:
+                data = json.load(f)
+            if data["version"] == CACHE_FORMAT_VERSION:
+                self._entries = data["entries"]
+        except (OSError, ValueError, KeyError, TypeError):
+            self._entries = {}
+
+    def __len__(self) -> int:
+        """Number of cache entries.
+
+        Returns
+        -------
+        int
+            Number of cache entries.
+        """
+        return len(self._entries)
+
+    def lookup(self, metadata_dir: Path) -> Optional[VerboseVersionInfo]:
+        """Cached verbose version information if the entry is still valid.
+
+        ``dirty`` isn't cached, so it is always None in the returned result.
+
+        Parameters
+        ----------
+        metadata_dir : Path
+            Metadata directory of the distribution, e.g. ``*.dist-info``.
+
+        Returns
+        -------
+        Optional[VerboseVersionInfo]
+            Cached result or None if there was no valid entry.
+        """
+        key = str(metadata_dir)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if _path_identity(key) != entry["identity"] or any(
+                _path_identity(path) != identity
+                for path, identity in entry["vcs_identity"].items()
+            ):
+                del self._entries[key]
+                self._unsaved_changes = True
+                return None
+            # move to the end to mark it as the most recently used
+            self._entries[key] = self._entries.pop(key)
+            self._unsaved_changes = True
+        dist_time = (
+            _datetime_now()
+            if entry["dist_time_is_now"]
+            else datetime.fromtimestamp(entry["dist_time"])
+        )
+        return VerboseVersionInfo(dist_time=dist_time, **entry["vv_info"])
+
+    def store(
+        self,
+        metadata_dir: Path,
+        result: VerboseVersionInfo,
+        dist_time_is_now: bool = False,
+    ) -> None:
+        """Add or replace the entry for a distribution.
+
+        Results of local checkouts which can't be revalidated aren't stored.
+
+        Parameters
+        ----------
+        metadata_dir : Path
+            Metadata directory of the distribution, e.g. ``*.dist-info``.
+        result : VerboseVersionInfo
+            Result to cache.
+        dist_time_is_now : bool
+            Whether ``dist_time`` is the time of the lookup (e.g. editable installations)
+            rather than the modification time of the distribution, by default False
+        """
+        identity = _path_identity(str(metadata_dir))
+        vcs_identity = _vcs_checkout_identity(result)
+        if identity is None or vcs_identity is None:
+            return
+        vv_info_dict = result._asdict()
+        for field in ("dist_time", "dirty", "skipped_stages"):
+            vv_info_dict.pop(field)
+        entry = {
+            "identity": identity,
+            "vcs_identity": vcs_identity,
+            "dist_time": result.dist_time.timestamp(),
+            "dist_time_is_now": dist_time_is_now,
+            "vv_info": vv_info_dict,
+        }
+        with self._lock:
+            self._entries.pop(str(metadata_dir), None)
+            self._entries[str(metadata_dir)] = entry
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+            self._unsaved_changes = True
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._unsaved_changes = True
+
+    def save(self) -> None:
+        """Atomically write the entries to :attr:`cache_file` if there are unsaved changes."""
+        import json
+
+        with self._lock:
+            if not self._unsaved_changes:
+                return
+            data = {"version": CACHE_FORMAT_VERSION, "entries": self._entries}
+            try:
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = self.cache_file.with_name(f"{self.cache_file.name}.{os.getpid()}.tmp")
+                with open(tmp_file, "w", encoding="utf8") as f:
+                    json.dump(data, f)
+                os.replace(tmp_file, self.cache_file)
+            except OSError:
+                # Not being able to persist the cache must never break the lookup
+                return
+            self._unsaved_changes = False
+
+
+_CACHE: Optional[VvInfoCache] = None
+
+
+def get_cache() -> VvInfoCache:
+    """Cache instance matching the current ``CACHE_SETTINGS``.
+
+    Returns
+    -------
+    VvInfoCache
+        Cache instance, which is recreated if the cache settings changed.
+    """
+    global _CACHE
+    cache_dir = cast(Optional[str], CACHE_SETTINGS["cache_dir"])
+    cache_file = (default_cache_dir() if cache_dir is None else Path(cache_dir)) / CACHE_FILE_NAME
+    max_entries = cast(int, CACHE_SETTINGS["max_entries"])
+    if _CACHE is None or _CACHE.cache_file != cache_file:
+        if _CACHE is not None:
+            _CACHE.save()
+        _CACHE = VvInfoCache(cache_file, max_entries)
+    _CACHE.max_entries = max_entries
+    return _CACHE
+
+
+@atexit.register
+def _save_cache() -> None:
+    """Persist the cache when the interpreter exits."""
+    if _CACHE is not None:
+        _CACHE.save()
+
+
+def with_current_dirty_state(result: VerboseVersionInfo) -> VerboseVersionInfo:
+    """Fill in ``dirty`` of a cached result by checking its local checkout again.
+
+    This only runs the check if ``CACHE_SETTINGS["recheck_dirty"]`` is ``True``,
+    so by default a cache hit doesn't start a subprocess.
+    Same as for a lookup which isn't cached, ``"dirty"`` is added to ``skipped_stages``
+    if the time budget ran out before the check finished.
+
+    Parameters
+    ----------
+    result : VerboseVersionInfo
+        Result returned by :meth:`VvInfoCache.lookup`.
+
+    Returns
+    -------
+    VerboseVersionInfo
+        ``result`` with the current dirty state, unchanged if it wasn't read
+        from a local checkout or rechecking is disabled.
+    """
+    if CACHE_SETTINGS["recheck_dirty"] is not True:
+        return result
+    repo_root = local_checkout_root(result)
+    if repo_root is None:
+        return result
+    with collect_skipped_stages() as skipped_stages:
+        # only results of git checkouts are cached, see VCS_CHECKOUT_KEY_FILES
+        dirty = check_dirty(repo_root, git_check_dirty_command())
+    emit_dirty_warning(repo_root)
+    return result._replace(dirty=dirty, skipped_stages=tuple(skipped_stages))
+
+
+def store_resolved_vv_info(
+    context: ResolutionContext,
+    result: VerboseVersionInfo,
+    resolve_start: datetime,
+) -> None:
+    """Store a freshly resolved result in the cache.
+
+    Parameters
+    ----------
+    context : ResolutionContext
+        Resolution context of the distribution the result was resolved for.
+    result : VerboseVersionInfo
+        Resolved verbose version information.
+    resolve_start : datetime
+        Time the resolution was started, used to detect if ``dist_time``
+        is the time of the lookup (e.g. for editable installations).
+    """
+    # Only distributions with a metadata directory on disk can be cached
+    # and partial results of lookups with a time budget aren't cached
+    if context.metadata_dir is not None and not result.skipped_stages:
+        get_cache().store(
+            context.metadata_dir,
+            result,
+            dist_time_is_now=result.dist_time >= resolve_start,
+        )
+
+
+def cached_vv_info(
+    distribution_name: str,
+    resolve: Callable[[ResolutionContext], VerboseVersionInfo],
+    context: Optional[ResolutionContext] = None,
+) -> VerboseVersionInfo:
+    """Return the cached result if still valid or resolve and cache it.
+
+    Parameters
+    ----------
+    distribution_name : str
+        The name of the distribution package as a string.
+    resolve : Callable[[ResolutionContext], VerboseVersionInfo]
+        Function resolving the verbose version information of a distribution.
+    context : Optional[ResolutionContext]
+        Resolution context of the distribution, by default None
+
+    Returns
+    -------
+    VerboseVersionInfo
+        Verbose version information of the installed package.
+    """
+    if context is None:
+        context = ResolutionContext(distribution_name)
+    if CACHE_SETTINGS["enabled"] is not True:
+        return resolve(context)
+    # keyed on the metadata directory found on the current sys.path
+    if context.metadata_dir is not None:
+        cached_result = get_cache().lookup(context.metadata_dir)
+        if cached_result is not None:
+            return with_current_dirty_state(cached_result)
+    resolve_start = _datetime_now()
+    result = resolve(context)
+    store_resolved_vv_info(context, result, resolve_start)
+    return result
@@ -1,34 +1,274 @@
-"""Console script for verbose_version_info."""
-
-try:
-    import typer
-except ImportError:
-    raise ImportError(
-        "The requirements for the cli usage aren't installed.\n"
-        "Install verbose-version-info with the cli extras e.g.:\n"
-        "`pip install verbose-version-info[cli]`"
+"""Console script for verbose_version_info.
+
+``typer`` and ``rich`` are only imported when they are needed (``--help``, the ``table``
+format or invalid arguments), so machine readable reports start quickly and even work
+without the ``cli`` extras installed.
+"""
+import sys
+from typing import Any
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import TextIO
+from typing import Tuple
+
+from verbose_version_info.data_containers import VerboseVersionInfo
+from verbose_version_info.export import EXPORT_FORMATS
+from verbose_version_info.verbose_version_info import iter_vv_info
+
+OUTPUT_FORMATS = ("table", *EXPORT_FORMATS)
+"""Supported values of ``--format``."""
+
+TABLE_COLUMNS = (("distribution", 32), ("version", 16), ("commit", 12), ("vcs", 4), ("dirty", 5))
+"""Header and width of the columns of the ``table`` format, followed by the url."""
+
+
+class CliOptions(NamedTuple):
+    """Options of the ``vvinfo`` command."""
+
+    distribution_names: List[str]
+    jobs: int = 1
+    output_format: str = "table"
+    vcs: bool = True
+
+
+def _import_typer() -> Any:
+    """Import ``typer`` with a helpful error if the cli extras aren't installed.
+
+    Returns
+    -------
+    Any
+        The ``typer`` module.
+
+    Raises
+    ------
+    ImportError
+        If ``typer`` isn't installed.
+    """
+    try:
+        import typer
+    except ImportError:
+        raise ImportError(
+            "The requirements for the cli usage aren't installed.\n"
+            "Install verbose-version-info with the cli extras e.g.:\n"
+            "`pip install verbose-version-info[cli]`"
+        )
+    return typer
+
+
+def _write_table(results: Iterable[Tuple[str, VerboseVersionInfo]], file: TextIO) -> int:
+    """Write results as fixed width table, one row as soon as it is resolved.
+
+    Parameters
+    ----------
+    results : Iterable[Tuple[str, VerboseVersionInfo]]
+        Distribution names and their verbose version information.
+    file : TextIO
+        Text file-like object to write to.
+
+    Returns
+    -------
+    int
+        Number of written rows.
+    """
+    from rich.console import Console
+    from rich.markup import escape
+
+    console = Console(file=file, soft_wrap=True)
+    header = " ".join(f"{title:<{width}}" for title, width in TABLE_COLUMNS)
+    console.print(f"[bold]{header} url[/bold]")
+    count = 0
+    for count, (distribution_name, result) in enumerate(results, start=1):
+        cells = (
+            distribution_name,
+            result.release_version,
+            result.commit_id[:12],
+            result.vcs_name,
+            {None: "", True: "yes", False: "no"}[result.dirty],
+        )
+        row = [f"{escape(cell):<{width}}" for cell, (_, width) in zip(cells, TABLE_COLUMNS)]
+        if result.dirty:
+            row[-1] = f"[red]{row[-1]}[/red]"
+        console.print(f"{' '.join(row)} {escape(result.url)}")
+        file.flush()
+    return count
+
+
+def report(options: CliOptions, file: Optional[TextIO] = None) -> int:
+    """Resolve the distributions and stream the report in the requested format.
+
+    Parameters
+    ----------
+    options : CliOptions
+        Options of the command.
+    file : Optional[TextIO]
+        Text file-like object to write to, by default None which uses ``sys.stdout``.
+
+    Returns
+    -------
+    int
+        Number of reported distributions.
+    """
+    if file is None:
+        file = sys.stdout
+    results = iter_vv_info(
+        options.distribution_names or None, max_workers=options.jobs, vcs=options.vcs
     )
+    if options.output_format == "table":
+        return _write_table(results, file)
+    return EXPORT_FORMATS[options.output_format](results, file)
+
+
+def parse_fast_path(args: List[str]) -> Optional[CliOptions]:
+    """Parse the arguments without ``typer`` if they are valid and need no help.
+
+    Parameters
+    ----------
+    args : List[str]
+        Command line arguments without the program name.
+
+    Returns
+    -------
+    Optional[CliOptions]
+        Parsed options or None if ``typer`` needs to handle the arguments,
+        e.g. for ``--help`` or to report invalid arguments.
+    """
+    distribution_names: List[str] = []
+    jobs = 1
+    output_format = "table"
+    vcs = True
+    arguments = iter(args)
+    for argument in arguments:
+        option, has_value, value = argument.partition("=")
+        if option in ("--jobs", "-j", "--format", "-f"):
+            if not has_value:
+                value = next(arguments, "")
+            if option in ("--jobs", "-j"):
+                if not value.isdigit() or int(value) < 1:
+                    return None
+                jobs = int(value)
+            elif value.lower() in OUTPUT_FORMATS:
+                output_format = value.lower()
+            else:
+                return None
+        elif argument == "--no-vcs":
+            vcs = False
+        elif argument == "--":
+            distribution_names.extend(arguments)
+        elif argument.startswith("-"):
+            return None
+        else:
+            distribution_names.append(argument)
+    return CliOptions(distribution_names, jobs, output_format, vcs)
 
-cli = typer.Typer(name="vvinfo")
 
+def create_cli() -> Any:
+    """Create the ``typer`` application of the ``vvinfo`` command.
+
+    Returns
+    -------
+    Any
+        The ``typer.Typer`` application.
+    """
+    typer = _import_typer()
+    cli = typer.Typer(name="vvinfo", add_completion=False)
 
-@cli.command()
-def main(args=None) -> int:
+    @cli.command(help="Print verbose version information of installed distributions.")
+    def vvinfo(
+        distribution_names: Optional[List[str]] = typer.Argument(
+            None,
+            help="Names of the distributions to report, all distributions if none are given.",
+            show_default=False,
+        ),
+        jobs: int = typer.Option(
+            1, "--jobs", "-j", min=1, help="Number of threads resolving the vcs information."
+        ),
+        output_format: str = typer.Option(
+            "table", "--format", "-f", help=f"Output format, one of: {', '.join(OUTPUT_FORMATS)}."
+        ),
+        no_vcs: bool = typer.Option(
+            False, "--no-vcs", help="Only read the metadata, without running any vcs."
+        ),
+    ) -> None:
+        """Print verbose version information of installed distributions.
+
+        Parameters
+        ----------
+        distribution_names : Optional[List[str]]
+            Names of the distributions to report, all distributions if None.
+        jobs : int
+            Number of threads resolving the vcs information.
+        output_format : str
+            Output format, one of :data:`OUTPUT_FORMATS`.
+        no_vcs : bool
+            Whether to only read the metadata.
+
+        Raises
+        ------
+        BadParameter
+            If ``output_format`` isn't supported.
+        """
+        if output_format.lower() not in OUTPUT_FORMATS:
+            raise typer.BadParameter(
+                f"{output_format!r} isn't one of: {', '.join(OUTPUT_FORMATS)}",
+                param_hint="'--format'",
+            )
+        options = CliOptions(
+            distribution_names=list(distribution_names or []),
+            jobs=jobs,
+            output_format=output_format.lower(),
+            vcs=not no_vcs,
+        )
+        report(options)
+
+    return cli
+
+
+def main(args: Optional[List[str]] = None) -> int:
     """Console script for verbose_version_info.
 
     Parameters
     ----------
-    args : list, optional
-        Commandlineargs, by default None
+    args : Optional[List[str]]
+        Command line arguments, by default None which uses ``sys.argv``.
 
     Returns
     -------
     int
         Returncode
     """
-    print("Not yet Implemented!")
+    args = sys.argv[1:] if args is None else list(args)
+    options = parse_fast_path(args)
+    if options is not None and options.output_format != "table":
+        report(options)
+        return 0
+    create_cli()(args=args, prog_name="vvinfo")
     return 0
 
 
+def __getattr__(name: str) -> Any:
+    """Lazily create the ``typer`` application as module attribute ``cli``.
+
+    Parameters
+    ----------
+    name : str
+        Name of the attribute.
+
+    Returns
+    -------
+    Any
+        The ``typer.Typer`` application.
+
+    Raises
+    ------
+    AttributeError
+        For all other attributes.
+    """
+    if name == "cli":
+        return create_cli()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 if __name__ == "__main__":
-    cli()
+    sys.exit(main())
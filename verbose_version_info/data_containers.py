@@ -1,6 +1,24 @@
 """Module for data container classes."""
+import sys
+from array import array
 from datetime import datetime
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Hashable
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Mapping
 from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+
+if TYPE_CHECKING:
+    from importlib.metadata import Distribution
 
 
 class VcsInfo(NamedTuple):
@@ -11,10 +29,336 @@ class VcsInfo(NamedTuple):
 
 
 class VerboseVersionInfo(NamedTuple):
-    """Information container for verbose version information."""
+    """Information container for verbose version information.
+
+    ``dirty`` is whether the vcs checkout of a local installation contained
+    uncommitted changes, it is None if that wasn't checked.
+    ``skipped_stages`` are the resolution stages (``"url"``, ``"vcs"`` and ``"dirty"``)
+    which were skipped because the time budget of the lookup ran out,
+    so the corresponding fields are left empty.
+    """
 
     release_version: str
     dist_time: datetime
     url: str = ""
     commit_id: str = ""
     vcs_name: str = ""
+    dirty: Optional[bool] = None
+    skipped_stages: Tuple[str, ...] = ()
+
+
+_DIRTY_CODES: Dict[Optional[bool], int] = {None: -1, False: 0, True: 1}
+_DIRTY_VALUES: Dict[int, Optional[bool]] = {code: value for value, code in _DIRTY_CODES.items()}
+
+
+class _CodeTable:
+    """Mapping of the distinct values of a low cardinality column to small integer codes."""
+
+    def __init__(self) -> None:
+        self.values: List[Hashable] = []
+        self._codes: Dict[Hashable, int] = {}
+
+    def code(self, value: Hashable) -> int:
+        """Code of a value, which is added if it wasn't seen before.
+
+        Parameters
+        ----------
+        value : Hashable
+            Value to encode.
+
+        Returns
+        -------
+        int
+            Index of the value in :attr:`values`.
+        """
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class VersionTable:
+    """Columnar table of the verbose version information of many distributions.
+
+    Other than a list of :class:`VerboseVersionInfo` the columns are stored compactly:
+    strings are interned, so e.g. the commit ids of distributions from the same
+    repository share one object, ``dist_time`` is stored as float timestamps in an
+    ``array('d')`` and ``vcs_name``, ``dirty`` and ``skipped_stages`` as one byte codes.
+    Rows are only converted to :class:`VerboseVersionInfo` when they are accessed.
+
+    Filtering returns a view of the table which shares the columns and only
+    stores the indices of the selected rows.
+
+    Parameters
+    ----------
+    results : Union[Mapping[str, VerboseVersionInfo], Iterable[Tuple[str, VerboseVersionInfo]]]
+        Distribution names and their verbose version information, by default ()
+
+    See Also
+    --------
+    verbose_version_info.verbose_version_info.vv_info_table
+    """
+
+    def __init__(
+        self,
+        results: Union[
+            Mapping[str, VerboseVersionInfo], Iterable[Tuple[str, VerboseVersionInfo]]
+        ] = (),
+    ):
+        self._names: List[str] = []
+        self._release_versions: List[str] = []
+        self._dist_times = array("d")
+        self._urls: List[str] = []
+        self._commit_ids: List[str] = []
+        self._vcs_names = _CodeTable()
+        self._vcs_codes = array("B")
+        self._dirty_codes = array("b")
+        self._skipped_stages = _CodeTable()
+        self._skipped_stages_codes = array("B")
+        self._rows: Optional[array] = None
+        items = results.items() if isinstance(results, Mapping) else results
+        for distribution_name, result in items:
+            self.append(distribution_name, result)
+
+    def append(self, distribution_name: str, result: VerboseVersionInfo) -> None:
+        """Add a row to the table.
+
+        Parameters
+        ----------
+        distribution_name : str
+            The name of the distribution package as a string.
+        result : VerboseVersionInfo
+            Verbose version information of the distribution.
+
+        Raises
+        ------
+        TypeError
+            If the table is a filtered view.
+        """
+        if self._rows is not None:
+            raise TypeError("Rows can't be appended to a filtered view of a VersionTable.")
+        self._names.append(sys.intern(distribution_name))
+        self._release_versions.append(sys.intern(result.release_version))
+        self._dist_times.append(result.dist_time.timestamp())
+        self._urls.append(sys.intern(result.url))
+        self._commit_ids.append(sys.intern(result.commit_id))
+        self._vcs_codes.append(self._vcs_names.code(sys.intern(result.vcs_name)))
+        self._dirty_codes.append(_DIRTY_CODES[result.dirty])
+        self._skipped_stages_codes.append(self._skipped_stages.code(tuple(result.skipped_stages)))
+
+    def _row_indices(self) -> Sequence[int]:
+        """Indices of the rows in the shared columns which are part of the table.
+
+        Returns
+        -------
+        Sequence[int]
+            Indices of the selected rows, all rows if the table isn't a view.
+        """
+        return range(len(self._names)) if self._rows is None else self._rows
+
+    def __len__(self) -> int:
+        """Number of rows.
+
+        Returns
+        -------
+        int
+            Number of rows.
+        """
+        return len(self._names) if self._rows is None else len(self._rows)
+
+    def _row(self, index: int) -> VerboseVersionInfo:
+        """Verbose version information of a row of the shared columns.
+
+        Parameters
+        ----------
+        index : int
+            Index in the shared columns.
+
+        Returns
+        -------
+        VerboseVersionInfo
+            Verbose version information of the row.
+        """
+        return VerboseVersionInfo(
+            release_version=self._release_versions[index],
+            dist_time=datetime.fromtimestamp(self._dist_times[index]),
+            url=self._urls[index],
+            commit_id=self._commit_ids[index],
+            vcs_name=self._vcs_names.values[self._vcs_codes[index]],  # type: ignore[arg-type]
+            dirty=_DIRTY_VALUES[self._dirty_codes[index]],
+            skipped_stages=self._skipped_stages.values[  # type: ignore[arg-type]
+                self._skipped_stages_codes[index]
+            ],
+        )
+
+    def __getitem__(self, key: Union[int, str]) -> VerboseVersionInfo:
+        """Verbose version information of a row by position or distribution name.
+
+        Parameters
+        ----------
+        key : Union[int, str]
+            Position of the row or name of the distribution.
+
+        Returns
+        -------
+        VerboseVersionInfo
+            Verbose version information of the row.
+
+        Raises
+        ------
+        KeyError
+            If no row has the distribution name.
+        """
+        if isinstance(key, str):
+            for index in self._row_indices():
+                if self._names[index] == key:
+                    return self._row(index)
+            raise KeyError(key)
+        return self._row(self._row_indices()[key])
+
+    def __iter__(self) -> Iterator[VerboseVersionInfo]:
+        """Iterate over the rows, which are created on demand.
+
+        Yields
+        ------
+        VerboseVersionInfo
+            Verbose version information of each row.
+        """
+        for index in self._row_indices():
+            yield self._row(index)
+
+    @property
+    def names(self) -> List[str]:
+        """Distribution names of the rows.
+
+        Returns
+        -------
+        List[str]
+            Names in row order.
+        """
+        return [self._names[index] for index in self._row_indices()]
+
+    def items(self) -> Iterator[Tuple[str, VerboseVersionInfo]]:
+        """Iterate over the distribution names and verbose version information of the rows.
+
+        Yields
+        ------
+        Tuple[str, VerboseVersionInfo]
+            Distribution name and verbose version information of each row.
+        """
+        for index in self._row_indices():
+            yield self._names[index], self._row(index)
+
+    def to_dict(self) -> Dict[str, VerboseVersionInfo]:
+        """Convert the table to the mapping returned by ``vv_info_all``.
+
+        Returns
+        -------
+        Dict[str, VerboseVersionInfo]
+            Mapping of distribution names to their verbose version information.
+        """
+        return dict(self.items())
+
+    def _view(self, predicate: Callable[[int], bool]) -> "VersionTable":
+        """View of the rows matching ``predicate`` sharing the columns of this table.
+
+        Parameters
+        ----------
+        predicate : Callable[[int], bool]
+            Function selecting rows by their index in the shared columns.
+
+        Returns
+        -------
+        VersionTable
+            Filtered view.
+        """
+        view = VersionTable.__new__(VersionTable)
+        view.__dict__.update(self.__dict__)
+        view._rows = array("L", (index for index in self._row_indices() if predicate(index)))
+        return view
+
+    def filter_vcs(self, vcs_name: str) -> "VersionTable":
+        """View of the rows with the given ``vcs_name`` (``""`` for rows without vcs).
+
+        Parameters
+        ----------
+        vcs_name : str
+            Name of the vcs, e.g. ``"git"``.
+
+        Returns
+        -------
+        VersionTable
+            Filtered view sharing the columns of this table.
+        """
+        values = self._vcs_names.values
+        code = values.index(vcs_name) if vcs_name in values else -1
+        vcs_codes = self._vcs_codes
+        return self._view(lambda index: vcs_codes[index] == code)
+
+    def filter_url_prefix(self, prefix: str) -> "VersionTable":
+        """View of the rows which url starts with ``prefix``.
+
+        Parameters
+        ----------
+        prefix : str
+            Start of the url, e.g. ``"https://github.com/"``.
+
+        Returns
+        -------
+        VersionTable
+            Filtered view sharing the columns of this table.
+        """
+        urls = self._urls
+        return self._view(lambda index: urls[index].startswith(prefix))
+
+    def __repr__(self) -> str:
+        """Representation showing the number of rows.
+
+        Returns
+        -------
+        str
+            E.g. ``VersionTable(<3 rows>)``.
+        """
+        return f"VersionTable(<{len(self)} rows>)"
+
+
+class ScannedDistribution(NamedTuple):
+    """Distribution found while scanning the entries of ``sys.path``."""
+
+    normalized_name: str
+    distribution: "Distribution"
+
+
+class DistributionCacheInfo(NamedTuple):
+    """Statistics of the cache of :func:`verbose_version_info.utils.distribution`.
+
+    ``stale`` counts the hits which were dropped because the metadata directory
+    changed since it was cached, they are also counted as ``misses``.
+    """
+
+    hits: int
+    misses: int
+    not_found_hits: int
+    stale: int
+    max_entries: int
+    entries: int
+    not_found_entries: int
+
+
+class TraceEvent(NamedTuple):
+    """Timed stage of the resolution passed to the hooks of :func:`trace_hook`.
+
+    ``name`` distinguishes calls of the same stage (e.g. the vcs reader or command),
+    ``details`` contains stage specific information like the ``argv`` and ``returncode``
+    of subprocesses or the type of the ``error`` if the stage raised.
+
+    See Also
+    --------
+    verbose_version_info.tracing.trace_hook
+    """
+
+    stage: str
+    name: str
+    duration: float
+    details: Dict[str, Any]
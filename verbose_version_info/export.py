@@ -0,0 +1,364 @@
+"""Module containing the streaming exporters and loaders of verbose version information.
+
+All writers take an iterable of ``(distribution_name, VerboseVersionInfo)`` pairs,
+e.g. from :func:`verbose_version_info.verbose_version_info.iter_vv_info`, and write
+each result as soon as it is produced, so memory use doesn't grow with the number
+of distributions. The loaders are generators rebuilding the results one at a time.
+
+Formats
+-------
+``jsonl``
+    One JSON object per line.
+``csv``
+    One row per distribution with a header, ``skipped_stages`` are joined with ``;``.
+``json``
+    Single JSON document ``{"format_version": 1, "distributions": [...]}``
+    with sorted keys and one distribution per line.
+"""
+import csv
+import json
+from datetime import datetime
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import TextIO
+from typing import Tuple
+
+from verbose_version_info.data_containers import VerboseVersionInfo
+from verbose_version_info.verbose_version_info import iter_vv_info
+
+EXPORT_FORMAT_VERSION = 1
+"""Version of the ``json`` document format, which is increased on incompatible changes."""
+
+EXPORT_FIELDS = ("distribution_name", *VerboseVersionInfo._fields)
+"""Fields of an exported result, also the header of the ``csv`` format."""
+
+NamedResult = Tuple[str, VerboseVersionInfo]
+
+_DIRTY_STRINGS = {None: "", True: "true", False: "false"}
+_DIRTY_VALUES = {string: value for value, string in _DIRTY_STRINGS.items()}
+
+
+def vv_info_to_dict(distribution_name: str, result: VerboseVersionInfo) -> Dict[str, Any]:
+    """JSON serializable representation of a result.
+
+    Parameters
+    ----------
+    distribution_name : str
+        The name of the distribution package as a string.
+    result : VerboseVersionInfo
+        Verbose version information of the distribution.
+
+    Returns
+    -------
+    Dict[str, Any]
+        Fields of the result with ``dist_time`` as ISO 8601 string.
+    """
+    return {
+        "distribution_name": distribution_name,
+        **result._asdict(),
+        "dist_time": result.dist_time.isoformat(),
+        "skipped_stages": list(result.skipped_stages),
+    }
+
+
+def vv_info_from_dict(data: Dict[str, Any]) -> NamedResult:
+    """Rebuild a result from :func:`vv_info_to_dict`.
+
+    Parameters
+    ----------
+    data : Dict[str, Any]
+        Representation of the result, missing optional fields use their defaults.
+
+    Returns
+    -------
+    NamedResult
+        Distribution name and verbose version information.
+    """
+    fields = {field: data[field] for field in VerboseVersionInfo._fields if field in data}
+    fields["dist_time"] = datetime.fromisoformat(data["dist_time"])
+    fields["skipped_stages"] = tuple(data.get("skipped_stages", ()))
+    return data["distribution_name"], VerboseVersionInfo(**fields)
+
+
+def _maybe_flush(file: TextIO, count: int, flush_every: int) -> None:
+    """Flush the file after every ``flush_every`` written results.
+
+    Parameters
+    ----------
+    file : TextIO
+        File the results are written to.
+    count : int
+        Number of written results.
+    flush_every : int
+        Number of results between flushes, 0 never flushes.
+    """
+    if flush_every > 0 and count % flush_every == 0:
+        file.flush()
+
+
+def write_jsonl(results: Iterable[NamedResult], file: TextIO, *, flush_every: int = 1) -> int:
+    """Write results as JSON Lines.
+
+    Parameters
+    ----------
+    results : Iterable[NamedResult]
+        Distribution names and their verbose version information.
+    file : TextIO
+        Text file-like object to write to.
+    flush_every : int
+        Number of results after which the file is flushed, by default 1
+
+    Returns
+    -------
+    int
+        Number of written results.
+    """
+    count = 0
+    for count, (distribution_name, result) in enumerate(results, start=1):
+        file.write(json.dumps(vv_info_to_dict(distribution_name, result), sort_keys=True))
+        file.write("\n")
+        _maybe_flush(file, count, flush_every)
+    file.flush()
+    return count
+
+
+def iter_jsonl(file: TextIO) -> Iterator[NamedResult]:
+    """Lazily load results written by :func:`write_jsonl`.
+
+    Parameters
+    ----------
+    file : TextIO
+        Text file-like object to read from.
+
+    Yields
+    ------
+    NamedResult
+        Distribution name and verbose version information.
+    """
+    for line in file:
+        if line.strip():
+            yield vv_info_from_dict(json.loads(line))
+
+
+def write_csv(results: Iterable[NamedResult], file: TextIO, *, flush_every: int = 1) -> int:
+    """Write results as CSV with a header row.
+
+    The file should be opened with ``newline=""`` as for all :mod:`csv` writers.
+
+    Parameters
+    ----------
+    results : Iterable[NamedResult]
+        Distribution names and their verbose version information.
+    file : TextIO
+        Text file-like object to write to.
+    flush_every : int
+        Number of results after which the file is flushed, by default 1
+
+    Returns
+    -------
+    int
+        Number of written results.
+    """
+    writer = csv.writer(file)
+    writer.writerow(EXPORT_FIELDS)
+    count = 0
+    for count, (distribution_name, result) in enumerate(results, start=1):
+        writer.writerow(
+            (
+                distribution_name,
+                result.release_version,
+                result.dist_time.isoformat(),
+                result.url,
+                result.commit_id,
+                result.vcs_name,
+                _DIRTY_STRINGS[result.dirty],
+                ";".join(result.skipped_stages),
+            )
+        )
+        _maybe_flush(file, count, flush_every)
+    file.flush()
+    return count
+
+
+def iter_csv(file: TextIO) -> Iterator[NamedResult]:
+    """Lazily load results written by :func:`write_csv`.
+
+    Parameters
+    ----------
+    file : TextIO
+        Text file-like object to read from, opened with ``newline=""``.
+
+    Yields
+    ------
+    NamedResult
+        Distribution name and verbose version information.
+    """
+    for row in csv.DictReader(file):
+        yield vv_info_from_dict(
+            {
+                **row,
+                "dirty": _DIRTY_VALUES[row["dirty"]],
+                "skipped_stages": row["skipped_stages"].split(";")
+                if row["skipped_stages"]
+                else [],
+            }
+        )
+
+
+def write_json(results: Iterable[NamedResult], file: TextIO, *, flush_every: int = 1) -> int:
+    """Write results as a single JSON document, one distribution per line.
+
+    The keys are sorted, so the output only depends on the results and their order.
+
+    Parameters
+    ----------
+    results : Iterable[NamedResult]
+        Distribution names and their verbose version information.
+    file : TextIO
+        Text file-like object to write to.
+    flush_every : int
+        Number of results after which the file is flushed, by default 1
+
+    Returns
+    -------
+    int
+        Number of written results.
+    """
+    file.write(f'{{"format_version": {EXPORT_FORMAT_VERSION}, "distributions": [')
+    count = 0
+    for count, (distribution_name, result) in enumerate(results, start=1):
+        file.write("\n" if count == 1 else ",\n")
+        file.write(json.dumps(vv_info_to_dict(distribution_name, result), sort_keys=True))
+        _maybe_flush(file, count, flush_every)
+    file.write("\n]}\n")
+    file.flush()
+    return count
+
+
+def iter_json(file: TextIO) -> Iterator[NamedResult]:
+    """Lazily load results written by :func:`write_json`.
+
+    Documents in the layout of :func:`write_json` are read one line at a time,
+    other (e.g. reformatted) documents are parsed as a whole.
+
+    Parameters
+    ----------
+    file : TextIO
+        Text file-like object to read from.
+
+    Yields
+    ------
+    NamedResult
+        Distribution name and verbose version information.
+
+    Raises
+    ------
+    ValueError
+        If the document has an unsupported ``format_version``.
+    """
+    first_line = file.readline()
+    header = f'{{"format_version": {EXPORT_FORMAT_VERSION}, "distributions": ['
+    if first_line.rstrip() != header:
+        document = json.loads(first_line + file.read())
+        if document.get("format_version") != EXPORT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported format_version: {document.get('format_version')!r}")
+        for data in document["distributions"]:
+            yield vv_info_from_dict(data)
+        return
+    for line in file:
+        line = line.strip().rstrip(",")
+        if line and line != "]}":
+            yield vv_info_from_dict(json.loads(line))
+
+
+EXPORT_FORMATS: Dict[str, Callable[..., int]] = {
+    "jsonl": write_jsonl,
+    "csv": write_csv,
+    "json": write_json,
+}
+"""Writers by format name."""
+
+LOAD_FORMATS: Dict[str, Callable[[TextIO], Iterator[NamedResult]]] = {
+    "jsonl": iter_jsonl,
+    "csv": iter_csv,
+    "json": iter_json,
+}
+"""Loaders by format name."""
+
+
+def export_vv_info(
+    file: TextIO,
+    export_format: str = "jsonl",
+    distribution_names: Optional[Iterable[str]] = None,
+    *,
+    max_workers: int = 1,
+    deadline: Optional[float] = None,
+    vcs: bool = True,
+) -> int:
+    """Resolve distributions and write each result as soon as it is resolved.
+
+    Parameters
+    ----------
+    file : TextIO
+        Text file-like object to write to.
+    export_format : str
+        One of :data:`EXPORT_FORMATS`, by default "jsonl"
+    distribution_names : Optional[Iterable[str]]
+        Names of the distribution packages, by default None which exports
+        all distributions in the environment.
+    max_workers : int
+        Number of threads used to resolve the distributions concurrently, by default 1
+    deadline : Optional[float]
+        Time budget in seconds for all distributions together, by default None
+    vcs : bool
+        Whether the vcs information of local installations is resolved, by default True
+
+    Returns
+    -------
+    int
+        Number of written results.
+
+    Raises
+    ------
+    ValueError
+        If ``export_format`` isn't supported.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(
+            f"Unsupported export format {export_format!r}, "
+            f"supported formats are: {', '.join(EXPORT_FORMATS)}"
+        )
+    results = iter_vv_info(distribution_names, max_workers=max_workers, deadline=deadline, vcs=vcs)
+    return EXPORT_FORMATS[export_format](results, file)
+
+
+def load_vv_info(file: TextIO, export_format: str = "jsonl") -> Iterator[NamedResult]:
+    """Lazily load results written in one of the :data:`LOAD_FORMATS`.
+
+    Parameters
+    ----------
+    file : TextIO
+        Text file-like object to read from.
+    export_format : str
+        One of :data:`LOAD_FORMATS`, by default "jsonl"
+
+    Returns
+    -------
+    Iterator[NamedResult]
+        Distribution names and verbose version information.
+
+    Raises
+    ------
+    ValueError
+        If ``export_format`` isn't supported.
+    """
+    if export_format not in LOAD_FORMATS:
+        raise ValueError(
+            f"Unsupported export format {export_format!r}, "
+            f"supported formats are: {', '.join(LOAD_FORMATS)}"
+        )
+    return LOAD_FORMATS[export_format](file)
@@ -0,0 +1,322 @@
+"""Module containing a pool of long-lived ``git cat-file --batch`` processes.
+
+Instead of running ``git log`` once per distribution, the history is walked by
+reading the commit objects through one ``git cat-file --batch`` process per
+repository, which is kept running and reused by all lookups in that repository.
+Processes which weren't used for ``VCS_SETTINGS["git_batch_idle_timeout"]`` seconds
+are shut down and all of them are closed when the interpreter exits.
+"""
+import atexit
+import threading
+import time
+from pathlib import Path
+from typing import IO
+from typing import TYPE_CHECKING
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import cast
+
+from verbose_version_info.git_repository import parse_commit_parents
+from verbose_version_info.git_repository import parse_commit_time
+from verbose_version_info.git_repository import walk_last_commit_before
+from verbose_version_info.settings import VCS_SETTINGS
+from verbose_version_info.tracing import traced
+from verbose_version_info.utils import DeadlineExceeded
+from verbose_version_info.utils import deadline_timeout
+
+if TYPE_CHECKING:
+    import subprocess
+
+GIT_CAT_FILE_BATCH_COMMAND = ("git", "cat-file", "--batch")
+
+
+class GitCatFileBatch:
+    """``git cat-file --batch`` process of a single repository.
+
+    The process is started on the first request and restarted if it was closed
+    in the meantime, requests from multiple threads are serialized.
+
+    Parameters
+    ----------
+    repo_root : Path
+        Root of the repository (worktree) the process runs in.
+    """
+
+    def __init__(self, repo_root: Path):
+        self.repo_root = repo_root
+        self.last_used = time.monotonic()
+        self._process: Optional["subprocess.Popen[bytes]"] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """Whether the ``git cat-file`` process is running.
+
+        Returns
+        -------
+        bool
+            True if the process was started and not closed.
+        """
+        return self._process is not None
+
+    def _start(self) -> Tuple[IO[bytes], IO[bytes]]:
+        """Start the process if it isn't running.
+
+        Returns
+        -------
+        Tuple[IO[bytes], IO[bytes]]
+            Stdin and stdout of the process.
+        """
+        if self._process is None:
+            # deferred, so importing the package doesn't import subprocess
+            import subprocess
+
+            self._process = subprocess.Popen(
+                GIT_CAT_FILE_BATCH_COMMAND,
+                cwd=self.repo_root,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+            _start_idle_reaper()
+        return self._process.stdin, self._process.stdout  # type: ignore[return-value]
+
+    def read_object(self, object_name: str) -> Optional[Tuple[str, str, bytes]]:
+        """Read an object by its id or any other name ``git`` understands (e.g. ``HEAD``).
+
+        Parameters
+        ----------
+        object_name : str
+            Name of the object.
+
+        Returns
+        -------
+        Optional[Tuple[str, str, bytes]]
+            Object id, object type and content or None if the object doesn't exist
+            or ``git`` couldn't be run.
+        """
+        with self._lock:
+            self.last_used = time.monotonic()
+            try:
+                stdin, stdout = self._start()
+                stdin.write(f"{object_name}\n".encode())
+                stdin.flush()
+                header = stdout.readline().split()
+                if len(header) == 2 and header[1] in (b"missing", b"ambiguous"):
+                    return None
+                if len(header) != 3:
+                    # the process died, so the next request starts a new one
+                    self._close()
+                    return None
+                object_id, object_type, size = header
+                content = stdout.read(int(size) + 1)[:-1]
+                if len(content) != int(size):
+                    self._close()
+                    return None
+            except (OSError, ValueError):
+                # e.g. git isn't installed or the process was killed
+                self._close()
+                return None
+            return object_id.decode(), object_type.decode(), content
+
+    def commit_info(self, commit_id: str) -> Optional[Tuple[int, List[str]]]:
+        """Commit time and parent ids of a commit.
+
+        Parameters
+        ----------
+        commit_id : str
+            Id of the commit.
+
+        Returns
+        -------
+        Optional[Tuple[int, List[str]]]
+            Unix timestamp and ids of the parents or None if the commit couldn't be read.
+        """
+        git_object = self.read_object(commit_id)
+        if git_object is None or git_object[1] != "commit":
+            return None
+        timestamp = parse_commit_time(git_object[2])
+        if timestamp is None:
+            return None
+        return timestamp, parse_commit_parents(git_object[2])
+
+    def _close(self) -> None:
+        """Close the process, the caller needs to hold the lock."""
+        if self._process is None:
+            return
+        import subprocess
+
+        process, self._process = self._process, None
+        try:
+            process.stdin.close()  # type: ignore[union-attr]
+            process.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+            process.wait()
+        process.stdout.close()  # type: ignore[union-attr]
+
+    def close(self) -> None:
+        """Close the process, it is restarted by the next request."""
+        with self._lock:
+            self._close()
+
+    def kill(self) -> None:
+        """Kill the process without waiting for a running request, which then fails."""
+        process = self._process
+        if process is not None:
+            process.kill()
+
+
+_BATCH_PROCESSES: Dict[Path, GitCatFileBatch] = {}
+_POOL_LOCK = threading.Lock()
+_REAPER: Optional[threading.Thread] = None
+
+
+def git_cat_file_batch(repo_root: Path) -> GitCatFileBatch:
+    """Shared :class:`GitCatFileBatch` of a repository.
+
+    Parameters
+    ----------
+    repo_root : Path
+        Root of the repository (worktree).
+
+    Returns
+    -------
+    GitCatFileBatch
+        Batch process of the repository.
+    """
+    repo_root = repo_root.resolve()
+    with _POOL_LOCK:
+        batch = _BATCH_PROCESSES.get(repo_root)
+        if batch is None:
+            batch = _BATCH_PROCESSES[repo_root] = GitCatFileBatch(repo_root)
+        return batch
+
+
+def close_idle_git_cat_file_batches(idle_timeout: float) -> int:
+    """Close all processes which weren't used for ``idle_timeout`` seconds.
+
+    Parameters
+    ----------
+    idle_timeout : float
+        Seconds after which an unused process is closed.
+
+    Returns
+    -------
+    int
+        Number of processes which are still running.
+    """
+    now = time.monotonic()
+    with _POOL_LOCK:
+        batches = list(_BATCH_PROCESSES.values())
+    for batch in batches:
+        if batch.running and now - batch.last_used >= idle_timeout:
+            batch.close()
+    return sum(batch.running for batch in batches)
+
+
+def close_git_cat_file_batches() -> None:
+    """Close all processes, this is run at exit of the interpreter."""
+    close_idle_git_cat_file_batches(0)
+
+
+atexit.register(close_git_cat_file_batches)
+
+
+def _reap_idle_batches() -> None:
+    """Close idle processes until none is running anymore, target of the reaper thread."""
+    global _REAPER
+    while True:
+        idle_timeout = float(cast(float, VCS_SETTINGS["git_batch_idle_timeout"]))
+        # capped so changes of the timeout setting are picked up quickly
+        time.sleep(min(max(idle_timeout / 2, 0.01), 1))
+        with _POOL_LOCK:
+            # checked under the lock so a process started meanwhile restarts the reaper
+            if not any(batch.running for batch in _BATCH_PROCESSES.values()):
+                _REAPER = None
+                return
+        close_idle_git_cat_file_batches(idle_timeout)
+
+
+def _start_idle_reaper() -> None:
+    """Start the daemon thread closing idle processes if it isn't running."""
+    global _REAPER
+    with _POOL_LOCK:
+        if _REAPER is None:
+            _REAPER = threading.Thread(
+                target=_reap_idle_batches, name="vv-info-git-batch-reaper", daemon=True
+            )
+            _REAPER.start()
+
+
+@traced("git_batch")
+def batch_last_commit_before(repo_root: Path, timestamp: float) -> Optional[str]:
+    """Id of the last commit before ``timestamp`` using the repositories batch process.
+
+    Parameters
+    ----------
+    repo_root : Path
+        Root of the repository (worktree).
+    timestamp : float
+        Unix timestamp the commit needs to be older than or equal to.
+
+    Returns
+    -------
+    Optional[str]
+        Commit id or None if no commit was found or the history couldn't be read.
+
+    Raises
+    ------
+    DeadlineExceeded
+        If the time budget ran out, the process is killed in that case.
+
+    See Also
+    --------
+    verbose_version_info.git_repository.walk_last_commit_before
+    """
+    batch = git_cat_file_batch(repo_root)
+    timeout = deadline_timeout()
+    if timeout is None:
+        return _batch_last_commit_before(batch, timestamp)
+    timed_out = threading.Event()
+
+    def kill_batch() -> None:
+        """Kill the process when the time budget ran out."""
+        timed_out.set()
+        batch.kill()
+
+    timer = threading.Timer(timeout, kill_batch)
+    timer.daemon = True
+    timer.start()
+    try:
+        commit_id = _batch_last_commit_before(batch, timestamp)
+    finally:
+        timer.cancel()
+        if timed_out.is_set():
+            batch.close()
+    if timed_out.is_set():
+        raise DeadlineExceeded()
+    return commit_id
+
+
+def _batch_last_commit_before(batch: GitCatFileBatch, timestamp: float) -> Optional[str]:
+    """Inner function of :func:`batch_last_commit_before` walking the history.
+
+    Parameters
+    ----------
+    batch : GitCatFileBatch
+        Batch process of the repository.
+    timestamp : float
+        Unix timestamp the commit needs to be older than or equal to.
+
+    Returns
+    -------
+    Optional[str]
+        Commit id or None if no commit was found or the history couldn't be read.
+    """
+    head = batch.read_object("HEAD")
+    if head is None or head[1] != "commit":
+        return None
+    return walk_last_commit_before(head[0], timestamp, batch.commit_info)
@@ -0,0 +1,838 @@
+"""Module containing functions to read git repositories without running ``git``.
+
+Only the small subset of the git repository format needed to look up commit ids
+is implemented, everything which isn't supported results in ``None``,
+so the caller can fall back to running ``git`` itself.
+"""
+import heapq
+import os
+import re
+import struct
+import zlib
+from pathlib import Path
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from verbose_version_info.utils import deadline_timeout
+
+COMMIT_ID_PATTERN = re.compile(r"^[0-9a-f]{40}([0-9a-f]{24})?$")
+MAX_SYMREF_DEPTH = 5
+
+# Only sha1 repositories are supported for reading objects
+HASH_LENGTH = 20
+
+DEADLINE_CHECK_INTERVAL = 256
+"""Number of commits walked between two checks of the time budget."""
+
+OBJECT_TYPE_COMMIT = 1
+OBJECT_TYPE_TREE = 2
+OBJECT_TYPE_BLOB = 3
+OBJECT_TYPE_TAG = 4
+OBJECT_TYPE_OFS_DELTA = 6
+OBJECT_TYPE_REF_DELTA = 7
+
+PACK_INDEX_SIGNATURE = b"\377tOc"
+COMMIT_GRAPH_SIGNATURE = b"CGPH"
+COMMIT_GRAPH_PARENT_NONE = 0x70000000
+COMMIT_GRAPH_EDGE_FLAG = 0x80000000
+
+LOOSE_OBJECT_TYPES = {
+    b"commit": OBJECT_TYPE_COMMIT,
+    b"tree": OBJECT_TYPE_TREE,
+    b"blob": OBJECT_TYPE_BLOB,
+    b"tag": OBJECT_TYPE_TAG,
+}
+
+
+def _read_text(path: Path) -> Optional[str]:
+    """Content of a text file inside of a repository.
+
+    Parameters
+    ----------
+    path : Path
+        Path of the file.
+
+    Returns
+    -------
+    Optional[str]
+        Content with stripped whitespace or None if the file can't be read.
+    """
+    try:
+        return path.read_text(encoding="utf8").strip()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def find_git_dir(worktree: Path) -> Optional[Path]:
+    """Git directory of a worktree, following the ``gitdir:`` indirection.
+
+    Worktrees created by ``git worktree add`` and submodules have a ``.git`` file
+    containing ``gitdir: <path>`` instead of a ``.git`` directory.
+
+    Parameters
+    ----------
+    worktree : Path
+        Root of the checkout, which contains ``.git``.
+
+    Returns
+    -------
+    Optional[Path]
+        The git directory or None if ``worktree`` doesn't contain ``.git``.
+    """
+    dot_git = worktree / ".git"
+    if dot_git.is_dir():
+        return dot_git
+    if not dot_git.is_file():
+        return None
+    content = _read_text(dot_git)
+    if content is not None and content.startswith("gitdir:"):
+        git_dir = worktree / content[len("gitdir:") :].strip()
+        if git_dir.is_dir():
+            return git_dir
+    return None
+
+
+def common_git_dir(git_dir: Path) -> Path:
+    """Directory containing the shared refs and objects of a repository.
+
+    For linked worktrees the git directory only contains ``HEAD`` and
+    per worktree refs, while everything else is in the directory referenced
+    by the ``commondir`` file.
+
+    Parameters
+    ----------
+    git_dir : Path
+        Git directory as returned by :func:`find_git_dir`.
+
+    Returns
+    -------
+    Path
+        Common git directory, which is ``git_dir`` for normal repositories.
+    """
+    common_dir = _read_text(git_dir / "commondir")
+    if common_dir:
+        return git_dir / common_dir
+    return git_dir
+
+
+def packed_refs(git_dir: Path) -> Dict[str, str]:
+    """Refs stored in the ``packed-refs`` file of a repository.
+
+    Parameters
+    ----------
+    git_dir : Path
+        Git directory as returned by :func:`find_git_dir`.
+
+    Returns
+    -------
+    Dict[str, str]
+        Mapping of ref names (e.g. ``refs/heads/main``) to commit ids.
+    """
+    content = _read_text(common_git_dir(git_dir) / "packed-refs")
+    refs = {}
+    for line in (content or "").splitlines():
+        # comments like '# pack-refs with: peeled' and peeled tags '^<commit_id>'
+        if line.startswith(("#", "^")):
+            continue
+        commit_id, _, ref_name = line.partition(" ")
+        refs[ref_name.strip()] = commit_id
+    return refs
+
+
+def resolve_ref(git_dir: Path, ref_name: str = "HEAD") -> Optional[str]:
+    """Resolve a ref to a commit id by following symbolic refs.
+
+    Loose refs are looked up in the git directory first (e.g. ``HEAD`` of a worktree),
+    then in the common git directory and lastly in ``packed-refs``.
+
+    Parameters
+    ----------
+    git_dir : Path
+        Git directory as returned by :func:`find_git_dir`.
+    ref_name : str
+        Name of the ref to resolve, by default "HEAD"
+
+    Returns
+    -------
+    Optional[str]
+        Commit id the ref points to or None if it couldn't be resolved.
+    """
+    common_dir = common_git_dir(git_dir)
+    for _ in range(MAX_SYMREF_DEPTH):
+        content = _read_text(git_dir / ref_name)
+        if content is None and common_dir != git_dir:
+            content = _read_text(common_dir / ref_name)
+        if content is None:
+            content = packed_refs(git_dir).get(ref_name)
+        if content is None:
+            return None
+        if content.startswith("ref:"):
+            ref_name = content[len("ref:") :].strip()
+            continue
+        return content if COMMIT_ID_PATTERN.match(content) else None
+    return None
+
+
+def ref_files(git_dir: Path, ref_name: str = "HEAD") -> List[Path]:
+    """Files :func:`resolve_ref` reads to resolve a ref.
+
+    Changes to what a ref resolves to (e.g. a new commit, ``git commit --amend``,
+    a checkout or ``git pack-refs``) change at least one of these files,
+    which don't need to exist.
+
+    Parameters
+    ----------
+    git_dir : Path
+        Git directory as returned by :func:`find_git_dir`.
+    ref_name : str
+        Name of the ref, by default "HEAD"
+
+    Returns
+    -------
+    List[Path]
+        Loose ref files of all followed symbolic refs and ``packed-refs``.
+    """
+    common_dir = common_git_dir(git_dir)
+    files = []
+    for _ in range(MAX_SYMREF_DEPTH):
+        loose_ref_files = [git_dir / ref_name]
+        if common_dir != git_dir:
+            loose_ref_files.append(common_dir / ref_name)
+        files.extend(loose_ref_files)
+        contents = (_read_text(loose_ref_file) for loose_ref_file in loose_ref_files)
+        content = next((content for content in contents if content is not None), None)
+        if content is None or not content.startswith("ref:"):
+            break
+        ref_name = content[len("ref:") :].strip()
+    files.append(common_dir / "packed-refs")
+    return files
+
+
+def read_loose_object(git_dir: Path, object_id: str) -> Optional[Tuple[int, bytes]]:
+    """Type and content of a loose object.
+
+    Parameters
+    ----------
+    git_dir : Path
+        Git directory as returned by :func:`find_git_dir`.
+    object_id : str
+        Id of the object.
+
+    Returns
+    -------
+    Optional[Tuple[int, bytes]]
+        Object type (e.g. ``OBJECT_TYPE_COMMIT``) and content of the object
+        or None if it isn't stored as loose object.
+    """
+    object_path = common_git_dir(git_dir) / "objects" / object_id[:2] / object_id[2:]
+    try:
+        data = zlib.decompress(object_path.read_bytes())
+    except (OSError, zlib.error):
+        return None
+    header, _, content = data.partition(b"\0")
+    return LOOSE_OBJECT_TYPES.get(header.split(b" ", 1)[0], 0), content
+
+
+def parse_commit_time(commit_content: bytes) -> Optional[int]:
+    """Committer timestamp of a commit, which is what ``git log --before`` uses.
+
+    Parameters
+    ----------
+    commit_content : bytes
+        Content of a commit object.
+
+    Returns
+    -------
+    Optional[int]
+        Unix timestamp of the commit or None if there is no committer header.
+    """
+    for line in commit_content.split(b"\n"):
+        if line == b"":
+            # end of the headers
+            break
+        if line.startswith(b"committer "):
+            try:
+                return int(line.rsplit(b" ", 2)[-2])
+            except (IndexError, ValueError):
+                return None
+    return None
+
+
+def parse_commit_parents(commit_content: bytes) -> List[str]:
+    """Ids of the parents of a commit.
+
+    Parameters
+    ----------
+    commit_content : bytes
+        Content of a commit object.
+
+    Returns
+    -------
+    List[str]
+        Commit ids of the parents.
+    """
+    parents = []
+    for line in commit_content.split(b"\n"):
+        if line == b"":
+            break
+        if line.startswith(b"parent "):
+            parents.append(line[len(b"parent ") :].decode())
+    return parents
+
+
+def _apply_delta(base: bytes, delta: bytes) -> bytes:
+    """Apply a git delta to its base object.
+
+    Parameters
+    ----------
+    base : bytes
+        Content of the base object.
+    delta : bytes
+        Delta instructions as stored in a pack.
+
+    Returns
+    -------
+    bytes
+        Content of the deltified object.
+    """
+    position = 0
+    # skip the sizes of the base and result, which are only needed for validation
+    for _ in range(2):
+        while delta[position] & 0x80:
+            position += 1
+        position += 1
+    result = bytearray()
+    while position < len(delta):
+        instruction = delta[position]
+        position += 1
+        if instruction & 0x80:
+            copy_offset = copy_size = 0
+            for byte_index in range(4):
+                if instruction & (1 << byte_index):
+                    copy_offset |= delta[position] << (8 * byte_index)
+                    position += 1
+            for byte_index in range(3):
+                if instruction & (1 << (4 + byte_index)):
+                    copy_size |= delta[position] << (8 * byte_index)
+                    position += 1
+            result += base[copy_offset : copy_offset + (copy_size or 0x10000)]
+        else:
+            result += delta[position : position + instruction]
+            position += instruction
+    return bytes(result)
+
+
+class PackIndex:
+    """Version 2 ``.idx`` file of a pack, objects are looked up by binary search.
+
+    Only the fanout table is kept in memory, the sorted object ids and offsets
+    are read from the file on demand.
+
+    Parameters
+    ----------
+    index_path : Path
+        Path to the ``.idx`` file.
+
+    Raises
+    ------
+    ValueError
+        If the file isn't a version 2 pack index.
+    """
+
+    def __init__(self, index_path: Path):
+        self.index_path = index_path
+        self.pack_path = index_path.with_suffix(".pack")
+        with open(index_path, "rb") as f:
+            header = f.read(8 + 256 * 4)
+        if header[:4] != PACK_INDEX_SIGNATURE or struct.unpack(">I", header[4:8])[0] != 2:
+            raise ValueError(f"Unsupported pack index {index_path}")
+        self.fanout = struct.unpack(">256I", header[8:])
+        self.object_count = self.fanout[-1]
+
+    def find_offset(self, object_id: bytes) -> Optional[int]:
+        """Offset of an object inside of the pack.
+
+        Parameters
+        ----------
+        object_id : bytes
+            Binary id of the object.
+
+        Returns
+        -------
+        Optional[int]
+            Offset or None if the pack doesn't contain the object.
+        """
+        names_start = 8 + 256 * 4
+        low = self.fanout[object_id[0] - 1] if object_id[0] > 0 else 0
+        high = self.fanout[object_id[0]]
+        with open(self.index_path, "rb") as f:
+            while low < high:
+                middle = (low + high) // 2
+                f.seek(names_start + middle * HASH_LENGTH)
+                name = f.read(HASH_LENGTH)
+                if name < object_id:
+                    low = middle + 1
+                elif name > object_id:
+                    high = middle
+                else:
+                    offsets_start = names_start + self.object_count * (HASH_LENGTH + 4)
+                    f.seek(offsets_start + middle * 4)
+                    offset = struct.unpack(">I", f.read(4))[0]
+                    if offset & 0x80000000:
+                        f.seek(offsets_start + self.object_count * 4 + (offset & 0x7FFFFFFF) * 8)
+                        offset = struct.unpack(">Q", f.read(8))[0]
+                    return offset
+        return None
+
+
+class CommitGraph:
+    """Commit-graph file(s) of a repository, which store commit times and parents.
+
+    Layers of a split commit-graph (``commit-graphs/commit-graph-chain``)
+    share one position space, starting with the base layer.
+
+    Parameters
+    ----------
+    graph_files : List[Path]
+        Commit-graph files, base layer first.
+
+    Raises
+    ------
+    ValueError
+        If one of the files isn't a supported commit-graph file.
+    """
+
+    def __init__(self, graph_files: List[Path]):
+        self._layers: List[Tuple[bytes, Dict[bytes, int], int]] = []
+        self.commit_count = 0
+        for graph_file in graph_files:
+            data = graph_file.read_bytes()
+            if data[:4] != COMMIT_GRAPH_SIGNATURE or data[4] != 1 or data[5] != 1:
+                raise ValueError(f"Unsupported commit-graph {graph_file}")
+            chunks = {}
+            for chunk_index in range(data[6]):
+                chunk_id, chunk_offset = struct.unpack_from(">4sQ", data, 8 + chunk_index * 12)
+                chunks[chunk_id] = chunk_offset
+            if not {b"OIDF", b"OIDL", b"CDAT"} <= chunks.keys():
+                raise ValueError(f"Unsupported commit-graph {graph_file}")
+            self._layers.append((data, chunks, self.commit_count))
+            self.commit_count += struct.unpack_from(">I", data, chunks[b"OIDF"] + 255 * 4)[0]
+
+    def _layer(self, position: int) -> Tuple[bytes, Dict[bytes, int], int]:
+        """Layer containing a global position.
+
+        Parameters
+        ----------
+        position : int
+            Global position of a commit.
+
+        Returns
+        -------
+        Tuple[bytes, Dict[bytes, int], int]
+            Data, chunk offsets and first global position of the layer.
+
+        Raises
+        ------
+        IndexError
+            If ``position`` is negative.
+        """
+        for layer in reversed(self._layers):
+            if position >= layer[2]:
+                return layer
+        raise IndexError(position)
+
+    def position(self, object_id: bytes) -> Optional[int]:
+        """Global position of a commit.
+
+        Parameters
+        ----------
+        object_id : bytes
+            Binary id of the commit.
+
+        Returns
+        -------
+        Optional[int]
+            Position or None if the commit isn't part of the commit-graph.
+        """
+        for data, chunks, layer_start in self._layers:
+            fanout_start = chunks[b"OIDF"]
+            low = (
+                struct.unpack_from(">I", data, fanout_start + (object_id[0] - 1) * 4)[0]
+                if object_id[0] > 0
+                else 0
+            )
+            high = struct.unpack_from(">I", data, fanout_start + object_id[0] * 4)[0]
+            names_start = chunks[b"OIDL"]
+            while low < high:
+                middle = (low + high) // 2
+                name_start = names_start + middle * HASH_LENGTH
+                name = data[name_start : name_start + HASH_LENGTH]
+                if name < object_id:
+                    low = middle + 1
+                elif name > object_id:
+                    high = middle
+                else:
+                    return layer_start + middle
+        return None
+
+    def object_id(self, position: int) -> bytes:
+        """Binary id of the commit at a global position.
+
+        Parameters
+        ----------
+        position : int
+            Global position of the commit.
+
+        Returns
+        -------
+        bytes
+            Binary id of the commit.
+        """
+        data, chunks, layer_start = self._layer(position)
+        name_start = chunks[b"OIDL"] + (position - layer_start) * HASH_LENGTH
+        return data[name_start : name_start + HASH_LENGTH]
+
+    def commit(self, position: int) -> Tuple[int, List[int]]:
+        """Commit time and parent positions of the commit at a global position.
+
+        Parameters
+        ----------
+        position : int
+            Global position of the commit.
+
+        Returns
+        -------
+        Tuple[int, List[int]]
+            Unix timestamp of the commit and global positions of its parents.
+        """
+        data, chunks, layer_start = self._layer(position)
+        entry_start = chunks[b"CDAT"] + (position - layer_start) * (HASH_LENGTH + 16)
+        parent_1, parent_2, generation_and_time, time_low = struct.unpack_from(
+            ">IIII", data, entry_start + HASH_LENGTH
+        )
+        timestamp = ((generation_and_time & 0x3) << 32) | time_low
+        parents = []
+        if parent_1 != COMMIT_GRAPH_PARENT_NONE:
+            parents.append(parent_1)
+        if parent_2 & COMMIT_GRAPH_EDGE_FLAG:
+            edge_index = parent_2 & ~COMMIT_GRAPH_EDGE_FLAG
+            while True:
+                edge = struct.unpack_from(">I", data, chunks[b"EDGE"] + edge_index * 4)[0]
+                parents.append(edge & ~COMMIT_GRAPH_EDGE_FLAG)
+                if edge & COMMIT_GRAPH_EDGE_FLAG:
+                    break
+                edge_index += 1
+        elif parent_2 != COMMIT_GRAPH_PARENT_NONE:
+            parents.append(parent_2)
+        return timestamp, parents
+
+
+class GitObjectStore:
+    """Read only access to the commits of a repository.
+
+    Commits are looked up in the commit-graph first, then as loose objects
+    and lastly in the packs.
+
+    Parameters
+    ----------
+    common_dir : Path
+        Common git directory as returned by :func:`common_git_dir`.
+    """
+
+    def __init__(self, common_dir: Path):
+        self.common_dir = common_dir
+        objects_dir = common_dir / "objects"
+        self.pack_indexes: List[PackIndex] = []
+        for index_path in sorted((objects_dir / "pack").glob("*.idx")):
+            try:
+                self.pack_indexes.append(PackIndex(index_path))
+            except (OSError, ValueError, struct.error):
+                continue
+        self.commit_graph: Optional[CommitGraph] = None
+        chain_file = objects_dir / "info" / "commit-graphs" / "commit-graph-chain"
+        chain = _read_text(chain_file)
+        if chain:
+            graph_files = [chain_file.parent / f"graph-{line}.graph" for line in chain.split()]
+        else:
+            graph_files = [objects_dir / "info" / "commit-graph"]
+        try:
+            self.commit_graph = CommitGraph(graph_files)
+        except (OSError, ValueError, IndexError, struct.error):
+            self.commit_graph = None
+
+    def _read_packed_object(
+        self, pack_index: PackIndex, offset: int
+    ) -> Optional[Tuple[int, bytes]]:
+        """Type and content of an object in a pack, with deltas applied.
+
+        Parameters
+        ----------
+        pack_index : PackIndex
+            Index of the pack containing the object.
+        offset : int
+            Offset of the object inside of the pack.
+
+        Returns
+        -------
+        Optional[Tuple[int, bytes]]
+            Object type and content or None if the object couldn't be read.
+        """
+        with open(pack_index.pack_path, "rb") as f:
+            f.seek(offset)
+            byte = f.read(1)[0]
+            object_type = (byte >> 4) & 0x7
+            while byte & 0x80:
+                byte = f.read(1)[0]
+            base: Optional[Tuple[int, bytes]] = None
+            if object_type == OBJECT_TYPE_OFS_DELTA:
+                byte = f.read(1)[0]
+                base_distance = byte & 0x7F
+                while byte & 0x80:
+                    byte = f.read(1)[0]
+                    base_distance = ((base_distance + 1) << 7) | (byte & 0x7F)
+                data_start = f.tell()
+                base = self._read_packed_object(pack_index, offset - base_distance)
+            elif object_type == OBJECT_TYPE_REF_DELTA:
+                base_id = f.read(HASH_LENGTH).hex()
+                data_start = f.tell()
+                base = self.read_object(base_id)
+            else:
+                data_start = f.tell()
+            f.seek(data_start)
+            decompressor = zlib.decompressobj()
+            chunks = []
+            while not decompressor.eof:
+                chunk = f.read(4096)
+                if not chunk:
+                    return None
+                chunks.append(decompressor.decompress(chunk))
+        content = b"".join(chunks)
+        if object_type in (OBJECT_TYPE_OFS_DELTA, OBJECT_TYPE_REF_DELTA):
+            if base is None:
+                return None
+            return base[0], _apply_delta(base[1], content)
+        return object_type, content
+
+    def read_object(self, object_id: str) -> Optional[Tuple[int, bytes]]:
+        """Type and content of an object.
+
+        Parameters
+        ----------
+        object_id : str
+            Id of the object.
+
+        Returns
+        -------
+        Optional[Tuple[int, bytes]]
+            Object type (e.g. ``OBJECT_TYPE_COMMIT``) and content or None if not found
+            in the loose objects and any of the readable packs.
+        """
+        loose_object = read_loose_object(self.common_dir, object_id)
+        if loose_object is not None:
+            return loose_object
+        binary_id = bytes.fromhex(object_id)
+        for pack_index in self.pack_indexes:
+            try:
+                offset = pack_index.find_offset(binary_id)
+                if offset is None:
+                    continue
+                packed_object = self._read_packed_object(pack_index, offset)
+            except (OSError, IndexError, zlib.error, struct.error):
+                # another pack can still contain a readable copy of the object
+                continue
+            if packed_object is not None:
+                return packed_object
+        return None
+
+    def commit_info(self, commit_id: str) -> Optional[Tuple[int, List[str]]]:
+        """Commit time and parents of a commit.
+
+        Parameters
+        ----------
+        commit_id : str
+            Id of the commit.
+
+        Returns
+        -------
+        Optional[Tuple[int, List[str]]]
+            Unix timestamp of the commit and ids of its parents
+            or None if the commit couldn't be read.
+        """
+        if self.commit_graph is not None:
+            position = self.commit_graph.position(bytes.fromhex(commit_id))
+            if position is not None:
+                timestamp, parent_positions = self.commit_graph.commit(position)
+                return timestamp, [
+                    self.commit_graph.object_id(parent_position).hex()
+                    for parent_position in parent_positions
+                ]
+        commit_object = self.read_object(commit_id)
+        if commit_object is None or commit_object[0] != OBJECT_TYPE_COMMIT:
+            return None
+        commit_timestamp = parse_commit_time(commit_object[1])
+        if commit_timestamp is None:
+            # without a committer line the commit can't be placed in the history,
+            # so it is handled like an unreadable commit and the walk stops
+            return None
+        return commit_timestamp, parse_commit_parents(commit_object[1])
+
+
+_OBJECT_STORES: Dict[Path, Tuple[Tuple[Optional[int], ...], GitObjectStore]] = {}
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    """Modification time of a path used to invalidate cached object stores.
+
+    Parameters
+    ----------
+    path : Path
+        Path to get the modification time for.
+
+    Returns
+    -------
+    Optional[int]
+        Modification time in ns or None if the path doesn't exist.
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def object_store(git_dir: Path) -> GitObjectStore:
+    """Cached object store of a repository.
+
+    The store and with it the decoded commit-graph is shared by all distributions
+    installed from the same repository, until packs or the commit-graph change.
+
+    Parameters
+    ----------
+    git_dir : Path
+        Git directory as returned by :func:`find_git_dir`.
+
+    Returns
+    -------
+    GitObjectStore
+        Object store of the repository.
+    """
+    common_dir = common_git_dir(git_dir).resolve()
+    info_dir = common_dir / "objects" / "info"
+    store_key = (
+        _mtime_ns(common_dir / "objects" / "pack"),
+        _mtime_ns(info_dir / "commit-graph"),
+        _mtime_ns(info_dir / "commit-graphs" / "commit-graph-chain"),
+    )
+    cached = _OBJECT_STORES.get(common_dir)
+    if cached is None or cached[0] != store_key:
+        cached = (store_key, GitObjectStore(common_dir))
+        _OBJECT_STORES[common_dir] = cached
+    return cached[1]
+
+
+def commit_time(git_dir: Path, commit_id: str) -> Optional[int]:
+    """Committer timestamp of a commit.
+
+    Parameters
+    ----------
+    git_dir : Path
+        Git directory as returned by :func:`find_git_dir`.
+    commit_id : str
+        Id of the commit.
+
+    Returns
+    -------
+    Optional[int]
+        Unix timestamp of the commit or None if the commit couldn't be read.
+    """
+    if len(commit_id) != HASH_LENGTH * 2:
+        return None
+    commit = object_store(git_dir).commit_info(commit_id)
+    return commit[0] if commit is not None else None
+
+
+def walk_last_commit_before(
+    commit_id: str,
+    timestamp: float,
+    commit_info: Callable[[str], Optional[Tuple[int, List[str]]]],
+) -> Optional[str]:
+    """Newest commit reachable from ``commit_id`` with a commit time at or before ``timestamp``.
+
+    This walks the history newest commit first, the same way
+    ``git log --before <timestamp> -n 1 <commit_id>`` does.
+    The time budget is checked every :data:`DEADLINE_CHECK_INTERVAL` commits and
+    :class:`~verbose_version_info.utils.DeadlineExceeded` is passed on if it ran out,
+    so walking a long history doesn't exceed it.
+
+    Parameters
+    ----------
+    commit_id : str
+        Id of the commit to start from, e.g. the one ``HEAD`` points to.
+    timestamp : float
+        Unix timestamp the commit needs to be older than or equal to.
+    commit_info : Callable[[str], Optional[Tuple[int, List[str]]]]
+        Function returning the commit time and parent ids of a commit,
+        or None if the commit can't be read.
+
+    Returns
+    -------
+    Optional[str]
+        Commit id or None if no commit was found or the history couldn't be read.
+
+    See Also
+    --------
+    last_commit_before
+    verbose_version_info.utils.time_budget
+    """
+    seen: Set[str] = {commit_id}
+    queue: List[Tuple[int, str]] = []
+    commit = commit_info(commit_id)
+    walked_commits = 0
+    while commit is not None:
+        if commit[0] <= timestamp:
+            return commit_id
+        walked_commits += 1
+        if walked_commits % DEADLINE_CHECK_INTERVAL == 0:
+            deadline_timeout()
+        for parent_id in commit[1]:
+            if parent_id not in seen:
+                seen.add(parent_id)
+                parent = commit_info(parent_id)
+                if parent is None:
+                    # e.g. shallow clones
+                    return None
+                heapq.heappush(queue, (-parent[0], parent_id))
+        if not queue:
+            return None
+        _, commit_id = heapq.heappop(queue)
+        commit = commit_info(commit_id)
+    return None
+
+
+def last_commit_before(git_dir: Path, commit_id: str, timestamp: float) -> Optional[str]:
+    """Newest commit reachable from ``commit_id`` with a commit time at or before ``timestamp``.
+
+    Parameters
+    ----------
+    git_dir : Path
+        Git directory as returned by :func:`find_git_dir`.
+    commit_id : str
+        Id of the commit to start from, e.g. the one ``HEAD`` points to.
+    timestamp : float
+        Unix timestamp the commit needs to be older than or equal to.
+
+    Returns
+    -------
+    Optional[str]
+        Commit id or None if no commit was found or the history couldn't be read.
+
+    See Also
+    --------
+    walk_last_commit_before
+    """
+    if len(commit_id) != HASH_LENGTH * 2:
+        return None
+    return walk_last_commit_before(commit_id, timestamp, object_store(git_dir).commit_info)
@@ -1,38 +1,58 @@
 """Module containing function to look up resources."""
 
-import json
 import os
 import sys
 from datetime import datetime
 from pathlib import Path
 from typing import List
 from typing import Optional
-from urllib.parse import unquote
-from urllib.parse import urlparse
 
 from verbose_version_info.data_containers import VerboseVersionInfo
+from verbose_version_info.tracing import traced
+from verbose_version_info.utils import NotFoundDistribution
+from verbose_version_info.utils import ResolutionContext
 from verbose_version_info.utils import _datetime_now
-from verbose_version_info.utils import dist_files
-from verbose_version_info.utils import distribution
+from verbose_version_info.utils import iter_dist_files
+from verbose_version_info.utils import normalize_distribution_name
 
 
-def dist_info_mtime(distribution_name: str) -> datetime:
+@traced("dist_info_mtime")
+def dist_info_mtime(
+    distribution_name: str, *, context: Optional[ResolutionContext] = None
+) -> datetime:
     """Modification time of the dist info, current time if editable installed.
 
     This should basically be the same as the installation time for
     packages installed from source in a none editable mode.
+    Editable installations are recognized by their ``.egg-info`` metadata directory
+    or the ``dir_info.editable`` flag in ``direct_url.json`` (PEP 660).
+    For ``*.dist-info`` directories on disk ``METADATA`` is stat'ed directly,
+    otherwise RECORD is read until the first dist-info file.
 
     Parameters
     ----------
     distribution_name : str
         The name of the distribution package as a string.
+    context : Optional[ResolutionContext]
+        Resolution context of the distribution, by default None
 
     Returns
     -------
     datetime
         Time the dist-info was packaged or current time if not found.
     """
-    for path in dist_files(distribution_name):
+    if context is None:
+        context = ResolutionContext(distribution_name)
+    if context.editable:
+        return _datetime_now()
+    if context.metadata_dir is not None:
+        if context.metadata_dir.suffix != ".dist-info":
+            return _datetime_now()
+        try:
+            return datetime.fromtimestamp(os.stat(context.metadata_dir / "METADATA").st_mtime)
+        except OSError:
+            pass
+    for path in iter_dist_files(distribution_name, dist=context.dist):
         if "dist-info" in str(path):
             mtime = os.stat(path.locate()).st_mtime
             return datetime.fromtimestamp(mtime)
@@ -40,8 +60,12 @@ def dist_info_mtime(distribution_name: str) -> datetime:
     return _datetime_now()
 
 
+@traced("find_url_info")
 def find_url_info(
-    distribution_name: str, dist_time: Optional[datetime] = None
+    distribution_name: str,
+    dist_time: Optional[datetime] = None,
+    *,
+    context: Optional[ResolutionContext] = None,
 ) -> Optional[VerboseVersionInfo]:
     """Extract package information for packages installed from an url or locally.
 
@@ -56,6 +80,8 @@ def find_url_info(
         The name of the distribution package as a string.
     dist_time : datetime
         Datetime instance of when the distribution was created.
+    context : Optional[ResolutionContext]
+        Resolution context of the distribution, by default None
 
     Examples
     --------
@@ -98,34 +124,39 @@ def find_url_info(
         None
             If the package was installed from as editable or PyPi.
     """
-    dist = distribution(distribution_name)
+    if context is None:
+        context = ResolutionContext(distribution_name)
+    vcs_dict = context.direct_url
+    if vcs_dict is None:
+        return None
     if dist_time is None:
-        dist_time = dist_info_mtime(distribution_name)
-    for path in dist_files(distribution_name):
-        if path.name == "direct_url.json":
-            vcs_dict = json.loads(path.read_text())
-            vcs_info = vcs_dict.get("vcs_info", {})
-            return VerboseVersionInfo(
-                release_version=dist.version,
-                dist_time=dist_time,
-                url=vcs_dict.get("url", ""),
-                commit_id=vcs_info.get("commit_id", ""),
-                vcs_name=vcs_info.get("vcs", ""),
-            )
-
-    return None
+        dist_time = dist_info_mtime(distribution_name, context=context)
+    vcs_info = vcs_dict.get("vcs_info", {})
+    return VerboseVersionInfo(
+        release_version=context.version,
+        dist_time=dist_time,
+        url=vcs_dict.get("url", ""),
+        commit_id=vcs_info.get("commit_id", ""),
+        vcs_name=vcs_info.get("vcs", ""),
+    )
 
 
-def egg_link_lines(distribution_name: str) -> Optional[List[str]]:
+def egg_link_lines(
+    distribution_name: str, *, context: Optional[ResolutionContext] = None
+) -> Optional[List[str]]:
     """Lines of an ``.egg-link`` file if it exists.
 
     This assumes that a file with ``<distribution_name>.egg-link`` exists
     somewhere in the path (which is at least for pip the case).
+    For PEP 660 editable installations which only have an ``__editable__`` ``.pth``
+    file, the source path listed in it is returned as single line.
 
     Parameters
     ----------
     distribution_name : str
         The name of the distribution package as a string.
+    context : Optional[ResolutionContext]
+        Resolution context of the distribution, by default None
 
     Returns
     -------
@@ -136,26 +167,24 @@ def egg_link_lines(distribution_name: str) -> Optional[List[str]]:
     --------
     find_editable_install_basepath
     """
-    distribution_name = distribution(distribution_name).metadata.get(  # type:ignore[attr-defined]
-        "name", ""
-    )
-    if distribution_name == "":
+    if context is None:
+        context = ResolutionContext(distribution_name)
+    if isinstance(context.dist, NotFoundDistribution):
         return None
-    for path_item in sys.path:
-        egg_link = os.path.join(path_item, f"{distribution_name}.egg-link")
-        if os.path.isfile(egg_link):
-            with open(egg_link) as f:
-                return f.read().splitlines(keepends=False)
-    return None
+    return context.editable_index.get(normalize_distribution_name(distribution_name))
 
 
-def find_editable_install_basepath(distribution_name: str) -> Optional[Path]:
+def find_editable_install_basepath(
+    distribution_name: str, *, context: Optional[ResolutionContext] = None
+) -> Optional[Path]:
     """Find basepath of an as editable installed package.
 
     Parameters
     ----------
     distribution_name : str
         The name of the distribution package as a string.
+    context : Optional[ResolutionContext]
+        Resolution context of the distribution, by default None
 
     Returns
     -------
@@ -167,7 +196,7 @@ def find_editable_install_basepath(distribution_name: str) -> Optional[Path]:
     --------
     egg_link_lines
     """
-    egg_link_parts = egg_link_lines(distribution_name)
+    egg_link_parts = egg_link_lines(distribution_name, context=context)
     if egg_link_parts is not None:
         base_path = os.path.join(*egg_link_parts)
         return Path(base_path).resolve()
@@ -191,6 +220,9 @@ def file_uri_to_path(uri: str) -> Optional[Path]:
         Path of the file if it exists
     """
     if uri.startswith("file://"):
+        from urllib.parse import unquote
+        from urllib.parse import urlparse
+
         parsed_uri = urlparse(uri)
         escape_uri_path = unquote(parsed_uri.path)
         # rare edgecase, thus excluded from coverage
@@ -202,8 +234,12 @@ def file_uri_to_path(uri: str) -> Optional[Path]:
     return None
 
 
+@traced("local_install_basepath")
 def local_install_basepath(
-    distribution_name: str, *, vv_info: Optional[VerboseVersionInfo] = None
+    distribution_name: str,
+    *,
+    vv_info: Optional[VerboseVersionInfo] = None,
+    context: Optional[ResolutionContext] = None,
 ) -> Optional[Path]:
     """Extract base installation path for packages installed from local resource.
 
@@ -213,11 +249,15 @@ def local_install_basepath(
         The name of the distribution package as a string.
     vv_info : Optional[VerboseVersionInfo]
         Verbose version info generated by :func:`find_url_info`.
+    context : Optional[ResolutionContext]
+        Resolution context of the distribution, by default None
 
     Returns
     -------
     Optional[Path]
         Path to the root of a package which was installed from a local resource.
+        For PEP 660 editable installations this is the url from ``direct_url.json``,
+        without falling back to ``.egg-link`` files.
 
     See Also
     --------
@@ -225,9 +265,14 @@ def local_install_basepath(
     file_uri_to_path
     find_editable_install_basepath
     """
+    if context is None:
+        context = ResolutionContext(distribution_name)
+    if context.editable:
+        # PEP 660 editable installations point to their source, no need to look for egg-links
+        return file_uri_to_path(context.direct_url["url"])  # type: ignore[index]
     if vv_info is None:
-        vv_info = find_url_info(distribution_name)
+        vv_info = find_url_info(distribution_name, context=context)
     if vv_info is not None and vv_info.url:
         return file_uri_to_path(vv_info.url)
     else:
-        return find_editable_install_basepath(distribution_name)
+        return find_editable_install_basepath(distribution_name, context=context)
@@ -1,8 +1,33 @@
 """Module containing all settings related functionalities."""
 from copy import copy
 
-DEFAULT_VCS_SETTINGS = {"warn_dirty": True}
+DEFAULT_VCS_SETTINGS = {
+    "warn_dirty": True,
+    "dirty_check": "full",
+    "git_batch_idle_timeout": 30.0,
+    "marker_cache_max_entries": 1024,
+}
 VCS_SETTINGS = copy(DEFAULT_VCS_SETTINGS)
 
-DEFAULT_SETTINGS = {"not_found_version_str": "Unknown", "vcs": VCS_SETTINGS}
+DEFAULT_CACHE_SETTINGS = {
+    "enabled": False,
+    "cache_dir": None,
+    "max_entries": 4096,
+    "recheck_dirty": False,
+}
+CACHE_SETTINGS = copy(DEFAULT_CACHE_SETTINGS)
+
+DEFAULT_DISTRIBUTION_CACHE_SETTINGS = {
+    "max_entries": 1024,
+    "not_found_ttl": 5.0,
+    "revalidate": True,
+}
+DISTRIBUTION_CACHE_SETTINGS = copy(DEFAULT_DISTRIBUTION_CACHE_SETTINGS)
+
+DEFAULT_SETTINGS = {
+    "not_found_version_str": "Unknown",
+    "vcs": VCS_SETTINGS,
+    "cache": CACHE_SETTINGS,
+    "distribution_cache": DISTRIBUTION_CACHE_SETTINGS,
+}
 SETTINGS = copy(DEFAULT_SETTINGS)
@@ -0,0 +1,309 @@
+"""Module containing the timing instrumentation of the resolution stages.
+
+The stages of the resolution report timed :class:`TraceEvent` instances to the hooks
+registered with :func:`trace_hook`. Without hooks the instrumented functions only
+look up the empty hooks before running, so tracing costs close to nothing when disabled.
+
+Traced stages
+-------------
+``distribution``, ``dist_files``, ``editable_index``, ``dist_info_mtime``, ``find_url_info``,
+``local_install_basepath``, ``vcs_root``, ``vcs_reader`` (named after the reader),
+``git_batch`` and ``subprocess`` (named after the command, with ``argv`` and ``returncode``).
+"""
+import math
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import TextIO
+from typing import Tuple
+from typing import TypeVar
+from typing import cast
+
+from verbose_version_info.data_containers import TraceEvent
+
+TraceHook = Callable[[TraceEvent], None]
+FunctionT = TypeVar("FunctionT", bound=Callable[..., Any])
+
+_TRACE_HOOKS: ContextVar[Tuple[TraceHook, ...]] = ContextVar("trace_hooks", default=())
+
+
+@contextmanager
+def trace_hook(hook: TraceHook) -> Iterator[TraceHook]:
+    """Pass the timed stages of the resolutions in the current context to ``hook``.
+
+    Like the time budget the hooks are inherited by the worker threads of the bulk lookups,
+    so ``hook`` needs to be thread-safe.
+
+    Parameters
+    ----------
+    hook : TraceHook
+        Callable receiving a :class:`TraceEvent` after each traced stage finished.
+
+    Yields
+    ------
+    TraceHook
+        The registered hook.
+
+    See Also
+    --------
+    StageHistogram
+
+    Examples
+    --------
+    >>> with trace_hook(StageHistogram()) as histogram:
+    ...     vv_info_all()
+    >>> histogram.print()
+    """
+    token = _TRACE_HOOKS.set((*_TRACE_HOOKS.get(), hook))
+    try:
+        yield hook
+    finally:
+        _TRACE_HOOKS.reset(token)
+
+
+def tracing_enabled() -> bool:
+    """Whether any hook is registered in the current context.
+
+    Returns
+    -------
+    bool
+        True if traced stages are reported.
+    """
+    return bool(_TRACE_HOOKS.get())
+
+
+@contextmanager
+def traced_stage(stage: str, name: str = "", **details: Any) -> Iterator[Dict[str, Any]]:
+    """Time the code inside of the context and report it to the registered hooks.
+
+    Parameters
+    ----------
+    stage : str
+        Name of the stage.
+    name : str
+        Name of this call of the stage, by default "" which uses ``stage``.
+    details : Any
+        Details of the event, which can be extended inside of the context.
+
+    Yields
+    ------
+    Dict[str, Any]
+        Details of the event, which are passed to the hooks when the context is left.
+
+    Raises
+    ------
+    BaseException
+        Errors raised inside of the context, after their type was added to the details.
+    """
+    hooks = _TRACE_HOOKS.get()
+    if not hooks:
+        yield details
+        return
+    start = time.perf_counter()
+    try:
+        yield details
+    except BaseException as error:
+        details["error"] = type(error).__name__
+        raise
+    finally:
+        event = TraceEvent(stage, name or stage, time.perf_counter() - start, details)
+        for hook in hooks:
+            hook(event)
+
+
+def traced(stage: str) -> Callable[[FunctionT], FunctionT]:
+    """Decorate a function to report each call as ``stage``.
+
+    Parameters
+    ----------
+    stage : str
+        Name of the stage.
+
+    Returns
+    -------
+    Callable[[FunctionT], FunctionT]
+        Decorator of the function.
+    """
+
+    def decorator(function: FunctionT) -> FunctionT:
+        """Wrap the function to time its calls if tracing is enabled.
+
+        Parameters
+        ----------
+        function : FunctionT
+            Function implementing the stage.
+
+        Returns
+        -------
+        FunctionT
+            Wrapped function.
+        """
+
+        @wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            """Run the function inside of :func:`traced_stage` if hooks are registered.
+
+            Parameters
+            ----------
+            args : Any
+                Positional arguments of the function.
+            kwargs : Any
+                Keyword arguments of the function.
+
+            Returns
+            -------
+            Any
+                Result of the function.
+            """
+            if not _TRACE_HOOKS.get():
+                return function(*args, **kwargs)
+            with traced_stage(stage):
+                return function(*args, **kwargs)
+
+        return cast(FunctionT, wrapper)
+
+    return decorator
+
+
+def command_name(command: Any) -> str:
+    """Name of a subprocess event, the executable and its subcommand.
+
+    Parameters
+    ----------
+    command : Any
+        Argv of the command.
+
+    Returns
+    -------
+    str
+        E.g. ``"git status"``.
+    """
+    return " ".join(str(arg) for arg in list(command)[:2])
+
+
+HISTOGRAM_BUCKETS = (1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0)
+"""Upper bounds in seconds of the buckets of :class:`StageHistogram`."""
+
+
+def _format_duration(seconds: float) -> str:
+    """Format a duration with a unit fitting its magnitude.
+
+    Parameters
+    ----------
+    seconds : float
+        Duration in seconds.
+
+    Returns
+    -------
+    str
+        E.g. ``"12.3 ms"``.
+    """
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f} ms"
+    return f"{seconds:.2f} s"
+
+
+class StageHistogram:
+    """Trace hook aggregating the durations of each stage into a histogram.
+
+    Stages with a name other than the stage (vcs readers and subprocesses)
+    are aggregated per name as ``"stage[name]"``.
+
+    See Also
+    --------
+    trace_hook
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.durations: Dict[str, List[float]] = {}
+
+    def __call__(self, event: TraceEvent) -> None:
+        """Add the duration of a traced stage.
+
+        Parameters
+        ----------
+        event : TraceEvent
+            Timed stage.
+        """
+        key = event.stage if event.name == event.stage else f"{event.stage}[{event.name}]"
+        with self._lock:
+            self.durations.setdefault(key, []).append(event.duration)
+
+    def bucket_counts(self, key: str) -> List[int]:
+        """Number of durations of a stage in each of the :data:`HISTOGRAM_BUCKETS`.
+
+        Parameters
+        ----------
+        key : str
+            Stage as aggregated by the histogram.
+
+        Returns
+        -------
+        List[int]
+            Count per bucket, followed by the count of durations exceeding the last bucket.
+        """
+        counts = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+        with self._lock:
+            durations = list(self.durations.get(key, []))
+        for duration in durations:
+            index = next(
+                (index for index, bound in enumerate(HISTOGRAM_BUCKETS) if duration < bound),
+                len(HISTOGRAM_BUCKETS),
+            )
+            counts[index] += 1
+        return counts
+
+    def format(self, width: int = 40) -> str:
+        """Per stage summary and histogram of the durations, slowest stage first.
+
+        Parameters
+        ----------
+        width : int
+            Width of the longest bar, by default 40
+
+        Returns
+        -------
+        str
+            Formatted histograms.
+        """
+        with self._lock:
+            durations = {key: list(values) for key, values in self.durations.items()}
+        labels = [f"< {_format_duration(bound)}" for bound in HISTOGRAM_BUCKETS]
+        labels.append(f">= {_format_duration(HISTOGRAM_BUCKETS[-1])}")
+        lines = []
+        for key, values in sorted(durations.items(), key=lambda item: -sum(item[1])):
+            total = sum(values)
+            lines.append(
+                f"{key}: {len(values)} calls, total {_format_duration(total)}, "
+                f"mean {_format_duration(total / len(values))}, "
+                f"max {_format_duration(max(values))}"
+            )
+            counts = self.bucket_counts(key)
+            first = next(index for index, count in enumerate(counts) if count)
+            last = len(counts) - next(index for index, count in enumerate(counts[::-1]) if count)
+            for label, count in zip(labels[first:last], counts[first:last]):
+                bar = "#" * math.ceil(count / max(counts) * width)
+                lines.append(f"  {label:>10} | {bar:<{width}} {count}")
+        return "\n".join(lines)
+
+    def print(self, file: Optional[TextIO] = None) -> None:
+        """Print the histograms of :meth:`format`.
+
+        Parameters
+        ----------
+        file : Optional[TextIO]
+            Stream to print to, by default None which prints to ``sys.stdout``.
+        """
+        print(self.format(), file=file if file is not None else sys.stdout)
@@ -1,18 +1,40 @@
 """Utility modules with convenience functions."""
 
 
+import csv
+import io
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
-from functools import lru_cache
+from functools import cached_property
 from importlib.metadata import Distribution
+from importlib.metadata import FileHash
 from importlib.metadata import PackageNotFoundError
 from importlib.metadata import PackagePath
+from importlib.metadata import PathDistribution
 from importlib.metadata import distribution as _distribution
 from os import PathLike
 from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
+from typing import Optional
+from typing import Tuple
 from typing import Union
+from warnings import warn
 
 from verbose_version_info import SETTINGS
+from verbose_version_info.data_containers import DistributionCacheInfo
+from verbose_version_info.data_containers import ScannedDistribution
+from verbose_version_info.settings import DISTRIBUTION_CACHE_SETTINGS
+from verbose_version_info.tracing import traced
 
 
 class NotFoundDistribution(Distribution):
@@ -106,11 +128,9 @@ class NotFoundDistribution(Distribution):
         return []
 
 
-@lru_cache()
-def distribution(
-    distribution_name: str,
-) -> Distribution:
-    """Get the ``Distribution`` instance for the named package.
+@traced("distribution")
+def find_distribution(distribution_name: str) -> Distribution:
+    """Look up the ``Distribution`` instance for the named package without caching.
 
     Parameters
     ----------
@@ -121,6 +141,10 @@ def distribution(
     -------
     Distribution
         Distribution instance of the package
+
+    See Also
+    --------
+    distribution
     """
     try:
         return _distribution(distribution_name)
@@ -128,8 +152,386 @@ def distribution(
         return NotFoundDistribution()
 
 
+def _metadata_dir_mtime(dist: Distribution) -> Optional[float]:
+    """Modification time of the metadata directory a cached distribution is validated with.
+
+    Parameters
+    ----------
+    dist : Distribution
+        Distribution of the package.
+
+    Returns
+    -------
+    Optional[float]
+        Modification time or None if the distribution has no metadata directory on disk
+        or it doesn't exist anymore.
+    """
+    dist_metadata_dir = metadata_dir(dist)
+    if dist_metadata_dir is None:
+        return None
+    try:
+        return os.stat(dist_metadata_dir).st_mtime
+    except OSError:
+        return None
+
+
+class DistributionCache:
+    """Least recently used cache of distributions keyed on PEP 503 normalized names.
+
+    Found distributions are validated on each hit by the modification time of their
+    metadata directory (if ``revalidate`` is enabled), so upgraded or uninstalled
+    distributions are looked up again.
+    Not found distributions are cached separately and expire after ``not_found_ttl``
+    seconds, so distributions installed in the meantime are picked up.
+    Distributions which start shadowing a cached one (e.g. by being earlier on
+    ``sys.path``) are only picked up after :meth:`invalidate` or :meth:`clear`.
+
+    The capacity and expiry are read from ``DISTRIBUTION_CACHE_SETTINGS`` on each lookup.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[Distribution, Optional[float]]] = {}
+        self._not_found: Dict[str, float] = {}
+        self._hits = 0
+        self._misses = 0
+        self._not_found_hits = 0
+        self._stale = 0
+
+    @property
+    def max_entries(self) -> int:
+        """Capacity of the cache set in ``DISTRIBUTION_CACHE_SETTINGS``.
+
+        Returns
+        -------
+        int
+            Maximum number of found distributions, the least recently used are evicted first.
+        """
+        return int(DISTRIBUTION_CACHE_SETTINGS["max_entries"])  # type: ignore[call-overload]
+
+    def lookup(self, distribution_name: str) -> Distribution:
+        """Cached distribution of the named package, which is looked up if needed.
+
+        Parameters
+        ----------
+        distribution_name : str
+            The name of the package as a string.
+
+        Returns
+        -------
+        Distribution
+            Distribution instance of the package
+        """
+        key = normalize_distribution_name(distribution_name)
+        with self._lock:
+            entry = self._entries.get(key)
+            not_found_expiry = self._not_found.get(key)
+        if entry is not None:
+            dist, mtime = entry
+            if (
+                DISTRIBUTION_CACHE_SETTINGS["revalidate"] is not True
+                or mtime is None
+                or _metadata_dir_mtime(dist) == mtime
+            ):
+                with self._lock:
+                    self._hits += 1
+                    # move to the end to mark it as the most recently used
+                    if self._entries.get(key) is entry:
+                        self._entries[key] = self._entries.pop(key)
+                return dist
+            with self._lock:
+                self._stale += 1
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+        elif not_found_expiry is not None:
+            if time.monotonic() < not_found_expiry:
+                with self._lock:
+                    self._not_found_hits += 1
+                return NotFoundDistribution()
+            with self._lock:
+                self._not_found.pop(key, None)
+
+        dist = find_distribution(distribution_name)
+        with self._lock:
+            self._misses += 1
+            if isinstance(dist, NotFoundDistribution):
+                ttl = float(DISTRIBUTION_CACHE_SETTINGS["not_found_ttl"])  # type: ignore[arg-type]
+                if ttl > 0:
+                    self._not_found[key] = time.monotonic() + ttl
+                return dist
+            self._entries.pop(key, None)
+            self._entries[key] = (dist, _metadata_dir_mtime(dist))
+            while len(self._entries) > max(self.max_entries, 0):
+                del self._entries[next(iter(self._entries))]
+        return dist
+
+    def invalidate(self, distribution_name: str) -> None:
+        """Remove the cached result of a distribution.
+
+        Parameters
+        ----------
+        distribution_name : str
+            The name of the package as a string.
+        """
+        key = normalize_distribution_name(distribution_name)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._not_found.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all cached results and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._not_found.clear()
+            self._hits = self._misses = self._not_found_hits = self._stale = 0
+
+    def info(self) -> DistributionCacheInfo:
+        """Statistics of the cache.
+
+        Returns
+        -------
+        DistributionCacheInfo
+            Hits, misses and size of the cache.
+        """
+        with self._lock:
+            return DistributionCacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                not_found_hits=self._not_found_hits,
+                stale=self._stale,
+                max_entries=self.max_entries,
+                entries=len(self._entries),
+                not_found_entries=len(self._not_found),
+            )
+
+
+DISTRIBUTION_CACHE = DistributionCache()
+"""Cache used by :func:`distribution`."""
+
+
+def distribution(distribution_name: str) -> Distribution:
+    """Get the ``Distribution`` instance for the named package.
+
+    Lookups are cached in :data:`DISTRIBUTION_CACHE`, so names which only differ
+    in case or separators (e.g. ``Foo_Bar`` and ``foo-bar``) share one entry.
+
+    Parameters
+    ----------
+    distribution_name : str
+        The name of the package as a string.
+
+    Returns
+    -------
+    Distribution
+        Distribution instance of the package
+
+    See Also
+    --------
+    DistributionCache
+    find_distribution
+    """
+    return DISTRIBUTION_CACHE.lookup(distribution_name)
+
+
+def normalize_distribution_name(distribution_name: str) -> str:
+    """Normalize a distribution name as described in PEP 503.
+
+    Parameters
+    ----------
+    distribution_name : str
+        The name of the distribution package as a string.
+
+    Returns
+    -------
+    str
+        Lowercase name with runs of ``-``, ``_`` and ``.`` replaced by a single ``-``.
+    """
+    return re.sub(r"[-_.]+", "-", distribution_name).lower()
+
+
+def scan_distributions(
+    path: Optional[Iterable[str]] = None,
+) -> Dict[str, ScannedDistribution]:
+    """Find all distributions by listing each path entry only once.
+
+    In contrast to calling :func:`distribution` for each name, which searches
+    all path entries for every lookup, this lists every entry of ``path``
+    a single time and creates all ``Distribution`` instances from that listing.
+    As with the import system the first found distribution of a name wins.
+
+    Parameters
+    ----------
+    path : Optional[Iterable[str]]
+        Path entries to scan, by default ``sys.path``
+
+    Returns
+    -------
+    Dict[str, ScannedDistribution]
+        Mapping of the normalized distribution names to the found distributions.
+
+    See Also
+    --------
+    normalize_distribution_name
+    """
+    scanned_distributions: Dict[str, ScannedDistribution] = {}
+    for path_item in sys.path if path is None else path:
+        try:
+            with os.scandir(path_item or ".") as dir_entries:
+                for dir_entry in dir_entries:
+                    if not dir_entry.name.endswith((".dist-info", ".egg-info")):
+                        continue
+                    normalized_name = normalize_distribution_name(
+                        dir_entry.name.rsplit(".", 1)[0].split("-", 1)[0]
+                    )
+                    if normalized_name in scanned_distributions or not dir_entry.is_dir():
+                        continue
+                    scanned_distributions[normalized_name] = ScannedDistribution(
+                        normalized_name=normalized_name,
+                        distribution=PathDistribution(Path(dir_entry.path)),
+                    )
+        except OSError:
+            # Not existing directories, zip files and eggs
+            continue
+    return scanned_distributions
+
+
+EditableIndex = Dict[str, List[str]]
+"""Mapping of normalized distribution names to the lines of their ``.egg-link`` file."""
+
+_EDITABLE_INDEX_LOCK = threading.Lock()
+_PATH_ENTRY_EDITABLES: Dict[str, Tuple[Optional[float], EditableIndex, EditableIndex]] = {}
+_EDITABLE_INDEX: Tuple[Tuple[Tuple[str, Optional[float]], ...], EditableIndex] = ((), {})
+
+
+def _read_lines(path: str) -> Optional[List[str]]:
+    """Lines of a small text file with striped newlines.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file.
+
+    Returns
+    -------
+    Optional[List[str]]
+        Lines of the file or None if it couldn't be read.
+    """
+    try:
+        with open(path) as f:
+            return f.read().splitlines(keepends=False)
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _list_path_entry_editables(path_item: str) -> Tuple[EditableIndex, EditableIndex]:
+    """Editable installations of a single ``sys.path`` entry.
+
+    Parameters
+    ----------
+    path_item : str
+        Entry of ``sys.path``.
+
+    Returns
+    -------
+    Tuple[EditableIndex, EditableIndex]
+        Lines of the ``<name>.egg-link`` files and source paths listed in the
+        ``__editable__.<name>-<version>.pth`` files of PEP 660 installations,
+        both keyed by the normalized distribution name.
+    """
+    egg_links: EditableIndex = {}
+    editable_pths: EditableIndex = {}
+    try:
+        with os.scandir(path_item or ".") as dir_entries:
+            for dir_entry in dir_entries:
+                if dir_entry.name.endswith(".egg-link"):
+                    lines = _read_lines(dir_entry.path)
+                    if lines is not None:
+                        name = normalize_distribution_name(dir_entry.name[: -len(".egg-link")])
+                        egg_links.setdefault(name, lines)
+                elif dir_entry.name.startswith("__editable__.") and dir_entry.name.endswith(
+                    ".pth"
+                ):
+                    lines = _read_lines(dir_entry.path)
+                    # Import hook based editable installations don't contain paths
+                    source_paths = [
+                        line for line in lines or [] if line and not line.startswith("import")
+                    ]
+                    if source_paths:
+                        name_version = dir_entry.name[len("__editable__.") : -len(".pth")]
+                        name = normalize_distribution_name(name_version.split("-", 1)[0])
+                        editable_pths.setdefault(name, source_paths[:1])
+    except OSError:
+        # Not existing directories, zip files and eggs
+        pass
+    return egg_links, editable_pths
+
+
+def _path_entry_mtime(path_item: str) -> Optional[float]:
+    """Modification time of a ``sys.path`` entry.
+
+    Parameters
+    ----------
+    path_item : str
+        Entry of ``sys.path``.
+
+    Returns
+    -------
+    Optional[float]
+        Modification time or None if the entry doesn't exist.
+    """
+    try:
+        return os.stat(path_item or ".").st_mtime
+    except OSError:
+        return None
+
+
+@traced("editable_index")
+def editable_index() -> EditableIndex:
+    """Index of the editable installations on ``sys.path``.
+
+    Each ``sys.path`` entry is only listed once and the listing is reused until
+    ``sys.path`` or the modification time of the entry changes, so looking up
+    the ``.egg-link`` of a distribution is a dict lookup instead of checking
+    every ``sys.path`` entry for each distribution.
+    As with the import system the first entry of a name on ``sys.path`` wins and
+    ``.egg-link`` files take precedence over ``__editable__`` ``.pth`` files.
+    Changing the content of an existing file doesn't change the modification time
+    of the directory, those changes are only picked up after the entry changed.
+
+    Returns
+    -------
+    EditableIndex
+        Mapping of normalized distribution names to the lines of their ``.egg-link``
+        file, or a single line with the source path for ``.pth`` based installations.
+
+    See Also
+    --------
+    verbose_version_info.resource_finders.egg_link_lines
+    """
+    global _EDITABLE_INDEX
+    state = tuple((path_item, _path_entry_mtime(path_item)) for path_item in sys.path)
+    with _EDITABLE_INDEX_LOCK:
+        if state == _EDITABLE_INDEX[0]:
+            return _EDITABLE_INDEX[1]
+        egg_links: EditableIndex = {}
+        editable_pths: EditableIndex = {}
+        for path_item, mtime in state:
+            listing = _PATH_ENTRY_EDITABLES.get(path_item)
+            if listing is None or listing[0] != mtime or mtime is None:
+                listing = (mtime, *_list_path_entry_editables(path_item))
+                _PATH_ENTRY_EDITABLES[path_item] = listing
+            for name, lines in listing[1].items():
+                egg_links.setdefault(name, lines)
+            for name, lines in listing[2].items():
+                editable_pths.setdefault(name, lines)
+        index = {**editable_pths, **egg_links}
+        _EDITABLE_INDEX = (state, index)
+        return index
+
+
+@traced("dist_files")
 def dist_files(
-    distribution_name: str,
+    distribution_name: str, *, dist: Optional[Distribution] = None
 ) -> List[PackagePath]:
     """List of PackagePaths even if the package is broken.
 
@@ -143,16 +545,364 @@ def dist_files(
     ----------
     distribution_name : str
         The name of the package as a string.
+    dist : Optional[Distribution]
+        Already looked up distribution of the package, by default None
 
     Returns
     -------
     List[PackagePath]
         Paths of files used by the package.
     """
-    dist_files = distribution(distribution_name).files
+    if dist is None:
+        dist = distribution(distribution_name)
+    dist_files = dist.files
     return dist_files if dist_files is not None else []
 
 
+def metadata_dir(dist: Distribution) -> Optional[Path]:
+    """Metadata directory (``*.dist-info`` or ``*.egg-info``) of a distribution on disk.
+
+    Parameters
+    ----------
+    dist : Distribution
+        Distribution of the package.
+
+    Returns
+    -------
+    Optional[Path]
+        Path of the metadata directory, None if the distribution isn't
+        a :class:`PathDistribution` of a directory (e.g. a zip file).
+    """
+    if not isinstance(dist, PathDistribution):
+        return None
+    path = getattr(dist, "_path", None)
+    if isinstance(path, Path) and path.suffix in (".dist-info", ".egg-info"):
+        return path
+    return None
+
+
+def _record_rows(dist: Distribution) -> Optional[Iterator[List[str]]]:
+    """Rows of the RECORD file of a distribution, which are read lazily.
+
+    Parameters
+    ----------
+    dist : Distribution
+        Distribution of the package.
+
+    Returns
+    -------
+    Optional[Iterator[List[str]]]
+        CSV rows of RECORD or None if the distribution has no RECORD.
+    """
+    dist_metadata_dir = metadata_dir(dist)
+    if dist_metadata_dir is not None:
+        record_path = dist_metadata_dir / "RECORD"
+        if not record_path.is_file():
+            return None
+        return _read_csv_rows(record_path)
+    record_text = dist.read_text("RECORD")
+    if record_text is None:
+        return None
+    return csv.reader(io.StringIO(record_text))
+
+
+def _read_csv_rows(path: Path) -> Iterator[List[str]]:
+    """Read the rows of a CSV file one at a time.
+
+    Parameters
+    ----------
+    path : Path
+        Path of the CSV file.
+
+    Yields
+    ------
+    List[str]
+        Row of the CSV file.
+    """
+    try:
+        with open(path, newline="", encoding="utf8") as f:
+            yield from csv.reader(f)
+    except OSError:
+        return
+
+
+def iter_dist_files(
+    distribution_name: str, *, dist: Optional[Distribution] = None
+) -> Iterator[PackagePath]:
+    """Lazily iterate over the files of a distribution.
+
+    Other than :func:`dist_files`, RECORD is parsed one line at a time,
+    so finding a single file doesn't create objects for all files of big distributions.
+    Distributions without RECORD (e.g. ``*.egg-info``) fall back to :func:`dist_files`.
+
+    Parameters
+    ----------
+    distribution_name : str
+        The name of the package as a string.
+    dist : Optional[Distribution]
+        Already looked up distribution of the package, by default None
+
+    Yields
+    ------
+    PackagePath
+        Paths of files used by the package.
+
+    See Also
+    --------
+    dist_files
+    """
+    if dist is None:
+        dist = distribution(distribution_name)
+    record_rows = _record_rows(dist)
+    if record_rows is None:
+        yield from dist_files(distribution_name, dist=dist)
+        return
+    for row in record_rows:
+        if not row:
+            continue
+        # same as importlib.metadata.Distribution.files
+        name, file_hash, size = (row + ["", ""])[:3]
+        package_path = PackagePath(name)
+        package_path.hash = FileHash(file_hash) if file_hash else None
+        package_path.size = int(size) if size else None
+        package_path.dist = dist
+        yield package_path
+
+
+METADATA_FILE_NAMES = ("METADATA", "PKG-INFO")
+
+
+def read_metadata_headers(
+    metadata_dir: Path, header_names: Iterable[str] = ("Name", "Version")
+) -> Optional[Dict[str, str]]:
+    """Read headers of the core metadata file without parsing the whole file.
+
+    The long description (e.g. an embedded README) follows the headers after
+    the first blank line, so the file is only read until all requested headers
+    were found or the headers ended.
+    If the headers look unusual (folded or encoded values, missing headers),
+    None is returned so the caller can fall back to the full ``email`` parser
+    used by :attr:`importlib.metadata.Distribution.metadata`.
+
+    Parameters
+    ----------
+    metadata_dir : Path
+        Metadata directory (``*.dist-info`` or ``*.egg-info``) of a distribution.
+    header_names : Iterable[str]
+        Names of the headers to read, by default ("Name", "Version")
+
+    Returns
+    -------
+    Optional[Dict[str, str]]
+        Lower cased header names mapped to their values.
+    """
+    wanted_headers = {header_name.lower() for header_name in header_names}
+    for file_name in METADATA_FILE_NAMES:
+        headers: Dict[str, str] = {}
+        previous_header = ""
+        try:
+            # binary mode so only the header lines are decoded
+            with open(metadata_dir / file_name, "rb") as f:
+                for raw_line in f:
+                    line = raw_line.decode("utf8").rstrip("\r\n")
+                    if line == "":
+                        break
+                    if line[0] in " \t":
+                        # continuation line of a folded header
+                        if previous_header in wanted_headers:
+                            return None
+                        continue
+                    if len(headers) == len(wanted_headers):
+                        # the last found header isn't folded
+                        break
+                    header_name, separator, value = line.partition(":")
+                    if separator == "":
+                        return None
+                    previous_header = header_name.strip().lower()
+                    if previous_header in wanted_headers and previous_header not in headers:
+                        headers[previous_header] = value.strip()
+        except FileNotFoundError:
+            continue
+        except (OSError, UnicodeDecodeError):
+            return None
+        if len(headers) != len(wanted_headers) or any("=?" in value for value in headers.values()):
+            return None
+        return headers
+    return None
+
+
+class ResolutionContext:
+    """Data of a distribution shared by all steps resolving its verbose version information.
+
+    Each value is read from disk the first time it is needed and reused afterwards,
+    so e.g. ``METADATA`` is only parsed once per :func:`verbose_version_info.vv_info` call.
+
+    Parameters
+    ----------
+    distribution_name : str
+        The name of the distribution package as a string.
+    dist : Optional[Distribution]
+        Already looked up distribution of the package, by default None
+    editable_index : Optional[EditableIndex]
+        Already built :func:`editable_index`, so bulk lookups share it, by default None
+    """
+
+    def __init__(
+        self,
+        distribution_name: str,
+        dist: Optional[Distribution] = None,
+        editable_index: Optional[EditableIndex] = None,
+    ):
+        self.distribution_name = distribution_name
+        self.dist = dist if dist is not None else distribution(distribution_name)
+        # prefill the cached_properties
+        if editable_index is not None:
+            self.__dict__["editable_index"] = editable_index
+
+    @classmethod
+    def from_scanned(
+        cls,
+        distribution_name: str,
+        scanned: ScannedDistribution,
+        editable_index: Optional[EditableIndex] = None,
+    ) -> "ResolutionContext":
+        """Create the context of a distribution found by :func:`scan_distributions`.
+
+        Parameters
+        ----------
+        distribution_name : str
+            The name of the distribution package as a string.
+        scanned : ScannedDistribution
+            Distribution found by :func:`scan_distributions`.
+        editable_index : Optional[EditableIndex]
+            Already built :func:`editable_index`, by default None
+
+        Returns
+        -------
+        ResolutionContext
+            Context reusing the distribution found by the scan.
+        """
+        return cls(
+            distribution_name,
+            scanned.distribution,
+            editable_index=editable_index,
+        )
+
+    @cached_property
+    def metadata(self) -> Optional[Any]:
+        """Parsed ``METADATA`` (or ``PKG-INFO``) of the distribution.
+
+        Returns
+        -------
+        Optional[Any]
+            Metadata message or None if the distribution wasn't found.
+        """
+        if isinstance(self.dist, NotFoundDistribution):
+            return None
+        return self.dist.metadata
+
+    @cached_property
+    def name(self) -> str:
+        """Name of the distribution as written in its metadata.
+
+        Returns
+        -------
+        str
+            Name or empty string if it isn't known.
+        """
+        if self.metadata_headers is not None:
+            return self.metadata_headers["name"]
+        if self.metadata is None:
+            return ""
+        return self.metadata.get("Name", "") or ""
+
+    @cached_property
+    def version(self) -> str:
+        """Release version of the distribution.
+
+        Returns
+        -------
+        str
+            Version string, ``SETTINGS["not_found_version_str"]`` if it wasn't found.
+        """
+        if self.metadata_headers is not None:
+            return self.metadata_headers["version"]
+        if self.metadata is None:
+            return self.dist.version
+        return self.metadata["Version"]
+
+    @cached_property
+    def metadata_headers(self) -> Optional[Dict[str, str]]:
+        """``Name`` and ``Version`` read by the fast path of :func:`read_metadata_headers`.
+
+        Returns
+        -------
+        Optional[Dict[str, str]]
+            Lower cased header names mapped to their values or None if the full
+            :attr:`metadata` needs to be parsed.
+        """
+        if self.metadata_dir is None:
+            return None
+        return read_metadata_headers(self.metadata_dir)
+
+    @cached_property
+    def metadata_dir(self) -> Optional[Path]:
+        """Metadata directory of the distribution on disk.
+
+        Returns
+        -------
+        Optional[Path]
+            Path of the metadata directory if it exists.
+
+        See Also
+        --------
+        verbose_version_info.utils.metadata_dir
+        """
+        return metadata_dir(self.dist)
+
+    @cached_property
+    def editable_index(self) -> EditableIndex:
+        """Index of the editable installations on ``sys.path``.
+
+        Returns
+        -------
+        EditableIndex
+            Result of :func:`editable_index`.
+        """
+        return editable_index()
+
+    @cached_property
+    def direct_url(self) -> Optional[Dict[str, Any]]:
+        """Parsed ``direct_url.json`` (PEP 610) of the distribution.
+
+        Returns
+        -------
+        Optional[Dict[str, Any]]
+            Content of ``direct_url.json`` or None if the distribution wasn't
+            installed from an url or local directory.
+        """
+        direct_url = self.dist.read_text("direct_url.json")
+        if direct_url is None:
+            return None
+        import json
+
+        return json.loads(direct_url)
+
+    @cached_property
+    def editable(self) -> bool:
+        """Whether ``direct_url.json`` marks the distribution as editable installed (PEP 660).
+
+        Returns
+        -------
+        bool
+            True if ``dir_info.editable`` is set in ``direct_url.json``.
+        """
+        if self.direct_url is None:
+            return False
+        dir_info = self.direct_url.get("dir_info")
+        return isinstance(dir_info, dict) and dir_info.get("editable") is True
+
+
 def _datetime_now() -> datetime:
     """Wrap ``datetime.now`` to easily mock it for testing.
 
@@ -162,3 +912,155 @@ def _datetime_now() -> datetime:
         Current datetime.
     """
     return datetime.now()
+
+
+_DEFERRED_WARNINGS = threading.local()
+
+
+@contextmanager
+def deferred_warnings() -> Iterator[List[Warning]]:
+    """Collect warnings passed to :func:`emit_warning` in the current thread.
+
+    This is used to emit warnings of concurrently resolved distributions in a
+    deterministic order, since ``warnings.catch_warnings`` isn't thread-safe.
+
+    Yields
+    ------
+    List[Warning]
+        Warnings which were collected instead of being emitted.
+
+    See Also
+    --------
+    emit_warning
+    """
+    previous_buffer = getattr(_DEFERRED_WARNINGS, "buffer", None)
+    _DEFERRED_WARNINGS.buffer = []
+    try:
+        yield _DEFERRED_WARNINGS.buffer
+    finally:
+        _DEFERRED_WARNINGS.buffer = previous_buffer
+
+
+def emit_warning(warning: Warning) -> None:
+    """Emit a warning or collect it if called inside of :func:`deferred_warnings`.
+
+    Parameters
+    ----------
+    warning : Warning
+        Warning to emit.
+
+    See Also
+    --------
+    deferred_warnings
+    """
+    buffer = getattr(_DEFERRED_WARNINGS, "buffer", None)
+    if buffer is not None:
+        buffer.append(warning)
+    else:
+        warn(warning, stacklevel=2)
+
+
+RESOLUTION_STAGES = ("url", "vcs", "dirty")
+"""Stages of the resolution which can be skipped if the time budget runs out."""
+
+
+class DeadlineExceeded(Exception):
+    """Raised by a resolution stage if the time budget of :func:`time_budget` ran out."""
+
+    pass
+
+
+_DEADLINE: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+@contextmanager
+def time_budget(seconds: Optional[float]) -> Iterator[None]:
+    """Limit the time all resolution stages in the current context can take.
+
+    Nested budgets can't extend the budget of the outer one.
+
+    Parameters
+    ----------
+    seconds : Optional[float]
+        Time budget in seconds, None doesn't limit the time.
+
+    Yields
+    ------
+    None
+        Nothing, the deadline is active until the context is left.
+
+    See Also
+    --------
+    deadline_timeout
+    """
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    outer_deadline = _DEADLINE.get()
+    if outer_deadline is not None:
+        deadline = min(deadline, outer_deadline)
+    token = _DEADLINE.set(deadline)
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(token)
+
+
+def deadline_timeout() -> Optional[float]:
+    """Seconds left of the active :func:`time_budget`, used as timeout of subprocesses.
+
+    Returns
+    -------
+    Optional[float]
+        Remaining seconds or None if there is no active time budget.
+
+    Raises
+    ------
+    DeadlineExceeded
+        If the time budget already ran out.
+    """
+    deadline = _DEADLINE.get()
+    if deadline is None:
+        return None
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded()
+    return remaining
+
+
+_SKIPPED_STAGES = threading.local()
+
+
+@contextmanager
+def collect_skipped_stages() -> Iterator[List[str]]:
+    """Collect the stages passed to :func:`skip_stage` in the current thread.
+
+    Yields
+    ------
+    List[str]
+        Names of the skipped stages, see :data:`RESOLUTION_STAGES`.
+    """
+    previous_stages = getattr(_SKIPPED_STAGES, "stages", None)
+    _SKIPPED_STAGES.stages = []
+    try:
+        yield _SKIPPED_STAGES.stages
+    finally:
+        _SKIPPED_STAGES.stages = previous_stages
+
+
+def skip_stage(stage: str) -> None:
+    """Record that a resolution stage was skipped because the time budget ran out.
+
+    Parameters
+    ----------
+    stage : str
+        Name of the stage, see :data:`RESOLUTION_STAGES`.
+
+    See Also
+    --------
+    collect_skipped_stages
+    """
+    stages = getattr(_SKIPPED_STAGES, "stages", None)
+    if stages is not None and stage not in stages:
+        stages.append(stage)
@@ -1,21 +1,56 @@
 """Module containing code for version control system retrieval."""
-import subprocess
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 from typing import Callable
+from typing import Dict
+from typing import FrozenSet
+from typing import Hashable
+from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Optional
 from typing import Tuple
+from typing import TypeVar
 from typing import Union
-from warnings import warn
 
 from verbose_version_info.data_containers import VcsInfo
+from verbose_version_info.git_batch import batch_last_commit_before
+from verbose_version_info.git_repository import find_git_dir
+from verbose_version_info.git_repository import last_commit_before
+from verbose_version_info.git_repository import resolve_ref
 from verbose_version_info.settings import VCS_SETTINGS
+from verbose_version_info.tracing import command_name
+from verbose_version_info.tracing import traced
+from verbose_version_info.tracing import traced_stage
+from verbose_version_info.utils import DeadlineExceeded
+from verbose_version_info.utils import deadline_timeout
+from verbose_version_info.utils import emit_warning
+from verbose_version_info.utils import skip_stage
 
 VcsCommitIdReader = Callable[[Path, datetime], Optional[VcsInfo]]
 
 VCS_COMMIT_ID_READERS: List[VcsCommitIdReader] = []
 
+GIT_CHECK_DIRTY_COMMAND = ("git", "status", "-s")
+GIT_CHECK_DIRTY_TRACKED_COMMAND = ("git", "diff-index", "--quiet", "HEAD")
+
+DIRTY_CHECK_STRATEGIES = ("off", "tracked-only", "full")
+"""Values of ``VCS_SETTINGS["dirty_check"]``."""
+
+KNOWN_VCS_MARKERS = (".git", ".hg", ".svn", "_darcs", ".bzr", ".fslckout")
+"""Names of the files or directories marking the root of a vcs checkout."""
+
+VCS_READER_MARKERS: Dict[Callable[..., object], str] = {}
+"""Markers of the commit_id readers which only apply to checkouts containing them."""
+
+T = TypeVar("T")
+ReaderT = TypeVar("ReaderT", bound=Callable[..., object])
+
 
 class UncommittedChangesWarning(UserWarning):
     """Warning thrown if a director under source control has uncommitted changes."""
@@ -45,6 +80,790 @@ def add_vcs_commit_id_reader(func: VcsCommitIdReader) -> VcsCommitIdReader:
     return func
 
 
+def vcs_marker(marker: str) -> Callable[[ReaderT], ReaderT]:
+    """Declare the marker a vcs commit_id reader applies to.
+
+    Readers with a marker are only run for local installations containing it,
+    readers without a marker are run for all local installations.
+
+    Parameters
+    ----------
+    marker : str
+        Name of the file or directory marking the root of a checkout, e.g. ``".git"``.
+
+    Returns
+    -------
+    Callable[[ReaderT], ReaderT]
+        Decorator registering the marker of a (sync or async) reader.
+
+    Examples
+    --------
+    >>> @add_vcs_commit_id_reader
+    ... @vcs_marker(".hg")
+    ... def hg_commit_id(local_install_basepath: Path, dist_mtime: datetime):
+    ...     ...
+    """
+
+    def register_marker(func: ReaderT) -> ReaderT:
+        """Register the marker of a reader.
+
+        Parameters
+        ----------
+        func : ReaderT
+            Reader to register the marker for.
+
+        Returns
+        -------
+        ReaderT
+            Originally registered function.
+        """
+        VCS_READER_MARKERS[func] = marker
+        # cached scans only contain the markers known at scan time
+        if marker not in KNOWN_VCS_MARKERS:
+            clear_vcs_root_cache()
+        return func
+
+    return register_marker
+
+
+_VCS_MARKERS: Dict[Path, Tuple[Optional[int], FrozenSet[str]]] = {}
+_VCS_MARKERS_LOCK = threading.Lock()
+
+
+def _directory_mtime(directory: Path) -> Optional[int]:
+    """Modification time of a directory, which changes when an entry is added or removed.
+
+    Parameters
+    ----------
+    directory : Path
+        Directory to stat.
+
+    Returns
+    -------
+    Optional[int]
+        Modification time in nanoseconds or None if the directory can't be stat'ed.
+    """
+    try:
+        return os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+
+
+def vcs_markers(directory: Path) -> FrozenSet[str]:
+    """Vcs markers contained in a directory, listed by a single ``os.scandir``.
+
+    The result is cached per directory and revalidated by the modification time of the
+    directory, so creating or removing a marker (e.g. ``git init``) is picked up.
+    At most ``VCS_SETTINGS["marker_cache_max_entries"]`` directories are cached,
+    the least recently scanned are evicted first.
+
+    Parameters
+    ----------
+    directory : Path
+        Directory to look for markers in.
+
+    Returns
+    -------
+    FrozenSet[str]
+        Names of the :data:`KNOWN_VCS_MARKERS` and registered markers in ``directory``.
+
+    See Also
+    --------
+    vcs_marker
+    clear_vcs_root_cache
+    """
+    mtime = _directory_mtime(directory)
+    entry = _VCS_MARKERS.get(directory)
+    if entry is not None and entry[0] == mtime:
+        return entry[1]
+    marker_names = set(KNOWN_VCS_MARKERS).union(VCS_READER_MARKERS.values())
+    try:
+        with os.scandir(directory) as entries:
+            markers = frozenset(entry.name for entry in entries if entry.name in marker_names)
+    except OSError:
+        markers = frozenset()
+    max_entries = int(VCS_SETTINGS["marker_cache_max_entries"])  # type: ignore[call-overload]
+    with _VCS_MARKERS_LOCK:
+        _VCS_MARKERS.pop(directory, None)
+        _VCS_MARKERS[directory] = (mtime, markers)
+        while len(_VCS_MARKERS) > max(max_entries, 0):
+            del _VCS_MARKERS[next(iter(_VCS_MARKERS))]
+    return markers
+
+
+_VCS_ROOTS: Dict[Path, Tuple[Optional[Path], Optional[int]]] = {}
+_VCS_ROOTS_ENV: Tuple[Optional[str], Optional[str]] = (None, None)
+
+
+def clear_vcs_root_cache() -> None:
+    """Forget the cached markers and repository roots, e.g. after running ``git init``."""
+    with _VCS_MARKERS_LOCK:
+        _VCS_MARKERS.clear()
+        _VCS_ROOTS.clear()
+
+
+def _ceiling_directories(ceiling_directories: Optional[str]) -> FrozenSet[Path]:
+    """Parse the value of ``GIT_CEILING_DIRECTORIES``.
+
+    Parameters
+    ----------
+    ceiling_directories : Optional[str]
+        Value of the environment variable.
+
+    Returns
+    -------
+    FrozenSet[Path]
+        Resolved absolute paths of the ceiling directories.
+    """
+    if not ceiling_directories:
+        return frozenset()
+    return frozenset(
+        Path(directory).resolve()
+        for directory in ceiling_directories.split(os.pathsep)
+        if os.path.isabs(directory)
+    )
+
+
+def _device(directory: Path) -> Optional[int]:
+    """Device of a directory, used to detect filesystem boundaries.
+
+    Parameters
+    ----------
+    directory : Path
+        Resolved directory.
+
+    Returns
+    -------
+    Optional[int]
+        Device id or None if the directory can't be stat'ed.
+    """
+    try:
+        # the path is resolved, so lstat doesn't miss a symlinked directory
+        return os.lstat(directory).st_dev
+    except OSError:
+        return None
+
+
+@traced("vcs_root")
+def find_vcs_root(local_install_basepath: Path) -> Optional[Path]:
+    """Closest directory containing a vcs marker, starting at the base path and going up.
+
+    Same as ``git`` the search doesn't go up into a directory listed in
+    ``GIT_CEILING_DIRECTORIES`` and doesn't cross filesystem boundaries unless
+    ``GIT_DISCOVERY_ACROSS_FILESYSTEM`` is set.
+    Every visited directory is memoized with the found root and its device,
+    so looking up the same directory again doesn't touch the filesystem and
+    installations from the same repository (e.g. subpackages of a monorepo)
+    stop at the first already visited directory.
+
+    Parameters
+    ----------
+    local_install_basepath : Path
+        Basepath of the local installation.
+
+    Returns
+    -------
+    Optional[Path]
+        Resolved repository root or None if no marker was found.
+
+    See Also
+    --------
+    vcs_markers
+    clear_vcs_root_cache
+    """
+    global _VCS_ROOTS_ENV
+    environment = (
+        os.environ.get("GIT_CEILING_DIRECTORIES"),
+        os.environ.get("GIT_DISCOVERY_ACROSS_FILESYSTEM"),
+    )
+    if environment != _VCS_ROOTS_ENV:
+        # the memo is only valid for the boundaries it was created with
+        with _VCS_MARKERS_LOCK:
+            _VCS_ROOTS.clear()
+            _VCS_ROOTS_ENV = environment
+    try:
+        directory = local_install_basepath.resolve()
+    except OSError:
+        return None
+    memo = _VCS_ROOTS.get(directory)
+    if memo is not None:
+        return memo[0]
+    ceilings = _ceiling_directories(environment[0])
+    across_filesystems = environment[1] in ("1", "true", "yes", "on")
+    device = None if across_filesystems else _device(directory)
+    visited: List[Path] = []
+    root: Optional[Path] = None
+    while True:
+        visited.append(directory)
+        if vcs_markers(directory):
+            root = directory
+            break
+        parent = directory.parent
+        if parent == directory or parent in ceilings:
+            break
+        parent_memo = _VCS_ROOTS.get(parent)
+        if not across_filesystems:
+            parent_device = _device(parent) if parent_memo is None else parent_memo[1]
+            if parent_device != device:
+                break
+        if parent_memo is not None:
+            root = parent_memo[0]
+            break
+        directory = parent
+    with _VCS_MARKERS_LOCK:
+        for visited_directory in visited:
+            _VCS_ROOTS[visited_directory] = (root, device)
+    return root
+
+
+def matching_vcs_readers(readers: Iterable[ReaderT], directory: Path) -> List[ReaderT]:
+    """Readers which apply to a directory, based on the markers it contains.
+
+    Parameters
+    ----------
+    readers : Iterable[ReaderT]
+        Registered (sync or async) vcs commit_id readers.
+    directory : Path
+        Root of the checkout of a local installation.
+
+    Returns
+    -------
+    List[ReaderT]
+        Readers without a marker and readers which marker is in ``directory``,
+        in the order of ``readers``.
+    """
+    markers = vcs_markers(directory)
+    return [
+        reader
+        for reader in readers
+        if VCS_READER_MARKERS.get(reader) is None or VCS_READER_MARKERS[reader] in markers
+    ]
+
+
+class VcsSession:
+    """Memo of vcs results shared by the lookups of multiple distributions.
+
+    Distributions installed from the same repository (e.g. a monorepo) share the
+    commit id lookups for the same ``HEAD`` and date bound and a single dirty check,
+    so the vcs commands run once per repository instead of once per distribution.
+    The memo is thread-safe, a value is only computed once even if it is requested
+    by multiple threads at the same time.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._results: Dict[Hashable, object] = {}
+
+    def memoized(self, key: Hashable, compute: Callable[[], T]) -> T:
+        """Result of ``compute`` which is only called for the first request of ``key``.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key of the memoized value.
+        compute : Callable[[], T]
+            Function computing the value.
+
+        Returns
+        -------
+        T
+            Memoized value.
+        """
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key not in self._results:
+                self._results[key] = compute()
+            return self._results[key]  # type: ignore[return-value]
+
+    def get(self, key: Hashable) -> Optional[object]:
+        """Already memoized value of ``key``.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key of the memoized value.
+
+        Returns
+        -------
+        Optional[object]
+            Memoized value or None if it wasn't computed yet.
+        """
+        return self._results.get(key)
+
+    def set(self, key: Hashable, value: object) -> None:
+        """Memoize a value computed outside of :meth:`memoized` (e.g. asynchronously).
+
+        Parameters
+        ----------
+        key : Hashable
+            Key of the memoized value.
+        value : object
+            Value to memoize.
+        """
+        with self._lock:
+            self._results.setdefault(key, value)
+
+
+_VCS_SESSION: ContextVar[Optional[VcsSession]] = ContextVar("vcs_session", default=None)
+
+
+@contextmanager
+def vcs_session() -> Iterator[VcsSession]:
+    """Activate a :class:`VcsSession` for the current context.
+
+    If a session is already active, it is reused so nested calls share it.
+
+    Yields
+    ------
+    VcsSession
+        Active session.
+    """
+    session = _VCS_SESSION.get()
+    if session is not None:
+        yield session
+        return
+    session = VcsSession()
+    token = _VCS_SESSION.set(session)
+    try:
+        yield session
+    finally:
+        _VCS_SESSION.reset(token)
+
+
+def active_vcs_session() -> Optional[VcsSession]:
+    """Session activated by :func:`vcs_session` in the current context.
+
+    Returns
+    -------
+    Optional[VcsSession]
+        Active session or None.
+    """
+    return _VCS_SESSION.get()
+
+
+def vcs_root(local_install_basepath: Path) -> Path:
+    """Root of the repository a local installation belongs to.
+
+    Parameters
+    ----------
+    local_install_basepath : Path
+        Basepath of the local installation.
+
+    Returns
+    -------
+    Path
+        Repository root found by :func:`find_vcs_root` or the resolved base path
+        if it isn't in a repository.
+        The path is resolved, so the same checkout reached via different paths
+        (e.g. symlinks) is only looked up once.
+    """
+    repo_root = find_vcs_root(local_install_basepath)
+    if repo_root is not None:
+        return repo_root
+    try:
+        return local_install_basepath.resolve()
+    except OSError:
+        return local_install_basepath
+
+
+def _git_head_commit_id(local_install_basepath: Path) -> Optional[str]:
+    """Id of the commit ``HEAD`` points to, read from the ``.git`` directory.
+
+    Parameters
+    ----------
+    local_install_basepath : Path
+        Basepath of the local installation.
+
+    Returns
+    -------
+    Optional[str]
+        Commit id or None if it couldn't be read.
+    """
+    git_dir = find_git_dir(local_install_basepath)
+    if git_dir is None:
+        return None
+    return resolve_ref(git_dir, "HEAD")
+
+
+def git_head_commit_id(local_install_basepath: Path) -> Optional[str]:
+    """Id of the commit ``HEAD`` points to, which is only read once in a :func:`vcs_session`.
+
+    Parameters
+    ----------
+    local_install_basepath : Path
+        Basepath of the local installation.
+
+    Returns
+    -------
+    Optional[str]
+        Commit id or None if it couldn't be read without running ``git``.
+    """
+    session = active_vcs_session()
+    if session is None:
+        return _git_head_commit_id(local_install_basepath)
+    return session.memoized(
+        ("git_head", vcs_root(local_install_basepath)),
+        partial(_git_head_commit_id, local_install_basepath),
+    )
+
+
+def vcs_lookup_key(repo_root: Path, dist_mtime: datetime) -> Tuple[str, Path, str, int]:
+    """Key of a commit id lookup, which is the same for all distributions it applies to.
+
+    Parameters
+    ----------
+    repo_root : Path
+        Repository root as returned by :func:`vcs_root`.
+    dist_mtime: datetime
+        Time the packaged distribution was modified.
+
+    Returns
+    -------
+    Tuple[str, Path, str, int]
+        ``("commit_id", repo_root, head_commit_id, date_bound)``, ``head_commit_id`` is
+        empty if it can't be read without running the vcs.
+    """
+    # 'git log --before' only has a resolution of seconds
+    date_bound = int(dist_mtime.replace(microsecond=0).timestamp())
+    return ("commit_id", repo_root, git_head_commit_id(repo_root) or "", date_bound)
+
+
+def dirty_state(repo_root: Path) -> Optional[bool]:
+    """Whether the checkout had uncommitted changes when it was checked in the active session.
+
+    Parameters
+    ----------
+    repo_root : Path
+        Repository root as returned by :func:`vcs_root`.
+
+    Returns
+    -------
+    Optional[bool]
+        None if there isn't an active session or the checkout wasn't checked.
+    """
+    session = active_vcs_session()
+    if session is None:
+        return None
+    return session.get(("dirty", vcs_root(repo_root)))  # type: ignore[return-value]
+
+
+def git_check_dirty_command() -> Optional[Tuple[str, ...]]:
+    """Git command of the dirty check strategy set by ``VCS_SETTINGS["dirty_check"]``.
+
+    ``"full"`` runs ``git status`` which also reports untracked files,
+    ``"tracked-only"`` runs ``git diff-index`` which only compares the tracked files
+    to ``HEAD`` and stops at the first difference, ``"off"`` disables the check.
+
+    Returns
+    -------
+    Optional[Tuple[str, ...]]
+        Command to be run inside of the repository, None if the check is disabled.
+
+    Raises
+    ------
+    ValueError
+        If the strategy isn't one of :data:`DIRTY_CHECK_STRATEGIES`.
+    """
+    strategy = VCS_SETTINGS["dirty_check"]
+    if strategy == "off":
+        return None
+    if strategy == "tracked-only":
+        return GIT_CHECK_DIRTY_TRACKED_COMMAND
+    if strategy == "full":
+        return GIT_CHECK_DIRTY_COMMAND
+    raise ValueError(
+        f"Unknown dirty check strategy {strategy!r}, use one of {DIRTY_CHECK_STRATEGIES}."
+    )
+
+
+def dirty_check_env() -> Dict[str, str]:
+    """Environment of the dirty check commands.
+
+    Returns
+    -------
+    Dict[str, str]
+        Environment with ``GIT_OPTIONAL_LOCKS=0``, so ``git`` doesn't take the index lock
+        (e.g. to refresh the index) which would contend with other ``git`` processes.
+    """
+    return {**os.environ, "GIT_OPTIONAL_LOCKS": "0"}
+
+
+def parse_dirty_check(returncode: int, output: str) -> Optional[bool]:
+    """Interpret the result of a dirty check command.
+
+    Parameters
+    ----------
+    returncode : int
+        Returncode of the command.
+    output : str
+        Stdout of the command.
+
+    Returns
+    -------
+    Optional[bool]
+        True if the command exited with ``1`` (e.g. ``git diff-index --quiet``)
+        or printed changes (e.g. ``git status -s``), None if the command failed.
+    """
+    if returncode not in (0, 1):
+        return None
+    return returncode == 1 or output.rstrip() != ""
+
+
+_DIRTY_RESULTS: Dict[Tuple[Path, Tuple[str, ...]], Tuple[float, bool]] = {}
+_DIRTY_RESULTS_LOCK = threading.Lock()
+
+
+def git_index_mtime(
+    local_install_basepath: Path, check_dirty_command: Union[List[str], Tuple[str, ...]]
+) -> Optional[float]:
+    """Modification time of the ``.git/index`` file the result of a dirty check is bound to.
+
+    Parameters
+    ----------
+    local_install_basepath : Path
+        Basepath of the local installation.
+    check_dirty_command : Union[List[str], Tuple[str, ...]]
+        Command to be run for checking if a directory contains uncommitted changes.
+
+    Returns
+    -------
+    Optional[float]
+        Modification time or None if ``check_dirty_command`` doesn't run ``git``
+        or the index couldn't be found.
+    """
+    if check_dirty_command[0] != "git":
+        return None
+    git_dir = find_git_dir(local_install_basepath)
+    if git_dir is None:
+        return None
+    try:
+        return os.stat(git_dir / "index").st_mtime
+    except OSError:
+        return None
+
+
+def memoized_dirty_result(
+    local_install_basepath: Path,
+    check_dirty_command: Union[List[str], Tuple[str, ...]],
+    index_mtime: Optional[float],
+) -> Optional[bool]:
+    """Result of a previous dirty check if the index didn't change since.
+
+    Known limitation: changes to tracked files which weren't staged and didn't
+    change the index (e.g. by running ``git``) are only noticed in a new process.
+
+    Parameters
+    ----------
+    local_install_basepath : Path
+        Basepath of the local installation.
+    check_dirty_command : Union[List[str], Tuple[str, ...]]
+        Command to be run for checking if a directory contains uncommitted changes.
+    index_mtime : Optional[float]
+        Result of :func:`git_index_mtime` read before running the check.
+
+    Returns
+    -------
+    Optional[bool]
+        Memoized result or None if there is no valid one.
+    """
+    if index_mtime is None:
+        return None
+    memo = _DIRTY_RESULTS.get((vcs_root(local_install_basepath), tuple(check_dirty_command)))
+    if memo is None or memo[0] != index_mtime:
+        return None
+    return memo[1]
+
+
+def memoize_dirty_result(
+    local_install_basepath: Path,
+    check_dirty_command: Union[List[str], Tuple[str, ...]],
+    index_mtime: Optional[float],
+    is_dirty: Optional[bool],
+) -> None:
+    """Memoize the result of a dirty check for the modification time of the index.
+
+    Parameters
+    ----------
+    local_install_basepath : Path
+        Basepath of the local installation.
+    check_dirty_command : Union[List[str], Tuple[str, ...]]
+        Command to be run for checking if a directory contains uncommitted changes.
+    index_mtime : Optional[float]
+        Result of :func:`git_index_mtime` read before running the check.
+    is_dirty : Optional[bool]
+        Result of the check.
+    """
+    if index_mtime is None or is_dirty is None:
+        return
+    key = (vcs_root(local_install_basepath), tuple(check_dirty_command))
+    with _DIRTY_RESULTS_LOCK:
+        _DIRTY_RESULTS[key] = (index_mtime, is_dirty)
+
+
+def uncommitted_changes_warning(local_install_basepath: Path) -> UncommittedChangesWarning:
+    """Create the :class:`UncommittedChangesWarning` of a local installation.
+
+    Parameters
+    ----------
+    local_install_basepath : Path
+        Basepath of the local installation.
+
+    Returns
+    -------
+    UncommittedChangesWarning
+        Warning about the uncommitted changes.
+    """
+    return UncommittedChangesWarning(
+        f"The package installed from source at {local_install_basepath!r}, "
+        " contains uncommitted changes."
+    )
+
+
+def warn_uncommitted_changes(local_install_basepath: Path) -> None:
+    """Emit an :class:`UncommittedChangesWarning` for a local installation.
+
+    Parameters
+    ----------
+    local_install_basepath : Path
+        Basepath of the local installation.
+    """
+    emit_warning(uncommitted_changes_warning(local_install_basepath))
+
+
+def emit_dirty_warning(repo_root: Path) -> None:
+    """Emit the warning of a checkout with uncommitted changes found in the active session.
+
+    Inside of a :func:`vcs_session`, :func:`check_dirty` only memoizes the warning,
+    so each distribution installed from the checkout emits it itself. All of them
+    emit the same warning object, which lets bulk lookups emit it only once,
+    in the place of the first of those distributions.
+
+    Parameters
+    ----------
+    repo_root : Path
+        Repository root as returned by :func:`vcs_root`.
+    """
+    session = active_vcs_session()
+    if session is None:
+        return
+    warning = session.get(("dirty_warning", vcs_root(repo_root)))
+    if warning is not None:
+        emit_warning(warning)  # type: ignore[arg-type]
+
+
+def _check_dirty(
+    local_install_basepath: Path, check_dirty_command: Union[List[str], Tuple[str, ...]]
+) -> Optional[bool]:
+    """Run the dirty check, the caller emits the warning.
+
+    Parameters
+    ----------
+    local_install_basepath : Path
+        Basepath of the local installation.
+    check_dirty_command : Union[List[str], Tuple[str, ...]]
+        Command to be run for checking if a directory contains uncommitted changes.
+
+    Returns
+    -------
+    Optional[bool]
+        Whether there are uncommitted changes, None if the vcs couldn't be run.
+
+    Raises
+    ------
+    DeadlineExceeded
+        If the time budget ran out before the check finished.
+
+    See Also
+    --------
+    memoized_dirty_result
+    """
+    index_mtime = git_index_mtime(local_install_basepath, check_dirty_command)
+    is_dirt = memoized_dirty_result(local_install_basepath, check_dirty_command, index_mtime)
+    if is_dirt is None:
+        import subprocess
+
+        try:
+            with traced_stage(
+                "subprocess", command_name(check_dirty_command), argv=check_dirty_command
+            ) as trace_details:
+                is_dirty_output = subprocess.run(
+                    check_dirty_command,
+                    cwd=local_install_basepath,
+                    stdout=subprocess.PIPE,
+                    env=dirty_check_env(),
+                    timeout=deadline_timeout(),
+                )
+                trace_details["returncode"] = is_dirty_output.returncode
+        except FileNotFoundError:
+            # vcs executable isn't installed
+            return None
+        except subprocess.TimeoutExpired as error:
+            raise DeadlineExceeded() from error
+        is_dirt = parse_dirty_check(is_dirty_output.returncode, is_dirty_output.stdout.decode())
+        memoize_dirty_result(local_install_basepath, check_dirty_command, index_mtime, is_dirt)
+    return is_dirt
+
+
+def check_dirty(
+    local_install_basepath: Path,
+    check_dirty_command: Optional[Union[List[str], Tuple[str, ...]]],
+) -> Optional[bool]:
+    """Warn if a local installation contains uncommitted changes and warnings are enabled.
+
+    Inside of a :func:`vcs_session` each checkout is only checked once and the
+    warning isn't emitted but memoized for :func:`emit_dirty_warning`.
+
+    Parameters
+    ----------
+    local_install_basepath : Path
+        Basepath of the local installation.
+    check_dirty_command : Optional[Union[List[str], Tuple[str, ...]]]
+        Command to be run for checking if a directory contains uncommitted changes,
+        None if the check is disabled.
+        E.g. for ``git``: :func:`git_check_dirty_command`
+
+    Returns
+    -------
+    Optional[bool]
+        Whether there are uncommitted changes, None if the check or warnings are disabled,
+        the vcs couldn't be run or the time budget ran out.
+
+    See Also
+    --------
+    warn_uncommitted_changes
+    emit_dirty_warning
+    dirty_state
+    verbose_version_info.utils.time_budget
+    """
+    if VCS_SETTINGS["warn_dirty"] is not True or check_dirty_command is None:
+        return None
+    session = active_vcs_session()
+    try:
+        if session is None:
+            is_dirty = _check_dirty(local_install_basepath, check_dirty_command)
+            if is_dirty:
+                warn_uncommitted_changes(local_install_basepath)
+            return is_dirty
+        repo_root = vcs_root(local_install_basepath)
+        # a timed out check isn't memoized, so it is marked as skipped for all distributions
+        is_dirty = session.memoized(
+            ("dirty", repo_root),
+            partial(_check_dirty, local_install_basepath, check_dirty_command),
+        )
+    except DeadlineExceeded:
+        skip_stage("dirty")
+        return None
+    if is_dirty:
+        # emitted by each distribution using the result, see emit_dirty_warning
+        session.memoized(
+            ("dirty_warning", repo_root),
+            partial(uncommitted_changes_warning, local_install_basepath),
+        )
+    return is_dirty
+
+
 def run_vcs_commit_id_command(
     *,
     vcs_name: str,
@@ -76,37 +895,143 @@ def run_vcs_commit_id_command(
     Optional[VcsInfo]
         (vcs_name, commit_id)
 
+    Raises
+    ------
+    DeadlineExceeded
+        If the time budget ran out before the command finished.
+
     See Also
     --------
     get_local_git_commit_id
     """  # noqa: E501
     if (local_install_basepath / need_to_exist_path_child).exists():
-        if check_dirty_command is not None and VCS_SETTINGS["warn_dirty"] is True:
-            is_dirty_output = subprocess.run(
-                check_dirty_command, cwd=local_install_basepath, stdout=subprocess.PIPE
-            )
-            is_dirt = is_dirty_output.stdout.decode().rstrip()
-            if is_dirt != "":
-                warn(
-                    UncommittedChangesWarning(
-                        f"The package installed from source at {local_install_basepath!r}, "
-                        " contains uncommitted changes."
-                    )
-                )
+        if check_dirty_command is not None:
+            check_dirty(local_install_basepath, check_dirty_command)
 
-        vcs_output = subprocess.run(
-            commit_id_command, cwd=local_install_basepath, stdout=subprocess.PIPE
-        )
+        import subprocess
+
+        try:
+            with traced_stage(
+                "subprocess", command_name(commit_id_command), argv=commit_id_command
+            ) as trace_details:
+                vcs_output = subprocess.run(
+                    commit_id_command,
+                    cwd=local_install_basepath,
+                    stdout=subprocess.PIPE,
+                    timeout=deadline_timeout(),
+                )
+                trace_details["returncode"] = vcs_output.returncode
+        except FileNotFoundError:
+            # vcs executable isn't installed
+            return None
+        except subprocess.TimeoutExpired as error:
+            raise DeadlineExceeded() from error
         commit_id = vcs_output.stdout.decode().rstrip()
         if vcs_output.returncode == 0 and commit_id != "":
             return VcsInfo(vcs_name=vcs_name, commit_id=commit_id)
     return None
 
 
+def git_commit_id_command(dist_mtime: datetime) -> Tuple[str, ...]:
+    """Git command returning the id of the last commit before ``dist_mtime``.
+
+    Parameters
+    ----------
+    dist_mtime: datetime
+        Time the packaged distribution was modified.
+
+    Returns
+    -------
+    Tuple[str, ...]
+        Command to be run inside of the repository.
+    """
+    date_string = dist_mtime.strftime("%Y-%m-%d %H:%M:%S")
+    return (
+        "git",
+        "log",
+        "--before",
+        f"'{date_string}'",
+        "-n",
+        "1",
+        "--pretty=format:%H",
+    )
+
+
+def git_dir_last_commit_id(local_install_basepath: Path, dist_mtime: datetime) -> Optional[str]:
+    """Id of the last commit before ``dist_mtime`` read from the ``.git`` directory.
+
+    Parameters
+    ----------
+    local_install_basepath : Path
+        Basepath of the local installation.
+    dist_mtime: datetime
+        Time the packaged distribution was modified.
+
+    Returns
+    -------
+    Optional[str]
+        Commit id or None if it couldn't be determined without running ``git``.
+
+    See Also
+    --------
+    git_dir_commit_id
+    verbose_version_info.git_repository.last_commit_before
+    """
+    head_commit_id = git_head_commit_id(local_install_basepath)
+    if head_commit_id is None:
+        return None
+    git_dir = find_git_dir(local_install_basepath)
+    if git_dir is None:
+        return None
+    # 'git log --before' only has a resolution of seconds
+    before_timestamp = dist_mtime.replace(microsecond=0).timestamp()
+    return last_commit_before(git_dir, head_commit_id, before_timestamp)
+
+
 @add_vcs_commit_id_reader
+@vcs_marker(".git")
+def git_dir_commit_id(local_install_basepath: Path, dist_mtime: datetime) -> Optional[VcsInfo]:
+    """Get git commit_id of locally installed package by reading the ``.git`` directory.
+
+    This doesn't need ``git`` to be installed, for editable installations only a few
+    small files are read and for others the commit-graph and pack indexes are used
+    to find the last commit before ``dist_mtime``.
+    If the repository can't be read (e.g. shallow clones or sha256 repositories)
+    ``None`` is returned, so :func:`local_git_commit_id` is used as fallback.
+
+    Parameters
+    ----------
+    local_install_basepath : Path
+        Basepath of the local installation.
+    dist_mtime: datetime
+        Time the packaged distribution was modified.
+
+    Returns
+    -------
+    Optional[VcsInfo]
+        (vcs_name, commit_id)
+
+    See Also
+    --------
+    local_git_commit_id
+    git_dir_last_commit_id
+    """
+    commit_id = git_dir_last_commit_id(local_install_basepath, dist_mtime)
+    if commit_id is None:
+        return None
+    check_dirty(local_install_basepath, git_check_dirty_command())
+    return VcsInfo(vcs_name="git", commit_id=commit_id)
+
+
+@add_vcs_commit_id_reader
+@vcs_marker(".git")
 def local_git_commit_id(local_install_basepath: Path, dist_mtime: datetime) -> Optional[VcsInfo]:
     """Get git commit_id of locally installed package.
 
+    This is the fallback of :func:`git_dir_commit_id` which runs ``git``.
+    The history is read through a ``git cat-file --batch`` process which is shared
+    by all lookups in the same repository, only if that fails ``git log`` is run.
+
     Parameters
     ----------
     local_install_basepath : Path
@@ -122,22 +1047,23 @@ def local_git_commit_id(local_install_basepath: Path, dist_mtime: datetime) -> O
 
     See Also
     --------
+    git_dir_commit_id
     run_vcs_commit_id_command
+    verbose_version_info.git_batch.batch_last_commit_before
     verbose_version_info.resource_finders.dist_info_mtime
     """
-    date_string = dist_mtime.strftime("%Y-%m-%d %H:%M:%S")
+    # the markers were already listed to dispatch this reader, so this doesn't touch the disk
+    if ".git" not in vcs_markers(local_install_basepath):
+        return None
+    # 'git log --before' only has a resolution of seconds
+    before_timestamp = dist_mtime.replace(microsecond=0).timestamp()
+    commit_id = batch_last_commit_before(local_install_basepath, before_timestamp)
+    if commit_id is not None:
+        check_dirty(local_install_basepath, git_check_dirty_command())
+        return VcsInfo(vcs_name="git", commit_id=commit_id)
     return run_vcs_commit_id_command(
         vcs_name="git",
-        commit_id_command=(
-            "git",
-            "log",
-            "--before",
-            f"'{date_string}'",
-            "-n",
-            "1",
-            "--pretty=format:%H",
-        ),
+        commit_id_command=git_commit_id_command(dist_mtime),
         local_install_basepath=local_install_basepath,
-        need_to_exist_path_child=".git",
-        check_dirty_command=("git", "status", "-s"),
+        check_dirty_command=git_check_dirty_command(),
     )
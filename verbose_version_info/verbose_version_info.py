@@ -1,43 +1,285 @@
 """Main module."""
+import threading
+from collections import deque
+from contextvars import Context
+from contextvars import copy_context
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Callable
+from typing import Deque
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Set
+from typing import Tuple
 
+from verbose_version_info.data_containers import VcsInfo
 from verbose_version_info.data_containers import VerboseVersionInfo
+from verbose_version_info.data_containers import VersionTable
 from verbose_version_info.resource_finders import dist_info_mtime
 from verbose_version_info.resource_finders import find_url_info
 from verbose_version_info.resource_finders import local_install_basepath
-from verbose_version_info.utils import distribution
-from verbose_version_info.vcs import VCS_COMMIT_ID_READERS
+from verbose_version_info.tracing import traced_stage
+from verbose_version_info.utils import RESOLUTION_STAGES
+from verbose_version_info.utils import DeadlineExceeded
+from verbose_version_info.utils import ResolutionContext
+from verbose_version_info.utils import collect_skipped_stages
+from verbose_version_info.utils import deadline_timeout
+from verbose_version_info.utils import deferred_warnings
+from verbose_version_info.utils import editable_index
+from verbose_version_info.utils import emit_warning
+from verbose_version_info.utils import normalize_distribution_name
+from verbose_version_info.utils import scan_distributions
+from verbose_version_info.utils import skip_stage
+from verbose_version_info.utils import time_budget
 
+# verbose_version_info.cache and verbose_version_info.vcs (which import the git modules)
+# are imported by the functions using them, they make up most of the import time otherwise
 
-def release_version(
-    distribution_name: str,
-) -> str:
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+
+def release_version(distribution_name: str, *, context: Optional[ResolutionContext] = None) -> str:
     """Retrieve the release version of a distribution.
 
     Parameters
     ----------
     distribution_name : str
         The name of the distribution package as a string.
+    context : Optional[ResolutionContext]
+        Resolution context of the distribution, by default None
 
     Returns
     -------
     str
         Version string of the distribution
     """
-    return distribution(distribution_name).version
+    if context is None:
+        context = ResolutionContext(distribution_name)
+    return context.version
+
+
+def _vv_info_without_vcs(
+    context: ResolutionContext,
+) -> Tuple[VerboseVersionInfo, Optional[Path]]:
+    """Verbose version information which can be resolved without running a vcs.
+
+    Parameters
+    ----------
+    context : ResolutionContext
+        Resolution context of the distribution.
+
+    Returns
+    -------
+    Tuple[VerboseVersionInfo, Optional[Path]]
+        Verbose version information and the base path of a local installation.
+        If the base path isn't None, the vcs commit_id readers should be run on it
+        to complete the verbose version information.
+
+    See Also
+    --------
+    vv_info
+    """
+    distribution_name = context.distribution_name
+    dist_mtime = dist_info_mtime(distribution_name, context=context)
+    url_vv_info = find_url_info(distribution_name, dist_time=dist_mtime, context=context)
+    if url_vv_info is not None:
+        if url_vv_info.commit_id and url_vv_info.vcs_name:
+            return url_vv_info, None
+        elif url_vv_info.url.endswith((".zip", ".tar.gz", ".whl")):
+            return url_vv_info, None
+    local_path = local_install_basepath(distribution_name, vv_info=url_vv_info, context=context)
+    if local_path is not None:
+        return (
+            VerboseVersionInfo(
+                release_version=release_version(distribution_name, context=context),
+                dist_time=dist_mtime,
+                url=local_path.as_uri(),
+            ),
+            local_path,
+        )
+
+    return (
+        VerboseVersionInfo(
+            release_version=release_version(distribution_name, context=context),
+            dist_time=dist_mtime,
+        ),
+        None,
+    )
+
+
+def _read_vcs_commit_id(repo_root: Path, dist_mtime: datetime) -> Optional[VcsInfo]:
+    """Run the registered vcs commit_id readers until one of them finds a commit.
+
+    Only readers which marker (e.g. ``.git``) is in ``repo_root`` are run.
+
+    Parameters
+    ----------
+    repo_root : Path
+        Root of the repository of a local installation.
+    dist_mtime : datetime
+        Time the packaged distribution was modified.
+
+    Returns
+    -------
+    Optional[VcsInfo]
+        (vcs_name, commit_id) or None if no reader found a commit.
+    """
+    from verbose_version_info.vcs import VCS_COMMIT_ID_READERS
+    from verbose_version_info.vcs import matching_vcs_readers
+
+    for vsc_reader in matching_vcs_readers(VCS_COMMIT_ID_READERS, repo_root):
+        with traced_stage("vcs_reader", getattr(vsc_reader, "__name__", "")) as trace_details:
+            vcs_info = vsc_reader(repo_root, dist_mtime)
+            trace_details["found"] = vcs_info is not None
+        if vcs_info is not None:
+            return vcs_info
+    return None
+
+
+def _add_vcs_info(result: VerboseVersionInfo, local_path: Optional[Path]) -> VerboseVersionInfo:
+    """Complete the result of :func:`_vv_info_without_vcs` with the vcs information.
+
+    If the time budget runs out before the commit id was found, the ``vcs`` and
+    ``dirty`` stages are skipped (see :func:`verbose_version_info.utils.skip_stage`).
+
+    Parameters
+    ----------
+    result : VerboseVersionInfo
+        Verbose version information resolved without running a vcs.
+    local_path : Optional[Path]
+        Base path of a local installation, nothing is added if it is None.
+
+    Returns
+    -------
+    VerboseVersionInfo
+        ``result`` with the vcs information of ``local_path`` if it is in a repository.
+
+    See Also
+    --------
+    verbose_version_info.vcs.VcsSession
+    """
+    if local_path is None:
+        return result
+    from verbose_version_info.vcs import dirty_state
+    from verbose_version_info.vcs import emit_dirty_warning
+    from verbose_version_info.vcs import vcs_lookup_key
+    from verbose_version_info.vcs import vcs_root
+    from verbose_version_info.vcs import vcs_session
 
+    try:
+        deadline_timeout()
+        with vcs_session() as session:
+            repo_root = vcs_root(local_path)
+            vcs_info = session.memoized(
+                vcs_lookup_key(repo_root, result.dist_time),
+                partial(_read_vcs_commit_id, repo_root, result.dist_time),
+            )
+            if vcs_info is not None:
+                emit_dirty_warning(repo_root)
+                return result._replace(
+                    vcs_name=vcs_info.vcs_name,
+                    commit_id=vcs_info.commit_id,
+                    dirty=dirty_state(repo_root),
+                )
+    except DeadlineExceeded:
+        skip_stage("vcs")
+        skip_stage("dirty")
+    return result
+
+
+def _with_skipped_stages(
+    result: VerboseVersionInfo, skipped_stages: List[str]
+) -> VerboseVersionInfo:
+    """Add the stages collected by :func:`verbose_version_info.utils.collect_skipped_stages`.
+
+    Parameters
+    ----------
+    result : VerboseVersionInfo
+        Verbose version information resolved while collecting the skipped stages.
+    skipped_stages : List[str]
+        Collected skipped stages.
 
-def vv_info(distribution_name: str) -> VerboseVersionInfo:
+    Returns
+    -------
+    VerboseVersionInfo
+        ``result`` with the skipped stages in the order of ``RESOLUTION_STAGES``.
+    """
+    if not skipped_stages:
+        return result
+    return result._replace(
+        skipped_stages=tuple(stage for stage in RESOLUTION_STAGES if stage in skipped_stages)
+    )
+
+
+def _vv_info(context: ResolutionContext) -> VerboseVersionInfo:
+    """Inner function of :func:`vv_info` working on the resolution context of a distribution.
+
+    Stages the active :func:`verbose_version_info.utils.time_budget` isn't enough for
+    are skipped and listed in ``skipped_stages`` of the partial result.
+
+    Parameters
+    ----------
+    context : ResolutionContext
+        Resolution context of the distribution.
+
+    Returns
+    -------
+    VerboseVersionInfo
+        Verbose version information of the installed package,
+        as detailed as possible.
+
+    See Also
+    --------
+    vv_info
+    verbose_version_info.utils.time_budget
+    """
+    with collect_skipped_stages() as skipped_stages:
+        try:
+            deadline_timeout()
+        except DeadlineExceeded:
+            return VerboseVersionInfo(
+                release_version=release_version(context.distribution_name, context=context),
+                dist_time=dist_info_mtime(context.distribution_name, context=context),
+                skipped_stages=RESOLUTION_STAGES,
+            )
+        result = _add_vcs_info(*_vv_info_without_vcs(context))
+    return _with_skipped_stages(result, skipped_stages)
+
+
+def vv_info(distribution_name: str, *, deadline: Optional[float] = None) -> VerboseVersionInfo:
     """Verbose version information of an installed package.
 
     Known limitations:
-        * Does not include uncommitted changes.
         * Can't determine vcs information for tarball installations.
             E.g. ``pip install https://github.com/s-weigand/git-install-test-distribution/archive/main.zip``
 
+    If ``CACHE_SETTINGS["enabled"]`` is ``True`` the result is read from and
+    stored in the persistent cache (see :mod:`verbose_version_info.cache`).
+
+    ``dirty`` is whether the vcs checkout contains uncommitted changes.
+    It is None if the installation isn't a vcs checkout, the dirty check is disabled
+    (``VCS_SETTINGS["dirty_check"] = "off"`` or ``VCS_SETTINGS["warn_dirty"] = False``),
+    the time budget ran out before it finished or the result was read from the
+    persistent cache without ``CACHE_SETTINGS["recheck_dirty"]``.
+
+    With a ``deadline`` the vcs commands are killed when the time budget runs out
+    and the stages which didn't finish are listed in ``skipped_stages``
+    (e.g. ``("vcs", "dirty")`` if only the release version and url were found).
+
     Parameters
     ----------
     distribution_name : str
         The name of the distribution package as a string.
+    deadline : Optional[float]
+        Time budget of the lookup in seconds, by default None which doesn't limit the time.
 
     Returns
     -------
@@ -45,31 +287,707 @@ def vv_info(distribution_name: str) -> VerboseVersionInfo:
         Verbose version information of the installed package,
         as detailed as possible.
     """  # noqa: E501
-    dist_mtime = dist_info_mtime(distribution_name)
-    url_vv_info = find_url_info(distribution_name, dist_time=dist_mtime)
-    if url_vv_info is not None:
-        if url_vv_info.commit_id and url_vv_info.vcs_name:
-            return url_vv_info
-        elif url_vv_info.url.endswith((".zip", ".tar.gz", ".whl")):
-            return url_vv_info
-    local_path = local_install_basepath(distribution_name, vv_info=url_vv_info)
-    if local_path is not None:
-        for vsc_reader in VCS_COMMIT_ID_READERS:
-            vcs_info = vsc_reader(local_path, dist_mtime)
-            if vcs_info is not None:
-                return VerboseVersionInfo(
-                    release_version=release_version(distribution_name),
-                    dist_time=dist_mtime,
-                    url=local_path.as_uri(),
-                    vcs_name=vcs_info.vcs_name,
-                    commit_id=vcs_info.commit_id,
+    with time_budget(deadline):
+        from verbose_version_info.cache import cached_vv_info
+
+        return cached_vv_info(distribution_name, _vv_info)
+
+
+class LazyVerboseVersionInfo:
+    """Verbose version information which is only resolved as far as it is accessed.
+
+    Has the same fields as :class:`VerboseVersionInfo`, which are computed on first
+    access and memoized.
+    ``release_version``, ``dist_time`` and ``url`` only read the metadata of the
+    distribution, only ``commit_id``, ``vcs_name`` and ``dirty`` run the vcs lookups.
+    Everything else (comparison, iteration, :meth:`_asdict`) works on the
+    result of :meth:`resolve`.
+
+    Parameters
+    ----------
+    distribution_name : str
+        The name of the distribution package as a string.
+    context : Optional[ResolutionContext]
+        Resolution context of the distribution, by default None
+
+    See Also
+    --------
+    lazy_vv_info
+    """
+
+    _fields = VerboseVersionInfo._fields
+
+    def __init__(self, distribution_name: str, *, context: Optional[ResolutionContext] = None):
+        self.distribution_name = distribution_name
+        self._context = context if context is not None else ResolutionContext(distribution_name)
+        self._lock = threading.RLock()
+        self._without_vcs: Optional[Tuple[VerboseVersionInfo, Optional[Path]]] = None
+        self._resolved: Optional[VerboseVersionInfo] = None
+
+    @property
+    def resolved(self) -> bool:
+        """Whether the vcs information was already resolved.
+
+        Returns
+        -------
+        bool
+            True if :meth:`resolve` was run.
+        """
+        return self._resolved is not None
+
+    def _resolve_without_vcs(self) -> VerboseVersionInfo:
+        """Fully resolved result if available, else the result without vcs information.
+
+        Returns
+        -------
+        VerboseVersionInfo
+            Verbose version information, which doesn't require running a vcs.
+        """
+        with self._lock:
+            if self._resolved is not None:
+                return self._resolved
+            if self._without_vcs is None:
+                self._without_vcs = _vv_info_without_vcs(self._context)
+            return self._without_vcs[0]
+
+    def _resolve_vcs(self, context: ResolutionContext) -> VerboseVersionInfo:
+        """Add the vcs information to the memoized result without vcs information.
+
+        Parameters
+        ----------
+        context : ResolutionContext
+            Resolution context of the distribution, passed by
+            :func:`verbose_version_info.cache.cached_vv_info`.
+
+        Returns
+        -------
+        VerboseVersionInfo
+            Verbose version information of the installed package.
+        """
+        if self._without_vcs is None:
+            return _vv_info(context)
+        with collect_skipped_stages() as skipped_stages:
+            result = _add_vcs_info(*self._without_vcs)
+        return _with_skipped_stages(result, skipped_stages)
+
+    def resolve(self) -> VerboseVersionInfo:
+        """Resolve all fields, including the vcs information.
+
+        Returns
+        -------
+        VerboseVersionInfo
+            Verbose version information of the installed package,
+            same as :func:`vv_info` would return.
+        """
+        from verbose_version_info.cache import cached_vv_info
+
+        with self._lock:
+            if self._resolved is None:
+                self._resolved = cached_vv_info(
+                    self.distribution_name, self._resolve_vcs, context=self._context
                 )
-        return VerboseVersionInfo(
-            release_version=release_version(distribution_name),
-            dist_time=dist_mtime,
-            url=local_path.as_uri(),
-        )
+            return self._resolved
 
-    return VerboseVersionInfo(
-        release_version=release_version(distribution_name), dist_time=dist_mtime
-    )
+    @property
+    def release_version(self) -> str:
+        """Release version of the distribution.
+
+        Returns
+        -------
+        str
+            Version string of the distribution.
+        """
+        if self._resolved is not None:
+            return self._resolved.release_version
+        return self._context.version
+
+    @property
+    def dist_time(self) -> datetime:
+        """Time the distribution was installed, current time for editable installations.
+
+        Returns
+        -------
+        datetime
+            Modification time of the distribution.
+        """
+        return self._resolve_without_vcs().dist_time
+
+    @property
+    def url(self) -> str:
+        """Url the distribution was installed from.
+
+        Returns
+        -------
+        str
+            Url or empty string if it wasn't installed from an url or local directory.
+        """
+        return self._resolve_without_vcs().url
+
+    @property
+    def commit_id(self) -> str:
+        """Commit id of the installed version, runs the vcs lookups.
+
+        Returns
+        -------
+        str
+            Commit id or empty string if it couldn't be determined.
+        """
+        return self.resolve().commit_id
+
+    @property
+    def vcs_name(self) -> str:
+        """Name of the vcs the commit id belongs to, runs the vcs lookups.
+
+        Returns
+        -------
+        str
+            Name of the vcs or empty string if it couldn't be determined.
+        """
+        return self.resolve().vcs_name
+
+    @property
+    def dirty(self) -> Optional[bool]:
+        """Whether the vcs checkout contains uncommitted changes, runs the vcs lookups.
+
+        Returns
+        -------
+        Optional[bool]
+            None if it wasn't checked.
+        """
+        return self.resolve().dirty
+
+    @property
+    def skipped_stages(self) -> Tuple[str, ...]:
+        """Stages skipped because the active time budget ran out, runs the vcs lookups.
+
+        Returns
+        -------
+        Tuple[str, ...]
+            Skipped resolution stages.
+        """
+        return self.resolve().skipped_stages
+
+    def _asdict(self) -> Dict[str, Any]:
+        """Fully resolved fields as dict.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Mapping of field names to values.
+        """
+        return self.resolve()._asdict()
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over the fully resolved fields.
+
+        Returns
+        -------
+        Iterator[Any]
+            Values of the fields.
+        """
+        return iter(self.resolve())
+
+    def __len__(self) -> int:
+        """Number of fields.
+
+        Returns
+        -------
+        int
+            Number of fields of :class:`VerboseVersionInfo`.
+        """
+        return len(self._fields)
+
+    def __getitem__(self, index: int) -> Any:
+        """Fully resolved field by index.
+
+        Parameters
+        ----------
+        index : int
+            Index of the field.
+
+        Returns
+        -------
+        Any
+            Value of the field.
+        """
+        return self.resolve()[index]
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the fully resolved fields.
+
+        Parameters
+        ----------
+        other : object
+            :class:`VerboseVersionInfo`, :class:`LazyVerboseVersionInfo` or tuple.
+
+        Returns
+        -------
+        bool
+            Whether all fields are equal.
+        """
+        if isinstance(other, LazyVerboseVersionInfo):
+            other = other.resolve()
+        if not isinstance(other, tuple):
+            return NotImplemented
+        return self.resolve() == other
+
+    def __hash__(self) -> int:
+        """Hash of the fully resolved fields.
+
+        Returns
+        -------
+        int
+            Hash of the result of :meth:`resolve`.
+        """
+        return hash(self.resolve())
+
+    def __repr__(self) -> str:
+        """Representation which doesn't trigger the resolution.
+
+        Returns
+        -------
+        str
+            Representation of the resolved result or the distribution name.
+        """
+        if self._resolved is not None:
+            return f"Lazy{self._resolved!r}"
+        return f"{type(self).__name__}(distribution_name={self.distribution_name!r}, unresolved)"
+
+
+def lazy_vv_info(distribution_name: str) -> LazyVerboseVersionInfo:
+    """Verbose version information which is only resolved as far as it is accessed.
+
+    Accessing ``release_version``, ``dist_time`` or ``url`` never runs a vcs
+    subprocess, so this is the cheap alternative to :func:`vv_info` if the vcs
+    information might not be needed.
+
+    Parameters
+    ----------
+    distribution_name : str
+        The name of the distribution package as a string.
+
+    Returns
+    -------
+    LazyVerboseVersionInfo
+        Lazily resolved verbose version information of the installed package.
+
+    See Also
+    --------
+    vv_info
+    LazyVerboseVersionInfo.resolve
+    """
+    return LazyVerboseVersionInfo(distribution_name)
+
+
+def _resolve_deferring_warnings(
+    resolve: Callable[[], VerboseVersionInfo]
+) -> Tuple[VerboseVersionInfo, List[Warning]]:
+    """Run a resolver and collect the warnings it emits instead of emitting them.
+
+    Parameters
+    ----------
+    resolve : Callable[[], VerboseVersionInfo]
+        Function resolving the verbose version information of a distribution.
+
+    Returns
+    -------
+    Tuple[VerboseVersionInfo, List[Warning]]
+        Result of ``resolve`` and the collected warnings.
+    """
+    with deferred_warnings() as collected_warnings:
+        return resolve(), collected_warnings
+
+
+def _run_in_context(
+    context: Context, resolve: Callable[[], VerboseVersionInfo]
+) -> Tuple[VerboseVersionInfo, List[Warning]]:
+    """Run :func:`_resolve_deferring_warnings` in a context copied from the calling thread.
+
+    Parameters
+    ----------
+    context : Context
+        Context to run the resolver in, so e.g. the active vcs session is shared.
+    resolve : Callable[[], VerboseVersionInfo]
+        Function resolving the verbose version information of a distribution.
+
+    Returns
+    -------
+    Tuple[VerboseVersionInfo, List[Warning]]
+        Result of ``resolve`` and the collected warnings.
+    """
+    return context.run(_resolve_deferring_warnings, resolve)
+
+
+def _resolve_all(
+    resolvers: Sequence[Callable[[], VerboseVersionInfo]],
+    max_workers: int,
+    deadline: Optional[float] = None,
+) -> List[VerboseVersionInfo]:
+    """Run resolvers for multiple distributions, concurrently if ``max_workers > 1``.
+
+    Resolving the vcs information is mostly waiting for subprocesses which releases
+    the GIL, so it is done on a thread pool.
+    Warnings are collected per distribution and emitted in the order of ``resolvers``
+    after all of them finished, so they don't depend on the scheduling.
+    All resolvers share one :class:`verbose_version_info.vcs.VcsSession`,
+    so distributions from the same repository only run the vcs commands once.
+
+    Parameters
+    ----------
+    resolvers : Sequence[Callable[[], VerboseVersionInfo]]
+        Functions resolving the verbose version information of a distribution.
+    max_workers : int
+        Maximum number of threads used to run ``resolvers``.
+    deadline : Optional[float]
+        Time budget in seconds shared by all resolvers, by default None
+
+    Returns
+    -------
+    List[VerboseVersionInfo]
+        Results in the same order as ``resolvers``.
+    """
+    from verbose_version_info.vcs import vcs_session
+
+    with vcs_session(), time_budget(deadline):
+        if max_workers <= 1 or len(resolvers) <= 1:
+            outcomes = [_resolve_deferring_warnings(resolve) for resolve in resolvers]
+        else:
+            # concurrent.futures is only imported once threads are actually used
+            from concurrent.futures import ThreadPoolExecutor
+
+            # each thread needs its own copy of the context containing the session
+            contexts = [copy_context() for _ in resolvers]
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                outcomes = list(executor.map(_run_in_context, contexts, resolvers))
+    emitted_warnings: Set[Warning] = set()
+    return [_emit_deferred(*outcome, emitted_warnings) for outcome in outcomes]
+
+
+def _vv_info_metadata_only(context: ResolutionContext) -> VerboseVersionInfo:
+    """Verbose version information from the metadata only, without running a vcs.
+
+    Parameters
+    ----------
+    context : ResolutionContext
+        Resolution context of the distribution.
+
+    Returns
+    -------
+    VerboseVersionInfo
+        Verbose version information, local installations only have their ``url`` set.
+    """
+    return _vv_info_without_vcs(context)[0]
+
+
+def _uncached_vv_info(
+    distribution_name: str,
+    resolve: Callable[[ResolutionContext], VerboseVersionInfo],
+    context: Optional[ResolutionContext] = None,
+) -> VerboseVersionInfo:
+    """Counterpart of :func:`verbose_version_info.cache.cached_vv_info` bypassing the cache.
+
+    Used for partial results, which must not end up in the persistent cache.
+
+    Parameters
+    ----------
+    distribution_name : str
+        The name of the distribution package as a string.
+    resolve : Callable[[ResolutionContext], VerboseVersionInfo]
+        Function resolving the verbose version information of a distribution.
+    context : Optional[ResolutionContext]
+        Resolution context of the distribution, by default None
+
+    Returns
+    -------
+    VerboseVersionInfo
+        Verbose version information of the installed package.
+    """
+    return resolve(context if context is not None else ResolutionContext(distribution_name))
+
+
+def _bulk_resolvers(
+    distribution_names: Optional[Iterable[str]], deadline: Optional[float], vcs: bool = True
+) -> List[Tuple[str, Callable[[], VerboseVersionInfo]]]:
+    """Resolvers of the bulk lookups sharing one scan of ``sys.path``.
+
+    Parameters
+    ----------
+    distribution_names : Optional[Iterable[str]]
+        Names of the distribution packages, None for all scanned distributions.
+    deadline : Optional[float]
+        Time budget in seconds for all distributions together.
+    vcs : bool
+        Whether the vcs information of local installations is resolved, by default True
+
+    Returns
+    -------
+    List[Tuple[str, Callable[[], VerboseVersionInfo]]]
+        Distribution names and the functions resolving them, the names of scanned
+        distributions are the names from their metadata if ``distribution_names`` is None.
+    """
+    if not vcs:
+        # partial results must not end up in the persistent cache
+        lookup, resolve = _uncached_vv_info, _vv_info_metadata_only
+    else:
+        from verbose_version_info.cache import cached_vv_info
+
+        lookup = cached_vv_info
+        resolve = _vv_info
+    scanned_distributions = scan_distributions()
+    shared_editable_index = editable_index()
+    if distribution_names is None:
+        contexts = [
+            ResolutionContext.from_scanned(scanned.normalized_name, scanned, shared_editable_index)
+            for scanned in scanned_distributions.values()
+        ]
+        return [
+            (
+                context.name or context.distribution_name,
+                partial(lookup, context.distribution_name, resolve, context),
+            )
+            for context in contexts
+        ]
+    resolvers: List[Tuple[str, Callable[[], VerboseVersionInfo]]] = []
+    for distribution_name in distribution_names:
+        scanned = scanned_distributions.get(normalize_distribution_name(distribution_name))
+        if scanned is None:
+            resolver = partial(lookup, distribution_name, resolve)
+        else:
+            context = ResolutionContext.from_scanned(
+                distribution_name, scanned, shared_editable_index
+            )
+            resolver = partial(lookup, distribution_name, resolve, context)
+        resolvers.append((distribution_name, resolver))
+    return resolvers
+
+
+def _iter_resolved(
+    resolvers: Iterable[Callable[[], VerboseVersionInfo]],
+    max_workers: int,
+    deadline: Optional[float] = None,
+) -> Iterator[VerboseVersionInfo]:
+    """Streaming counterpart of :func:`_resolve_all`, yielding results as they are resolved.
+
+    At most ``2 * max_workers`` results are resolved ahead of the consumer,
+    so memory use doesn't grow with the number of distributions.
+    Warnings of each distribution are emitted right before its result is yielded.
+
+    Parameters
+    ----------
+    resolvers : Iterable[Callable[[], VerboseVersionInfo]]
+        Functions resolving the verbose version information of a distribution.
+    max_workers : int
+        Maximum number of threads used to run ``resolvers``.
+    deadline : Optional[float]
+        Time budget in seconds shared by all resolvers, by default None
+
+    Yields
+    ------
+    VerboseVersionInfo
+        Results in the same order as ``resolvers``.
+    """
+    from verbose_version_info.vcs import vcs_session
+
+    with vcs_session(), time_budget(deadline):
+        # the resolvers run in copies of this context, so the session and the time budget
+        # aren't set in the context of the consumer while the generator is suspended
+        resolution_context = copy_context()
+    emitted_warnings: Set[Warning] = set()
+    if max_workers <= 1:
+        for resolve in resolvers:
+            outcome = _run_in_context(resolution_context, resolve)
+            yield _emit_deferred(*outcome, emitted_warnings)
+        return
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending: Deque["Future[Tuple[VerboseVersionInfo, List[Warning]]]"] = deque()
+        for resolve in resolvers:
+            # a context can only be entered by one thread at a time
+            context = resolution_context.copy()
+            pending.append(executor.submit(_run_in_context, context, resolve))
+            while len(pending) >= 2 * max_workers or (pending and pending[0].done()):
+                yield _emit_deferred(*pending.popleft().result(), emitted_warnings)
+        while pending:
+            yield _emit_deferred(*pending.popleft().result(), emitted_warnings)
+
+
+def _emit_deferred(
+    result: VerboseVersionInfo,
+    collected_warnings: List[Warning],
+    emitted_warnings: Set[Warning],
+) -> VerboseVersionInfo:
+    """Emit the warnings collected while resolving a distribution.
+
+    Warnings shared by multiple distributions (e.g. the one of
+    :func:`verbose_version_info.vcs.emit_dirty_warning`) are the same object,
+    so they are only emitted for the first distribution collecting them.
+
+    Parameters
+    ----------
+    result : VerboseVersionInfo
+        Result of the resolver.
+    collected_warnings : List[Warning]
+        Warnings collected by :func:`_resolve_deferring_warnings`.
+    emitted_warnings : Set[Warning]
+        Warnings already emitted for previous distributions, which is updated.
+
+    Returns
+    -------
+    VerboseVersionInfo
+        The passed result.
+    """
+    for warning in collected_warnings:
+        if warning not in emitted_warnings:
+            emitted_warnings.add(warning)
+            emit_warning(warning)
+    return result
+
+
+def iter_vv_info(
+    distribution_names: Optional[Iterable[str]] = None,
+    *,
+    max_workers: int = 1,
+    deadline: Optional[float] = None,
+    vcs: bool = True,
+) -> Iterator[Tuple[str, VerboseVersionInfo]]:
+    """Stream the verbose version information of multiple distributions.
+
+    Same as :func:`vv_info_many` (or :func:`vv_info_all` if ``distribution_names``
+    is None), but results are yielded as soon as they are resolved, so they can be
+    written out (see :mod:`verbose_version_info.export`) without keeping all of them
+    in memory.
+
+    Parameters
+    ----------
+    distribution_names : Optional[Iterable[str]]
+        Names of the distribution packages, by default None which uses all
+        distributions in the environment.
+    max_workers : int
+        Number of threads used to resolve the distributions concurrently,
+        which mostly speeds up running the vcs commands, by default 1
+    deadline : Optional[float]
+        Time budget in seconds for all distributions together,
+        see :func:`vv_info`, by default None
+    vcs : bool
+        Whether the vcs information of local installations is resolved, by default True.
+        Without it only the metadata is read, which is a lot faster, and the partial
+        results aren't stored in the persistent cache.
+
+    Yields
+    ------
+    Tuple[str, VerboseVersionInfo]
+        Distribution name and verbose version information in the order of
+        ``distribution_names``.
+
+    See Also
+    --------
+    vv_info_many
+    vv_info_all
+    """
+    resolvers = _bulk_resolvers(distribution_names, deadline, vcs)
+    results = _iter_resolved([resolver for _, resolver in resolvers], max_workers, deadline)
+    for result, (distribution_name, _) in zip(results, resolvers):
+        yield distribution_name, result
+
+
+def vv_info_many(
+    distribution_names: Iterable[str], *, max_workers: int = 1, deadline: Optional[float] = None
+) -> List[VerboseVersionInfo]:
+    """Verbose version information of multiple installed packages.
+
+    All entries of ``sys.path`` are only listed once for all distributions,
+    instead of once per distribution as with :func:`vv_info`.
+    The same goes for the index of editable installations.
+    Distributions which aren't found by this scan (e.g. installed as zip file)
+    are looked up the same way as with :func:`vv_info`.
+    Same as for :func:`vv_info` the persistent cache is used if it is enabled.
+
+    Parameters
+    ----------
+    distribution_names : Iterable[str]
+        Names of the distribution packages.
+    max_workers : int
+        Number of threads used to resolve the distributions concurrently,
+        which mostly speeds up running the vcs commands, by default 1
+    deadline : Optional[float]
+        Time budget in seconds for all distributions together,
+        see :func:`vv_info`, by default None
+
+    Returns
+    -------
+    List[VerboseVersionInfo]
+        Verbose version information in the same order as ``distribution_names``.
+
+    See Also
+    --------
+    vv_info
+    verbose_version_info.utils.scan_distributions
+    """
+    resolvers = _bulk_resolvers(distribution_names, deadline)
+    return _resolve_all([resolver for _, resolver in resolvers], max_workers, deadline)
+
+
+def vv_info_all(
+    *, max_workers: int = 1, deadline: Optional[float] = None
+) -> Dict[str, VerboseVersionInfo]:
+    """Verbose version information of all distributions in the environment.
+
+    Parameters
+    ----------
+    max_workers : int
+        Number of threads used to resolve the distributions concurrently,
+        which mostly speeds up running the vcs commands, by default 1
+    deadline : Optional[float]
+        Time budget in seconds for all distributions together,
+        see :func:`vv_info`, by default None
+
+    Returns
+    -------
+    Dict[str, VerboseVersionInfo]
+        Mapping of distribution names to their verbose version information.
+
+    See Also
+    --------
+    vv_info_many
+    """
+    resolvers = _bulk_resolvers(None, deadline)
+    results = _resolve_all([resolver for _, resolver in resolvers], max_workers, deadline)
+    return {name: result for (name, _), result in zip(resolvers, results)}
+
+
+def vv_info_table(
+    distribution_names: Optional[Iterable[str]] = None,
+    *,
+    max_workers: int = 1,
+    deadline: Optional[float] = None,
+) -> VersionTable:
+    """Verbose version information of multiple distributions as compact :class:`VersionTable`.
+
+    Parameters
+    ----------
+    distribution_names : Optional[Iterable[str]]
+        Names of the distribution packages, by default None which uses all
+        distributions in the environment like :func:`vv_info_all`.
+    max_workers : int
+        Number of threads used to resolve the distributions concurrently,
+        which mostly speeds up running the vcs commands, by default 1
+    deadline : Optional[float]
+        Time budget in seconds for all distributions together,
+        see :func:`vv_info`, by default None
+
+    Returns
+    -------
+    VersionTable
+        Table with one row per distribution.
+
+    See Also
+    --------
+    vv_info_many
+    vv_info_all
+    """
+    if distribution_names is None:
+        return VersionTable(vv_info_all(max_workers=max_workers, deadline=deadline))
+    distribution_names = list(distribution_names)
+    results = vv_info_many(distribution_names, max_workers=max_workers, deadline=deadline)
+    return VersionTable(zip(distribution_names, results))